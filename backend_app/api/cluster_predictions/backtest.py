@@ -0,0 +1,119 @@
+import time
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+from backend_app.api.cluster_predictions import engines
+from backend_app.api.cluster_predictions.preprocess import clean
+
+# Feature table of every cluster in a worker process (set once by _init_worker)
+_FEATURES = {}
+
+
+# ----------------------------------------------------------------------------------------------
+# Walk-forward backtest (rolling origin)
+# ----------------------------------------------------------------------------------------------
+def fold_origins(df_dict, folds, horizon, step):
+    """
+    Forecast origins of the folds, oldest first. The newest fold's horizon ends at the
+    last observed hour, earlier folds start `step` hours apart. Origins are at midnight,
+    like the published forecast.
+
+    Params:
+        df_dict: dict - key = cluster ID, value = cleaned hourly data ('Date-Hr', 'Count' and features)
+        folds: int - number of folds
+        horizon: int - forecast hours per fold
+        step: int - hours between fold origins
+
+    Returns:
+        list - pandas.Timestamp origins
+    """
+    end = max(df["Date-Hr"].max() for df in df_dict.values()) + pd.Timedelta(hours=1)
+    last = (end - pd.Timedelta(hours=horizon)).floor("D")
+    return [last - pd.Timedelta(hours=step * i) for i in reversed(range(folds))]
+
+
+def run_fold(cluster_id, origin, horizon, engine):
+    """
+    Trains a cluster's engine on the hours before `origin` (expanding window) and
+    forecasts the next `horizon` hours. Hours without calls count as 0.
+
+    Returns:
+        dict - cluster, origin, engine, train rows, seconds and the hourly errors (forecast - actual)
+    """
+    start = time.perf_counter()
+    data = _FEATURES[cluster_id]
+    train = data[data["Date-Hr"] < origin]
+    feature_columns = [col for col in data.columns if col not in ("Date-Hr", "Count")]
+
+    model = engines.create_engine(engine)
+    model.fit(train[feature_columns], train["Count"])
+
+    hours = pd.date_range(origin, periods=horizon, freq="h")
+    future = clean(pd.DataFrame({"Date-Hr": hours}))
+    actual = data.set_index("Date-Hr")["Count"].reindex(hours, fill_value=0).to_numpy(dtype=float)
+    errors = model.predict(future[feature_columns]) - actual
+
+    return {"cluster": int(cluster_id), "origin": str(origin), "engine": engine, "train_rows": len(train),
+            "seconds": round(time.perf_counter() - start, 3), "errors": errors}
+
+
+def backtest(df_dict, folds=8, horizon=168, step=168, engine="xgboost", engine_overrides=None, workers=None):
+    """
+    Rolling-origin walk-forward evaluation of every cluster. Each (cluster, origin) fold
+    trains only on earlier hours, so no future hour leaks into training. Folds run in
+    parallel processes, each of which receives the feature table once.
+
+    Params:
+        df_dict: dict - key = cluster ID, value = cleaned hourly data (the training
+            pipeline's 'clean' stage output)
+        folds: int - number of forecast origins
+        horizon: int - forecast hours per fold
+        step: int - hours between fold origins
+        engine: str - forecasting engine, or "auto" (see engines.select_engine)
+        engine_overrides: dict - key = cluster ID, value = engine for that cluster
+        workers: int - parallel processes (default: CPU count)
+
+    Returns:
+        dict -
+            folds: list - cluster, origin, engine, train rows, seconds, MAE and RMSE of each fold
+            horizons: list - MAE and RMSE per cluster and horizon day over every fold
+            clusters: list - MAE and RMSE per cluster over every fold and horizon
+            seconds: float - wall time of the backtest
+    """
+    start = time.perf_counter()
+    origins = fold_origins(df_dict, folds, horizon, step)
+    tasks = [(cluster_id, origin, horizon, engines.select_engine(data, engine, cluster_id, engine_overrides))
+             for cluster_id, data in df_dict.items() for origin in origins]
+
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"),
+                             initializer=_init_worker, initargs=(df_dict,)) as pool:
+        results = list(pool.map(run_fold, *zip(*tasks)))
+
+    return {**score(results), "seconds": round(time.perf_counter() - start, 3)}
+
+
+def score(results):
+    """
+    MAE and RMSE per fold, per cluster and horizon day, and per cluster.
+    """
+    def metrics(errors):
+        return {"mae": round(float(np.mean(np.abs(errors))), 4), "rmse": round(float(np.sqrt(np.mean(errors ** 2))), 4)}
+
+    fold_rows = [{key: value for key, value in result.items() if key != "errors"} | metrics(result["errors"])
+                 for result in results]
+
+    horizon_rows, cluster_rows = [], []
+    for cluster_id in sorted({result["cluster"] for result in results}):
+        cluster_results = [result for result in results if result["cluster"] == cluster_id]
+        errors = np.vstack([result["errors"] for result in cluster_results])
+        for day in range(0, errors.shape[1], 24):
+            horizon_rows.append({"cluster": cluster_id, "horizon_day": day // 24 + 1,
+                                 "folds": len(cluster_results), **metrics(errors[:, day:day + 24])})
+        cluster_rows.append({"cluster": cluster_id, "engine": cluster_results[0]["engine"], **metrics(errors)})
+
+    return {"folds": fold_rows, "horizons": horizon_rows, "clusters": cluster_rows}
+
+
+def _init_worker(df_dict):
+    _FEATURES.update(df_dict)
@@ -1,5 +1,8 @@
-import xgboost as xgb
+import time
+import numpy as np
+import pandas as pd
 from sklearn.model_selection import train_test_split
+from backend_app.api.cluster_predictions import engines
 
 
 class Cluster:
@@ -8,7 +11,8 @@ class Cluster:
 
     Attributes:
         id (int): Cluster identification.
-        data (pandas.DataFrame): Historical data for the specified cluster.
+        data (pandas.DataFrame): Historical data for the specified cluster (None once
+        the model is trained in low-memory mode or out of core).
         lat_lng_dist (pandas.DataFrame): Coordinates present in historical
         data for the cluster.
             - Lat/Long: Coordinates.
@@ -17,11 +21,16 @@ class Cluster:
             - Distribution: Distribution of historical call 
               volume.
         boundary (list): Set of coordinates defining the cluster boundary.
+        centroid (list): k-means centroid of the cluster as [latitude, longitude].
         X_train (pandas.DataFrame): Training features data.
         X_test (pandas.DataFrame): Testing features data.
         y_train (pandas.Series): Training targets data.
         y_test (pandas.Series): Testing targets data.
-        model (xgb.XGBRegressor): Trained model for the cluster.
+        model (engines.ForecastEngine): Trained forecasting engine for the cluster.
+        feature_columns (list): Feature column names the model was trained on.
+        engine (str): Name of the engine used for the model.
+        fit_seconds (float): Time taken to fit the model.
+        test_mae (float): Mean absolute error of the model on the test data.
     """
 
     def __init__(
@@ -34,7 +43,8 @@ class Cluster:
             X_test=None,
             y_train=None,
             y_test=None,
-            model=None
+            model=None,
+            centroid=None
     ):
         self.id = id
         self.data = data
@@ -45,6 +55,11 @@ class Cluster:
         self.y_train = y_train
         self.y_test = y_test
         self.model = model
+        self.feature_columns = list(X_train.columns) if X_train is not None else None
+        self.centroid = centroid
+        self.engine = None
+        self.fit_seconds = None
+        self.test_mae = None
 
     def train_test(self):
         """
@@ -67,29 +82,72 @@ class Cluster:
         self.X_test = X_test
         self.y_train = y_train
         self.y_test = y_test
+        self.feature_columns = list(X_train.columns)
 
         return X_train, X_test, y_train, y_test
 
-    def create_model(self):
+    def create_model(self, engine="xgboost"):
         """
-        Creates and trains an XGBoost regressor using the training data.
+        Creates and trains a forecasting engine using the training data,
+        then scores it on the testing data.
+
+        Parameters:
+            engine (str): Name of the engine (see engines.ENGINES).
 
         Returns:
-            xgb.XGBRegressor: The trained model.
+            engines.ForecastEngine: The trained model.
         """
         if self.X_train is None or self.y_train is None:
             raise ValueError(
                 "Training data not found. Please run train_test() first.")
 
-        model = xgb.XGBRegressor(
-            objective='reg:squarederror',
-            n_estimators=100,
-            learning_rate=0.1,
-            max_depth=6,
-            random_state=42
-        )
+        model = engines.create_engine(engine)
+        start = time.perf_counter()
         model.fit(self.X_train, self.y_train)
+        self.fit_seconds = time.perf_counter() - start
+        self.model = model
+        self.engine = model.name
+
+        if self.X_test is not None and len(self.X_test):
+            self.test_mae = float(np.mean(np.abs(self.y_test.to_numpy() - model.predict(self.X_test))))
+        return model
+
+    def create_model_external(self, store, engine="xgboost", split="time", test_fraction=0.2):
+        """
+        Trains a forecasting engine out of core from the cluster's feature chunks,
+        then scores it on the held-out rows. No train/test copies of the data are made:
+        rows are held out by time or by hash while the chunks are streamed.
+
+        Parameters:
+            store (feature_store.FeatureStore): Store holding the cluster's features.
+            engine (str): Name of the engine (see engines.ENGINES).
+            split (str): "time" or "hash" (see feature_store.SPLITS).
+            test_fraction (float): Share of rows held out for testing.
+
+        Returns:
+            engines.ForecastEngine: The trained model.
+        """
+        self.feature_columns = store.metadata(self.id)["columns"]
+
+        model = engines.create_engine(engine)
+        start = time.perf_counter()
+        try:
+            model.fit_batches(lambda: store.batches(self.id, False, split, test_fraction),
+                              self.feature_columns, store.cache_prefix(self.id))
+        finally:
+            store.clear_cache(self.id)
+        self.fit_seconds = time.perf_counter() - start
         self.model = model
+        self.engine = model.name
+
+        # Mean absolute error over the held-out rows, one chunk at a time
+        abs_error, rows = 0.0, 0
+        for X, y in store.batches(self.id, True, split, test_fraction):
+            if len(y):
+                predicted = model.predict(pd.DataFrame(X, columns=self.feature_columns))
+                abs_error += float(np.sum(np.abs(y - predicted)))
+                rows += len(y)
+        self.test_mae = abs_error / rows if rows else None
         return model
 
     def make_predict(self, input):
@@ -106,3 +164,18 @@ class Cluster:
             raise ValueError(
                 "Model has not been trained. Call create_model() first.")
         return self.model.predict(input)
+
+    def release_training_data(self):
+        """
+        Drops the cluster's data and its train/test copies once the model is trained, so
+        the hourly history is neither kept in memory nor pickled with the model.
+        The feature column names are kept for building prediction inputs.
+        """
+        if self.model is None:
+            raise ValueError(
+                "Model has not been trained. Call create_model() first.")
+        self.data = None
+        self.X_train = None
+        self.X_test = None
+        self.y_train = None
+        self.y_test = None
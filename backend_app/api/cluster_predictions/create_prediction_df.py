@@ -1,9 +1,10 @@
 import numpy as np
 import pandas as pd
 from backend_app.api.cluster_predictions.preprocess import clean
+from backend_app.api.cluster_predictions.prediction import HORIZON_HOURS
 
 
-def create_prediction_df(cluster, new_week_data_file_path=None):
+def create_prediction_df(cluster, new_week_data_file_path=None, start=None):
     """
     Creates the final prediction dataframe for a given cluster.
 
@@ -12,16 +13,21 @@ def create_prediction_df(cluster, new_week_data_file_path=None):
             The Cluster object containing historical data.
         new_week_data_file_path (str, optional): 
             Path to the newest week of data.
+        start (pd.Timestamp, optional):
+            First forecast hour. Defaults to today at midnight.
 
     Returns:
         pd.DataFrame: The final prediction dataframe combining past and future data.
     """
     cols_to_drop = ["Cluster", "Date-Hr", "Count"]
-    # Get the latest week of real data
-    latest_week_data = create_prediction_input_df(cluster, new_week_data_file_path)
+    # Get the latest week of real data (not kept by clusters trained in low-memory mode)
+    if cluster.data is not None or new_week_data_file_path:
+        latest_week_data = create_prediction_input_df(cluster, new_week_data_file_path)
+    else:
+        latest_week_data = pd.DataFrame()
 
     # Create an empty dataframe for next week's predictions
-    future_week_data = create_new_prediction_df()
+    future_week_data = create_new_prediction_df(start)
 
     # Drop unnecessary columns
     for col in cols_to_drop:
@@ -65,30 +71,37 @@ def create_prediction_input_df(cluster, new_week_data_file_path=None):
         cluster_data = clean(cluster_data)
     else:
         # Extract most recent week from the cluster's stored data
+        if cluster.data is None:
+            raise ValueError(f"Cluster {cluster.id} no longer holds its historical data "
+                             "(trained in low-memory mode or out of core).")
         cluster_data = cluster.data.copy()
         
-    cluster_data["Date-Hr"] = pd.to_datetime(cluster.data["Date-Hr"])
-    last_week_start = cluster.data["Date-Hr"].max() - pd.Timedelta(days=7)
-    new_data = cluster.data[cluster.data["Date-Hr"] >= last_week_start].copy()
+    cluster_data["Date-Hr"] = pd.to_datetime(cluster_data["Date-Hr"])
+    last_week_start = cluster_data["Date-Hr"].max() - pd.Timedelta(days=7)
+    new_data = cluster_data[cluster_data["Date-Hr"] >= last_week_start].copy()
     
     return new_data
 
 
-def create_new_prediction_df():
+def create_new_prediction_df(start=None, horizon=HORIZON_HOURS):
     """
     Creates an empty prediction DataFrame for the new week of data.
-    Generates hourly timestamps for the next week.
+    Generates hourly timestamps for the next week (or `horizon` hours).
 
     Parameters:
-        cluster (Cluster): 
-            The Cluster object containing historical data and lat_lng_dist.
+        start (pd.Timestamp, optional):
+            First forecast hour. Defaults to today at midnight.
+        horizon (int, optional):
+            Number of forecast hours. Defaults to HORIZON_HOURS.
 
     Returns:
         pd.DataFrame: The new prediction DataFrame.
     """
 
     # Generate timestamps for the next week by the hour
-    future_dates = pd.date_range(start=pd.Timestamp.today().normalize(), periods=7 * 24, freq='h')
+    if start is None:
+        start = pd.Timestamp.today().normalize()
+    future_dates = pd.date_range(start=start, periods=horizon, freq='h')
     future_df = pd.DataFrame({"Date-Hr": future_dates})
 
     # Pass DataFrame through clean() to get it in the right format
@@ -0,0 +1,321 @@
+import io
+import json
+import numpy as np
+import pandas as pd
+import xgboost as xgb
+
+# Clusters averaging fewer calls per hour than this use Holt-Winters when the engine is "auto"
+LOW_VOLUME_CALLS_PER_HOUR = 0.5
+
+
+class ForecastEngine:
+    """
+    Interface of a per-cluster forecasting model.
+
+    Engines are fitted on the cluster's feature frame (the calendar features from
+    preprocess.clean) and the hourly call counts. They pickle through serialize()/
+    deserialize(), so a trained cluster stores the engine's own format.
+
+    Attributes:
+        name (str): Engine name used in settings and the ENGINES registry.
+        external_memory (bool): Whether fit_batches trains without loading every batch.
+    """
+    name = None
+    external_memory = False
+
+    def fit(self, X, y):
+        """
+        Fits the engine.
+
+        Parameters:
+            X (pandas.DataFrame): Feature frame (must include Year, Month, Day, Hour).
+            y (pandas.Series): Calls per hour.
+
+        Returns:
+            ForecastEngine: self
+        """
+        raise NotImplementedError
+
+    def fit_batches(self, batches, feature_columns, cache_prefix=None):
+        """
+        Fits the engine on streamed training rows (out-of-core training, see
+        feature_store.FeatureStore). Engines without external memory support load
+        every batch and call fit.
+
+        Parameters:
+            batches (callable): Returns an iterator of (X, y) numpy arrays; called once per pass.
+            feature_columns (list): Names of the columns of X.
+            cache_prefix (str, optional): Path prefix for on-disk caches.
+
+        Returns:
+            ForecastEngine: self
+        """
+        parts = [(X, y) for X, y in batches() if len(y)]
+        X = pd.DataFrame(np.concatenate([X for X, _ in parts]), columns=feature_columns)
+        y = pd.Series(np.concatenate([y for _, y in parts]))
+        return self.fit(X, y)
+
+    def predict(self, X):
+        """
+        Predicts calls per hour.
+
+        Parameters:
+            X (pandas.DataFrame): Feature frame with the columns used in fit.
+
+        Returns:
+            numpy.ndarray: Predicted values.
+        """
+        raise NotImplementedError
+
+    def serialize(self):
+        """
+        Returns:
+            bytes: The fitted engine.
+        """
+        raise NotImplementedError
+
+    @classmethod
+    def deserialize(cls, payload):
+        """
+        Parameters:
+            payload (bytes): Output of serialize().
+
+        Returns:
+            ForecastEngine
+        """
+        raise NotImplementedError
+
+    def __reduce__(self):
+        return load_engine, (self.name, self.serialize())
+
+
+class XGBoostEngine(ForecastEngine):
+    """
+    Gradient boosted trees over the calendar features.
+    """
+    name = "xgboost"
+    external_memory = True
+
+    PARAMS = {"objective": "reg:squarederror", "learning_rate": 0.1, "max_depth": 6}
+    N_ESTIMATORS = 100
+    SEED = 42
+
+    def __init__(self, model=None):
+        self.model = model
+
+    def fit(self, X, y):
+        self.model = xgb.XGBRegressor(**self.PARAMS, n_estimators=self.N_ESTIMATORS, random_state=self.SEED)
+        self.model.fit(X, y)
+        return self
+
+    def fit_batches(self, batches, feature_columns, cache_prefix=None):
+        # XGBoost reads the batches through a DataIter and keeps its own compressed pages
+        # under cache_prefix, so the full feature matrix is never in memory
+        matrix = xgb.DMatrix(BatchIter(batches, feature_columns, cache_prefix))
+        booster = xgb.train({**self.PARAMS, "tree_method": "hist", "seed": self.SEED}, matrix,
+                            num_boost_round=self.N_ESTIMATORS)
+        self.model = xgb.XGBRegressor()
+        self.model.load_model(bytearray(booster.save_raw("ubj")))
+        return self
+
+    def predict(self, X):
+        return self.model.predict(X)
+
+    def serialize(self):
+        return bytes(self.model.get_booster().save_raw("ubj"))
+
+    @classmethod
+    def deserialize(cls, payload):
+        model = xgb.XGBRegressor()
+        model.load_model(bytearray(payload))
+        return cls(model)
+
+
+class BatchIter(xgb.DataIter):
+    """
+    Feeds (X, y) batches to XGBoost's external memory DMatrix.
+    """
+
+    def __init__(self, batches, feature_columns, cache_prefix=None):
+        self._batches = batches
+        self._feature_columns = feature_columns
+        self._iterator = None
+        super().__init__(cache_prefix=cache_prefix)
+
+    def next(self, input_data):
+        if self._iterator is None:
+            self._iterator = iter(self._batches())
+        for X, y in self._iterator:
+            if len(y):
+                input_data(data=X, label=y, feature_names=self._feature_columns)
+                return 1
+        return 0
+
+    def reset(self):
+        self._iterator = None
+
+
+class HoltWintersEngine(ForecastEngine):
+    """
+    Additive Holt-Winters with a damped trend and a weekly (hour of week) season.
+
+    The smoothing parameters are chosen by SSE over a small grid. All grid points are
+    run at once as vectors, over the most recent `history_weeks` of hourly data, so a
+    fit takes milliseconds. Hours without a row had no calls (hourly_counts only keeps
+    hours with calls) and count as 0.
+
+    Attributes:
+        params (dict): Chosen alpha, beta and gamma.
+        level (float): Final level.
+        trend (float): Final trend.
+        season (numpy.ndarray): Seasonal component for each of the 168 hours of the week.
+        last_time (pandas.Timestamp): Last fitted hour.
+    """
+    name = "holt_winters"
+
+    SEASON = 168
+    ALPHAS = (0.02, 0.05, 0.1, 0.2, 0.3, 0.5)
+    BETAS = (0.0, 0.01, 0.05)
+    GAMMAS = (0.02, 0.05, 0.1, 0.2, 0.3)
+
+    def __init__(self, history_weeks=8, phi=0.98):
+        self.history_weeks = history_weeks
+        self.phi = phi
+        self.params = None
+        self.level = None
+        self.trend = None
+        self.season = None
+        self.last_time = None
+
+    def fit(self, X, y):
+        times = _timestamps(X)
+        series = pd.Series(np.asarray(y, dtype=float), index=times).groupby(level=0).sum().sort_index()
+
+        # Continuous hourly series over the recent history (0 for hours without calls)
+        end = series.index.max()
+        start = max(series.index.min(), end - pd.Timedelta(weeks=self.history_weeks) + pd.Timedelta(hours=1))
+        hours = pd.date_range(start, end, freq="h")
+        values = series.reindex(hours, fill_value=0.0).to_numpy()
+        hour_of_week = _hour_of_week(hours)
+
+        # Every (alpha, beta, gamma) combination as one vector entry
+        alpha, beta, gamma = (a.ravel() for a in np.meshgrid(self.ALPHAS, self.BETAS, self.GAMMAS, indexing="ij"))
+        k = len(alpha)
+
+        # Initial state from the first week (or the whole series when it is shorter)
+        level = np.full(k, values[:self.SEASON].mean())
+        trend = np.zeros(k)
+        profile = pd.Series(values).groupby(hour_of_week).mean().reindex(range(self.SEASON))
+        season = np.tile(np.nan_to_num(profile.to_numpy() - level[0]), (k, 1))
+
+        sse = np.zeros(k)
+        phi = self.phi
+        for t in range(len(values)):
+            observed = values[t]
+            h = hour_of_week[t]
+            s = season[:, h]
+            forecast = level + phi * trend + s
+            if t >= self.SEASON:
+                sse += (observed - forecast) ** 2
+
+            new_level = alpha * (observed - s) + (1 - alpha) * (level + phi * trend)
+            trend = beta * (new_level - level) + (1 - beta) * phi * trend
+            season[:, h] = gamma * (observed - new_level) + (1 - gamma) * s
+            level = new_level
+
+        best = int(np.argmin(sse))
+        self.params = {"alpha": float(alpha[best]), "beta": float(beta[best]), "gamma": float(gamma[best])}
+        self.level = float(level[best])
+        self.trend = float(trend[best])
+        self.season = season[best].copy()
+        self.last_time = hours[-1]
+        return self
+
+    def predict(self, X):
+        times = _timestamps(X)
+        steps = np.clip((times - self.last_time) / pd.Timedelta(hours=1), 0, None).to_numpy()
+
+        # Damped trend: trend * (phi + phi^2 + ... + phi^steps)
+        damping = self.phi * (1 - self.phi ** steps) / (1 - self.phi)
+        forecast = self.level + damping * self.trend + self.season[_hour_of_week(times)]
+        return np.clip(forecast, 0, None)
+
+    def serialize(self):
+        buffer = io.BytesIO()
+        state = {"history_weeks": self.history_weeks, "phi": self.phi, "params": self.params,
+                 "level": self.level, "trend": self.trend, "last_time": str(self.last_time)}
+        np.savez(buffer, season=self.season, state=np.array(json.dumps(state)))
+        return buffer.getvalue()
+
+    @classmethod
+    def deserialize(cls, payload):
+        arrays = np.load(io.BytesIO(payload))
+        state = json.loads(str(arrays["state"]))
+        engine = cls(state["history_weeks"], state["phi"])
+        engine.params = state["params"]
+        engine.level = state["level"]
+        engine.trend = state["trend"]
+        engine.season = arrays["season"]
+        engine.last_time = pd.Timestamp(state["last_time"])
+        return engine
+
+
+# Registry of available engines
+ENGINES = {engine.name: engine for engine in (XGBoostEngine, HoltWintersEngine)}
+
+
+def create_engine(name):
+    """
+    Creates an unfitted engine.
+
+    Params:
+        name: str - key of ENGINES
+
+    Returns:
+        ForecastEngine
+    """
+    if name not in ENGINES:
+        raise ValueError(f"Unknown forecasting engine '{name}'. Choose from: {', '.join(ENGINES)}")
+    return ENGINES[name]()
+
+
+def load_engine(name, payload):
+    """
+    Restores a serialized engine (used when unpickling clusters).
+    """
+    return ENGINES[name].deserialize(payload)
+
+
+def select_engine(data, engine="xgboost", cluster_id=None, overrides=None):
+    """
+    Picks the engine for a cluster.
+
+    Params:
+        data: pandas.DataFrame - the cluster's hourly data ('Date-Hr' and 'Count')
+        engine: str - engine name, or "auto" to use Holt-Winters for low-volume clusters
+        cluster_id: int - cluster ID, looked up in overrides
+        overrides: dict - key = cluster ID, value = engine name
+
+    Returns:
+        str - engine name
+    """
+    if overrides and cluster_id is not None:
+        engine = overrides.get(cluster_id, overrides.get(str(cluster_id), engine))
+    if engine != "auto":
+        return engine
+
+    span_hours = (data['Date-Hr'].max() - data['Date-Hr'].min()) / pd.Timedelta(hours=1) + 1
+    calls_per_hour = data['Count'].sum() / max(span_hours, 1)
+    return HoltWintersEngine.name if calls_per_hour < LOW_VOLUME_CALLS_PER_HOUR else XGBoostEngine.name
+
+
+def _timestamps(X):
+    """
+    Hourly timestamps from the Year, Month, Day and Hour features.
+    """
+    return pd.DatetimeIndex(pd.to_datetime(pd.DataFrame({
+        "year": X["Year"], "month": X["Month"], "day": X["Day"], "hour": X["Hour"]}).astype(int)))
+
+
+def _hour_of_week(times):
+    return np.asarray(times.dayofweek * 24 + times.hour)
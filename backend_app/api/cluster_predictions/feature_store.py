@@ -0,0 +1,120 @@
+import os
+import json
+import shutil
+import numpy as np
+import pandas as pd
+from backend_app.api.cluster_predictions.preprocess import clean
+
+# Rows per feature chunk (one chunk is the most a training step holds in memory at once)
+CHUNK_ROWS = 100_000
+
+# Ways of holding out test rows without an in-memory shuffle
+SPLITS = ["time", "hash"]
+
+
+class FeatureStore:
+    """
+    Per-cluster training features saved on disk as row chunks, for out-of-core training.
+
+    Each cluster's hourly features are computed from its hourly call counts one chunk at a
+    time and written in time order as NumPy chunk files (features as float32, the call
+    count and the hour). Neither writing nor training holds more than one chunk of
+    features, so the full feature matrix and its train/test copies are never built.
+
+    Test rows are chosen per row, so every chunk can be split on its own:
+        time - the most recent test_fraction of the cluster's history
+        hash - hours whose hash falls below test_fraction (spread over the whole history)
+
+    Attributes:
+        folder (str): Root folder of the store (one subfolder per cluster).
+        chunk_rows (int): Rows per chunk.
+    """
+
+    def __init__(self, folder, chunk_rows=CHUNK_ROWS):
+        self.folder = folder
+        self.chunk_rows = chunk_rows
+
+    def write(self, cluster_id, counts, low_memory=False):
+        """
+        Replaces a cluster's chunks with the features of its hourly call counts,
+        computed one chunk at a time.
+
+        Params:
+            cluster_id: int - cluster ID
+            counts: pandas.DataFrame - hourly call counts with 'Date-Hr' and 'Count' columns
+            low_memory: bool - compact feature dtypes while a chunk is built (see preprocess.clean)
+
+        Returns:
+            list - feature column names, in chunk column order
+        """
+        folder = self._cluster_folder(cluster_id)
+        shutil.rmtree(folder, ignore_errors=True)
+        os.makedirs(folder)
+
+        counts = counts[["Date-Hr", "Count"]].sort_values("Date-Hr")
+        hours = pd.to_datetime(counts["Date-Hr"]).to_numpy().astype("datetime64[h]").astype(np.int64)
+
+        columns, chunks = [], 0
+        for start in range(0, len(counts), self.chunk_rows):
+            part = clean(counts.iloc[start:start + self.chunk_rows].copy(), low_memory)
+            columns = [col for col in part.columns if col not in ("Date-Hr", "Count")]
+            np.savez(os.path.join(folder, f"chunk_{chunks:05d}.npz"),
+                     X=part[columns].to_numpy(dtype=np.float32),
+                     y=part["Count"].to_numpy(dtype=np.float32),
+                     hours=hours[start:start + self.chunk_rows])
+            chunks += 1
+
+        metadata = {"columns": columns, "rows": len(counts), "chunks": chunks,
+                    "first_hour": int(hours[0]) if len(hours) else 0,
+                    "last_hour": int(hours[-1]) if len(hours) else 0}
+        with open(os.path.join(folder, "metadata.json"), "w") as f:
+            json.dump(metadata, f)
+        return columns
+
+    def metadata(self, cluster_id):
+        with open(os.path.join(self._cluster_folder(cluster_id), "metadata.json"), "r") as f:
+            return json.load(f)
+
+    def batches(self, cluster_id, test, split="time", test_fraction=0.2):
+        """
+        Streams the training or test rows of a cluster, one chunk at a time.
+
+        Params:
+            cluster_id: int - cluster ID
+            test: bool - yield the held-out test rows instead of the training rows
+            split: str - "time" or "hash" (see SPLITS)
+            test_fraction: float - share of rows held out
+
+        Yields:
+            tuple - (X numpy.ndarray float32, y numpy.ndarray float32)
+        """
+        if split not in SPLITS:
+            raise ValueError(f"Unknown split '{split}'. Choose from: {', '.join(SPLITS)}")
+        metadata = self.metadata(cluster_id)
+        cutoff = metadata["last_hour"] - (metadata["last_hour"] - metadata["first_hour"]) * test_fraction
+
+        for chunk in range(metadata["chunks"]):
+            with np.load(os.path.join(self._cluster_folder(cluster_id), f"chunk_{chunk:05d}.npz")) as arrays:
+                X, y, hours = arrays["X"], arrays["y"], arrays["hours"]
+            if split == "time":
+                held_out = hours > cutoff
+            else:
+                # Knuth multiplicative hash of the hour, scaled to [0, 1)
+                held_out = (hours.astype(np.uint64) * np.uint64(2654435761) % np.uint64(2 ** 32)) / 2 ** 32 < test_fraction
+            keep = held_out if test else ~held_out
+            yield X[keep], y[keep]
+
+    def cache_prefix(self, cluster_id):
+        """
+        Path prefix of XGBoost's external memory pages for a cluster.
+        """
+        return os.path.join(self._cluster_folder(cluster_id), "xgb-cache")
+
+    def clear_cache(self, cluster_id):
+        folder = self._cluster_folder(cluster_id)
+        for file in os.listdir(folder):
+            if file.startswith("xgb-cache"):
+                os.remove(os.path.join(folder, file))
+
+    def _cluster_folder(self, cluster_id):
+        return os.path.join(self.folder, f"cluster_{cluster_id}")
@@ -0,0 +1,64 @@
+import sys
+
+# Highest peak seen before the last reset, so the process-wide peak survives resets
+_process_peak_mb = 0.0
+
+
+def peak_rss_mb():
+    """
+    Peak resident set size (MB) since the last reset_peak_rss() call.
+
+    Uses VmHWM from /proc on Linux and falls back to getrusage elsewhere (which
+    cannot be reset, so it is the process-wide peak). Returns None if neither is
+    available (e.g. Windows).
+
+    Returns:
+        float or None
+    """
+    try:
+        with open("/proc/self/status", "r") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+
+    try:
+        import resource
+    except ImportError:
+        return None
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS reports bytes
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def reset_peak_rss():
+    """
+    Resets the peak RSS high-water mark to the current RSS (Linux only).
+
+    Returns:
+        bool - True if the high-water mark was reset
+    """
+    global _process_peak_mb
+    _process_peak_mb = max(_process_peak_mb, peak_rss_mb() or 0.0)
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def process_peak_rss_mb():
+    """
+    Peak resident set size (MB) over the whole life of the process, including
+    peaks from before any reset_peak_rss() call.
+
+    Returns:
+        float or None
+    """
+    current = peak_rss_mb()
+    if current is None:
+        return None
+    return max(_process_peak_mb, current)
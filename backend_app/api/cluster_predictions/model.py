@@ -1,19 +1,24 @@
+import numpy as np
 import pandas as pd
-from backend_app.api.cluster_predictions.preprocess import data_import, clean, k_means
+from backend_app.api.cluster_predictions.preprocess import data_import, clean, k_means, read_data
 from backend_app.api.cluster_predictions.cluster import Cluster
-from backend_app.api.cluster_predictions.create_prediction_df import create_prediction_df
+from backend_app.api.cluster_predictions.create_prediction_df import create_new_prediction_df
+from backend_app.api.cluster_predictions.prediction import ClusterPrediction, save_predictions, prune_distribution, COORD_DECIMALS, COUNT_DECIMALS, HORIZON_HOURS
+from backend_app.api.cluster_predictions.pipeline import Pipeline, Stage
+from backend_app.api.cluster_predictions.spatial_index import ClusterIndex
+from backend_app.api.cluster_predictions.engines import select_engine
+from backend_app.api.cluster_predictions.feature_store import FeatureStore
+from backend_app.api.cluster_predictions.backtest import backtest
+from backend_app.api.cluster_predictions import create_prediction_df, engines, feature_store, prediction, preprocess, spatial_index
 
 from scipy.spatial import ConvexHull
 
 
-# Globals
-LAT, LNG = 35.227085, -80.843124    # Charlotte, NC coordinates
-
 
 def coord_dist(df):
     """
     Create latitude/longitude distribution from historical data
-    Round coordinates to 3 decimal places reduce granularity
+    Round coordinates to COORD_DECIMALS decimal places to reduce granularity
 
     Params:
         df: pandas.DataFrame - dataframe with historical coordinate data
@@ -21,29 +26,16 @@ def coord_dist(df):
     Returns:
         df: pandas.DataFrame - same dataframe as params but with additional 'Distribution' column
     """
-    clusters = df['Cluster'].unique()   # Get unique clusters in df
-
-    # Round coordinate to 2 decimal places
-    df['Lat'] = round(df['Latitude'], 2)
-    df['Long'] = round(df['Longitude'], 2)
+    # Round coordinate to COORD_DECIMALS decimal places (float64 so rounded values stay exact)
+    df['Lat'] = round(df['Latitude'].astype(float), COORD_DECIMALS)
+    df['Long'] = round(df['Longitude'].astype(float), COORD_DECIMALS)
 
     # Aggregate by coordinate and cluster
-    df = df.groupby(['Lat', 'Long', 'Cluster']).size().reset_index(name='Count')
+    df = df.groupby(['Lat', 'Long', 'Cluster'], observed=True).size().reset_index(name='Count')
 
-    # Get total calls per cluster
-    cluster_totals = df.groupby("Cluster")["Count"].sum()
-
-    # Calculate distribution for each coordinate by iterating through each row
-    df["Distribution"] = 0.0
-    for i in range(len(df)):
-        cluster_id = df.loc[i, "Cluster"]
-        total_count = cluster_totals.get(cluster_id, 0) 
-
-        # Calculate distribution and assign to 'Distribution' column
-        if total_count > 0:
-            df.loc[i, "Distribution"] = df.loc[i, "Count"] / total_count
-        else:
-            df.loc[i, "Distribution"] = 0
+    # Share of the cluster's calls at each coordinate
+    cluster_totals = df.groupby("Cluster", observed=True)["Count"].transform("sum")
+    df["Distribution"] = (df["Count"] / cluster_totals).where(cluster_totals > 0, 0.0)
 
     return df
 
@@ -59,7 +51,7 @@ def get_boundaries(df):
         boundary_dict: dictionary - key = cluster number, value = boundary of cluster
     """
     boundary_dict = {}
-    for cluster_id, group in df.groupby('Cluster'):
+    for cluster_id, group in df.groupby('Cluster', observed=True):
         coords = group[['Lat', 'Long']].values
         hull = ConvexHull(coords)
         boundary = coords[hull.vertices].tolist()
@@ -68,40 +60,59 @@ def get_boundaries(df):
     return boundary_dict
 
 
-def create_models(cluster_list):
+def create_models(cluster_list, low_memory=False, engine="xgboost", engine_overrides=None,
+                  feature_dir=None, split="time"):
     """
     Create models and trains for each cluster. Creates prediction dataframes
     for each cluster.
 
     Params:
         cluster_list: list - list of Cluster objects
+        low_memory: bool - drop each cluster's data and train/test copies once its model is trained
+        engine: str - forecasting engine, or "auto" to use Holt-Winters for low-volume clusters
+        engine_overrides: dict - key = cluster ID, value = engine for that cluster
+        feature_dir: str - train out of core from feature chunks saved in this folder
+            (see feature_store.FeatureStore). Each cluster's data is then its hourly counts,
+            which are dropped once its features are in the store. None trains in memory.
+        split: str - how out-of-core training holds out test rows ("time" or "hash")
 
     Returns:
         prediction_df_list: list - list of prediction dataframes for each cluster
     """
+    store = FeatureStore(feature_dir) if feature_dir else None
     for cluster in cluster_list:
-        cluster.train_test()    # Train/test split
-        cluster.create_model()  # Create model
+        cluster_engine = select_engine(cluster.data, engine, cluster.id, engine_overrides)
+        if store is not None:
+            store.write(cluster.id, cluster.data, low_memory)
+            cluster.data = None     # The features live in the store only
+            cluster.create_model_external(store, cluster_engine, split)
+        else:
+            cluster.train_test()    # Train/test split
+            cluster.create_model(cluster_engine)  # Create model
+            if low_memory:
+                cluster.release_training_data()
+        mae = f"{cluster.test_mae:.3f}" if cluster.test_mae is not None else "-"
+        print(f"Cluster {cluster.id}: {cluster.engine} fitted in {cluster.fit_seconds:.2f}s (test MAE {mae})")
     return
 
 
-def create_prediction_dataframes(cluster_list):
+def create_prediction_dataframes(cluster_list, start=None, horizon=HORIZON_HOURS):
     """
     Create prediction dataframes for each cluster.
 
+    Forecast features only depend on the hour, so the feature matrix is built once
+    and shared by every cluster (make_predictions selects each model's columns).
+
     Params:
         cluster_list: list - list of Cluster objects
+        start: pandas.Timestamp - first forecast hour (defaults to today at midnight)
+        horizon: int - number of forecast hours
 
     Returns:
         prediction_df_list: list - list of empty prediction dataframes for each cluster
     """
-    prediction_df_list = []
-
-    for cluster in cluster_list:
-        prediction_df = create_prediction_df(cluster)
-        prediction_df_list.append(prediction_df)
-
-    return prediction_df_list
+    prediction_df = create_new_prediction_df(start, horizon)
+    return [prediction_df for _ in cluster_list]
 
 
 def make_predictions(prediction_dfs, clusters):
@@ -121,14 +132,12 @@ def make_predictions(prediction_dfs, clusters):
             raise ValueError(f"Model for cluster {cluster.id} has not been trained.")
 
         # Ensure df_pred has the correct columns
-        df_pred = df_pred[cluster.X_train.columns].copy()
+        df_pred = df_pred[cluster.feature_columns].copy()
 
-        # Convert to NumPy for predictions
-        df_pred_array = df_pred.to_numpy()
-
-        # Make predictions
-        predictions = cluster.model.predict(df_pred_array)
-        df_pred["Count"] = predictions
+        # Make predictions (float32 model output as float64, rounded so it serializes as e.g. 40.1
+        # rather than 40.099998474121094)
+        predictions = cluster.model.predict(df_pred)
+        df_pred["Count"] = np.round(np.asarray(predictions, dtype=np.float64), COUNT_DECIMALS)
         
         final_predictions[cluster.id] = df_pred
     
@@ -155,6 +164,7 @@ def aggregate_daily_data(predictions):
             "is_holiday": "max",
             "is_weekend": "max"
         })
+        daily_df["Count"] = daily_df["Count"].round(COUNT_DECIMALS)
 
          # Store results in dictionary
         daily_predictions[cluster_id] = daily_df 
@@ -162,130 +172,312 @@ def aggregate_daily_data(predictions):
     return daily_predictions
 
 
-def assign_call_distribution(daily_predictions, clusters):
+def assign_call_distribution(daily_predictions, clusters, hourly_predictions=None, top_k=None, mass=None):
     """
-    Distributes daily call predictions back to each lat/long coordinate based on historical distribution.
+    Pairs each cluster's predicted totals with its historical lat/long distribution.
+
+    Predictions are kept factorized (totals + one shared distribution) rather than
+    cross joined, so point volumes are only expanded for the slice a request asks for
+    (see ClusterPrediction.expand).
 
     Params:
         daily_predictions: dict - cluster_id with daily aggregated DataFrame with total predicted calls per day
         clusters: list - List of Cluster objects, each holding lat_lng_dist.
+        hourly_predictions: dict - cluster_id with hourly prediction DataFrame (optional)
+        top_k: int - keep at most this many cells per cluster (see prediction.prune_distribution)
+        mass: float - keep the fewest cells holding this share of each cluster's calls
 
     Returns:
-        distributed_predictions: dict - cluster_id with DataFrame with lat/lng and distributed counts
+        distributed_predictions: dict - cluster_id with ClusterPrediction
     """
     distributed_predictions = {}
 
     for cluster in clusters:
         cluster_id = cluster.id
-        lat_lng_dist = cluster.lat_lng_dist.copy()
-        
-        dist_sum = lat_lng_dist["Distribution"].sum()
 
         if cluster_id not in daily_predictions:
-            continue 
+            continue
 
-        # Get the prediction DataFrame for this cluster
-        daily_df = daily_predictions[cluster_id].copy()
+        daily_df = daily_predictions[cluster_id]
 
-        # Rename "Count" to "Cluster_Count" to store total calls per day
-        daily_df.rename(columns={"Count": "Cluster_Count"}, inplace=True)
-
-        # Get lat/lng distribution for this cluster
-        lat_lng_dist = cluster.lat_lng_dist.copy()
-
-        # Merge daily predictions with lat/lng distribution
-        # Uses cross join to apply distribution to all dates
-        daily_df["key"] = 1 
-        lat_lng_dist["key"] = 1
-        distributed_df = pd.merge(daily_df, lat_lng_dist, on="key").drop(columns=["key"])
+        # Hourly totals share the distribution, so only the time series grows with the horizon
+        if hourly_predictions is not None and cluster_id in hourly_predictions:
+            hourly_df = hourly_predictions[cluster_id][["Year", "Month", "Day", "Hour", "Count"]]
+        else:
+            hourly_df = pd.DataFrame(columns=["Year", "Month", "Day", "Hour", "Count"])
 
-        # Assign the distributed count as new Count column
-        distributed_df["Count"] = distributed_df["Cluster_Count"] * distributed_df["Distribution"]
+        lat_lng_dist = prune_distribution(
+            cluster.lat_lng_dist[["Lat", "Long", "Distribution"]].reset_index(drop=True), top_k, mass)
 
-        # Store in dictionary
-        distributed_predictions[cluster_id] = distributed_df
+        distributed_predictions[cluster_id] = ClusterPrediction(
+            cluster_id,
+            hourly_df.reset_index(drop=True),
+            daily_df.reset_index(drop=True),
+            lat_lng_dist
+        )
 
     return distributed_predictions
 
 
 # ----------------------------------------------------------------------------------------------
-# Main Model Workflow
+# Pipeline Stages
 # ----------------------------------------------------------------------------------------------
-def prepare_and_train_model(data):
+def hourly_counts(cluster_df):
     """
-    Prepare data and train model. Saves each model to pickle file.
-    Saves boundary data to JSON file.
-    Saves cluster data to JSON file.
+    Counts calls per hour and cluster.
+
+    Params:
+        cluster_df: pandas.DataFrame - EMS calls with 'Dispatched' and 'Cluster' columns
 
-    Parameters:
-        data: Pandas dataframe
     Returns:
-        clusters: List of Cluster objects
+        cluster_count: pandas.DataFrame - 'Date-Hr', 'Cluster' and 'Count' columns
     """
-    # Prepares the dataframe for clustering
-    df = data_import(data)
+    date_hr = pd.to_datetime(cluster_df['Dispatched']).dt.floor('h')
+    cluster_count = (cluster_df.groupby([date_hr.rename('Date-Hr'), cluster_df['Cluster']], observed=True)
+                     .size().reset_index(name='Count'))
+    return cluster_count
 
-    # Create clusters
-    cluster_df = k_means(df, 5)
-    lat_lng_dist = cluster_df.copy()    # To determine coordinate distribution for each cluster
 
-    # Group by Date-Hr and Cluster
-    cluster_df['Dispatched'] = pd.to_datetime(cluster_df['Dispatched'])
-    cluster_df['Date-Hr'] = cluster_df['Dispatched'].dt.strftime("%Y-%m-%d %H")
-    cluster_count = cluster_df.groupby(['Date-Hr', 'Cluster']).size().reset_index(name='Count')
+def cluster_centroids(cluster_df):
+    """
+    Mean coordinate of each k-means cluster (the k-means centroid once it has converged).
 
-    # Store cluster dataframes in dictionary
-    df_dict = {key: value for key, value in cluster_count.groupby('Cluster')}
+    Params:
+        cluster_df: pandas.DataFrame - calls with 'Latitude', 'Longitude' and 'Cluster' columns
+
+    Returns:
+        centroids: dict - key = cluster ID, value = [latitude, longitude]
+    """
+    means = cluster_df.groupby('Cluster', observed=True)[['Latitude', 'Longitude']].mean()
+    return {int(cluster_id): [float(lat), float(lng)] for cluster_id, (lat, lng) in means.iterrows()}
 
-    # Coordinate distribution
-    lat_lng_dist = coord_dist(lat_lng_dist)
-    
-    # Get boundaries of each cluster
-    boundary_dict = get_boundaries(lat_lng_dist)
 
-    # Create cluster objects
+def build_spatial_index(cluster_df, centroids):
+    """
+    Builds the point-to-cluster lookup over the training area.
+
+    Params:
+        cluster_df: pandas.DataFrame - calls with 'Latitude' and 'Longitude' columns
+        centroids: dict - output of cluster_centroids
+
+    Returns:
+        ClusterIndex
+    """
+    return ClusterIndex.build(centroids, cluster_df['Latitude'], cluster_df['Longitude'])
+
+
+def clean_clusters(cluster_count, low_memory=False):
+    """
+    Splits hourly counts by cluster and runs feature engineering on each cluster.
+
+    Params:
+        cluster_count: pandas.DataFrame - output of hourly_counts
+        low_memory: bool - use compact feature dtypes
+
+    Returns:
+        df_dict: dict - key = cluster ID, value = cleaned hourly data
+    """
+    return {key: clean(value, low_memory) for key, value in cluster_count.groupby('Cluster', observed=True)}
+
+
+def split_hourly_counts(cluster_count):
+    """
+    Splits hourly counts by cluster without feature engineering (out-of-core training
+    computes the features chunk by chunk, see feature_store.FeatureStore.write).
+
+    Params:
+        cluster_count: pandas.DataFrame - output of hourly_counts
+
+    Returns:
+        df_dict: dict - key = cluster ID, value = 'Date-Hr' and 'Count' columns
+    """
+    return {key: value[['Date-Hr', 'Count']].reset_index(drop=True)
+            for key, value in cluster_count.groupby('Cluster', observed=True)}
+
+
+def train_clusters(df_dict, lat_lng_dist, boundary_dict, centroids, low_memory=False,
+                   engine="xgboost", engine_overrides=None, feature_dir=None, split="time"):
+    """
+    Creates a Cluster object for every cluster and trains its model.
+
+    Params:
+        df_dict: dict - output of clean_clusters (split_hourly_counts with feature_dir)
+        lat_lng_dist: pandas.DataFrame - output of coord_dist
+        boundary_dict: dict - output of get_boundaries
+        centroids: dict - output of cluster_centroids
+        low_memory: bool - drop each cluster's data and train/test copies once its model is trained
+        engine: str - forecasting engine (see create_models)
+        engine_overrides: dict - key = cluster ID, value = engine for that cluster
+        feature_dir: str - train out of core from feature chunks (see create_models)
+        split: str - test rows of out-of-core training ("time" or "hash")
+
+    Returns:
+        clusters: list - list of trained Cluster objects
+    """
     clusters = []
     for cluster_id, cluster_data in df_dict.items():
-        cluster_data = clean(cluster_data)
         cluster = Cluster(
             cluster_id,
             cluster_data,
             lat_lng_dist[lat_lng_dist['Cluster'] == cluster_id],
-            boundary_dict[cluster_id]
+            boundary_dict[cluster_id],
+            centroid=centroids[int(cluster_id)]
         )
         clusters.append(cluster)
-    
+
     # Create models and train models
-    print("Creating models...\n\n")
-    create_models(clusters)
-       
-    return clusters, boundary_dict
+    create_models(clusters, low_memory, engine, engine_overrides, feature_dir, split)
+    return clusters
+
+
+def training_pipeline(checkpoint_dir=None, num_clusters=5, low_memory=False, engine="xgboost", engine_overrides=None,
+                      feature_dir=None, split="time"):
+    """
+    Builds the training pipeline:
+    import -> k-means -> hourly aggregation / coord_dist / centroids -> boundaries / spatial index -> clean -> train
+    (out of core: ... -> hourly aggregation -> per-cluster counts -> train)
+
+    Params:
+        checkpoint_dir: str - folder for stage checkpoints (None disables checkpointing)
+        num_clusters: int - number of k-means clusters
+        low_memory: bool - compact dtypes, drop raw columns and train/test copies
+        engine: str - forecasting engine, or "auto" to use Holt-Winters for low-volume clusters
+        engine_overrides: dict - key = cluster ID, value = engine for that cluster
+        feature_dir: str - train out of core from feature chunks (see create_models)
+        split: str - test rows of out-of-core training ("time" or "hash")
+
+    Returns:
+        Pipeline - expects a 'data' source (raw call data)
+    """
+    memory_params = {"low_memory": low_memory}
+    engine_params = {"engine": engine, "engine_overrides": engine_overrides or {},
+                     "feature_dir": feature_dir, "split": split}
+    # Out of core, training starts from the hourly counts and builds features chunk by chunk
+    train_data = "cluster_counts" if feature_dir else "clean"
+    return Pipeline("train", [
+        Stage("import", data_import, ["data"], memory_params, depends_on=[preprocess]),
+        Stage("k_means", k_means, ["import"], {"num_clusters": num_clusters, **memory_params}, depends_on=[preprocess]),
+        Stage("hourly_counts", hourly_counts, ["k_means"]),
+        Stage("coord_dist", lambda df: coord_dist(df[['Latitude', 'Longitude', 'Cluster']].copy()), ["k_means"],
+              depends_on=[coord_dist, prediction]),
+        Stage("centroids", cluster_centroids, ["k_means"]),
+        Stage("boundaries", get_boundaries, ["coord_dist"]),
+        Stage("spatial_index", build_spatial_index, ["k_means", "centroids"], depends_on=[spatial_index]),
+        Stage("clean", clean_clusters, ["hourly_counts"], memory_params, depends_on=[preprocess]),
+        Stage("cluster_counts", split_hourly_counts, ["hourly_counts"]),
+        Stage("train", train_clusters, [train_data, "coord_dist", "boundaries", "centroids"],
+              {**memory_params, **engine_params},
+              depends_on=[create_models, Cluster, engines, feature_store, preprocess]),
+    ], checkpoint_dir)
+
+
+def prediction_pipeline(checkpoint_dir=None, start=None, top_k=None, mass=None, horizon=HORIZON_HOURS):
+    """
+    Builds the prediction pipeline:
+    prediction frames -> predict -> aggregate -> distribute
+
+    Params:
+        checkpoint_dir: str - folder for stage checkpoints (None disables checkpointing)
+        start: pandas.Timestamp - first forecast hour (defaults to today at midnight)
+        top_k: int - keep at most this many distribution cells per cluster
+        mass: float - keep the fewest cells holding this share of each cluster's calls
+        horizon: int - number of forecast hours
+
+    Returns:
+        Pipeline - expects a 'clusters' source (trained Cluster objects)
+    """
+    start = pd.Timestamp(start) if start is not None else pd.Timestamp.today().normalize()
 
+    return Pipeline("predict", [
+        Stage("prediction_frames", create_prediction_dataframes, ["clusters"], {"start": start, "horizon": horizon},
+              depends_on=[create_prediction_df, preprocess]),
+        Stage("predict", make_predictions, ["prediction_frames", "clusters"], depends_on=[engines]),
+        Stage("aggregate", aggregate_daily_data, ["predict"]),
+        Stage("distribute", assign_call_distribution, ["aggregate", "clusters", "predict"],
+              {"top_k": top_k, "mass": mass}, depends_on=[prediction]),
+    ], checkpoint_dir)
 
-def predict_model(clusters):
+
+# ----------------------------------------------------------------------------------------------
+# Main Model Workflow
+# ----------------------------------------------------------------------------------------------
+def prepare_and_train_model(data, checkpoint_dir=None, force=False, low_memory=False,
+                            engine="xgboost", engine_overrides=None, feature_dir=None, split="time"):
+    """
+    Prepare data and train model. Stages whose inputs are unchanged since the
+    last run are loaded from checkpoint_dir instead of being recomputed.
+
+    Parameters:
+        data: Pandas dataframe
+        checkpoint_dir: str - folder for stage checkpoints (None disables checkpointing)
+        force: bool - rerun every stage
+        low_memory: bool - compact dtypes, drop raw columns and train/test copies
+        engine: str - forecasting engine, or "auto" to use Holt-Winters for low-volume clusters
+        engine_overrides: dict - key = cluster ID, value = engine for that cluster
+        feature_dir: str - train out of core from feature chunks saved in this folder
+        split: str - test rows of out-of-core training ("time" or "hash")
+    Returns:
+        clusters: List of Cluster objects
+        boundary_dict: dict - key = cluster number, value = boundary of cluster
+        cluster_index: ClusterIndex - point-to-cluster lookup
+    """
+    pipeline = training_pipeline(checkpoint_dir, low_memory=low_memory, engine=engine,
+                                 engine_overrides=engine_overrides, feature_dir=feature_dir, split=split)
+    outputs = pipeline.run(targets=["train", "boundaries", "spatial_index"], force=force, data=data)
+    pipeline.print_report()
+
+    return outputs["train"], outputs["boundaries"], outputs["spatial_index"]
+
+
+def predict_model(clusters, checkpoint_dir=None, force=False, top_k=None, mass=None, start=None,
+                  horizon=HORIZON_HOURS):
     """
     Makes predictions on each cluster model.
     
     Params:
-        predictions_dfs: pandas.DataFrames - list of empty prediction dataframes for each cluster
-        
+        clusters: Cluster - list of all clusters
+        checkpoint_dir: str - folder for stage checkpoints (None disables checkpointing)
+        force: bool - rerun every stage
+        top_k: int - keep at most this many distribution cells per cluster (None keeps all)
+        mass: float - keep the fewest cells holding this share of each cluster's calls (None keeps all)
+        start: pandas.Timestamp - first forecast hour (defaults to today at midnight)
+        horizon: int - number of forecast hours
+
+    Returns:
+        distributed_predictions_dict: dict - key = cluster ID, value = ClusterPrediction
     """
-    # Make prediction dataframes for each cluster
-    prediction_df_list = create_prediction_dataframes(clusters)
+    pipeline = prediction_pipeline(checkpoint_dir, start=start, top_k=top_k, mass=mass, horizon=horizon)
+    outputs = pipeline.run(force=force, clusters=clusters)
+    pipeline.print_report()
 
-    # Make predictions for each cluster into a dictionary.
-    print("Making predictions...\n\n")
-    final_predictions_dict = make_predictions(prediction_df_list, clusters)
+    return outputs["distribute"]
 
-    # Aggregate data into daily data into a dictionary.
-    print("Aggregating daily data...\n\n")
-    agg_predictions_dict = aggregate_daily_data(final_predictions_dict)
 
-    # Assign call distribution to each lon/lat coordinate in each cluster
-    print("Assigning call distribution...\n\n")
-    distributed_predictions_dict = assign_call_distribution(agg_predictions_dict, clusters)
+def backtest_model(data, checkpoint_dir=None, low_memory=False, folds=8, horizon=168, step=168,
+                   engine="xgboost", engine_overrides=None, workers=None):
+    """
+    Walk-forward backtest of every cluster's engine. The per-cluster feature table
+    comes from the training pipeline's 'clean' stage, so it is loaded from the
+    checkpoint written by the last training run on the same data.
+
+    Parameters:
+        data: Pandas dataframe
+        checkpoint_dir: str - folder for stage checkpoints (None disables checkpointing)
+        low_memory: bool - compact dtypes (must match training to reuse its checkpoints)
+        folds: int - number of forecast origins
+        horizon: int - forecast hours per fold
+        step: int - hours between fold origins
+        engine: str - forecasting engine, or "auto" to use Holt-Winters for low-volume clusters
+        engine_overrides: dict - key = cluster ID, value = engine for that cluster
+        workers: int - parallel fold processes (default: CPU count)
+    Returns:
+        dict - fold timings and MAE/RMSE per fold, cluster and horizon day (see backtest.backtest)
+    """
+    pipeline = training_pipeline(checkpoint_dir, low_memory=low_memory)
+    df_dict = pipeline.run(targets=["clean"], data=data)["clean"]
+    pipeline.print_report()
 
-    return distributed_predictions_dict
+    return backtest(df_dict, folds, horizon, step, engine, engine_overrides, workers)
 
 
 # ----------------------------------------------------------------------------------------------
@@ -298,33 +490,34 @@ if __name__ == "__main__":
     # Define file paths
     data_path = "backend_app/data/data.csv"
     model_folder = "backend_app/data/model"
+    checkpoint_folder = "backend_app/data/checkpoints"
     cluster_path = os.path.join(model_folder, "clusters.pkl")
 
     # Ensure model folder exists
     os.makedirs(model_folder, exist_ok=True)
 
-    # Load data
-    data = pd.read_csv(data_path)
+    # Load data (set low_memory=True for long, county-wide histories)
+    low_memory = False
+    data = read_data(data_path, low_memory)
 
     # Train models and save clusters
-    clusters, boundaries = prepare_and_train_model(data)
+    clusters, boundaries, cluster_index = prepare_and_train_model(data, checkpoint_folder, low_memory=low_memory)
 
     # Save clusters using pickle
     with open(cluster_path, "wb") as f:
         pickle.dump(clusters, f)
+    cluster_index.save(os.path.join(model_folder, "spatial_index.pkl"))
 
     # Load clusters from pickle
     with open(cluster_path, "rb") as f:
         clusters = pickle.load(f)
 
     # Run predictions
-    distributed_predictions_dict = predict_model(clusters)
+    distributed_predictions_dict = predict_model(clusters, checkpoint_folder)
 
     # Save predictions to CSV files
     output_folder = "backend_app/data/predictions"
     os.makedirs(output_folder, exist_ok=True)
 
-    for cluster_id, df in distributed_predictions_dict.items():
-        output_file = os.path.join(output_folder, f"cluster_{cluster_id}.csv")
-        df.to_csv(output_file, index=False)
-        print(f"Saved predictions for cluster {cluster_id} to {output_file}")
+    save_predictions(distributed_predictions_dict, output_folder)
+    print(f"Saved predictions for {len(distributed_predictions_dict)} clusters to {output_folder}")
@@ -0,0 +1,258 @@
+import os
+import json
+import time
+import pickle
+import hashlib
+import inspect
+import pandas as pd
+from backend_app.api.utils import metrics
+from backend_app.api.cluster_predictions import memory
+
+
+class Stage:
+    """
+    A single step of a Pipeline.
+
+    Attributes:
+        name (str): Unique stage name, also used as the checkpoint file name.
+        func (callable): Function computing the stage output. Called with the outputs
+            of `inputs` (in order) followed by `params` as keyword arguments.
+        inputs (list): Names of the sources or stages this stage reads from.
+        params (dict): Parameters passed to func. Part of the stage fingerprint.
+        depends_on (list): Functions, classes or modules func relies on. Their source is
+            part of the stage fingerprint, so changing a callee or a module constant
+            invalidates the checkpoint (only func's own source is hashed otherwise).
+        version (int): Bump to invalidate the checkpoints after a change no listed
+            source covers (e.g. a library upgrade that changes results).
+    """
+
+    def __init__(self, name, func, inputs=(), params=None, depends_on=(), version=1):
+        self.name = name
+        self.func = func
+        self.inputs = list(inputs)
+        self.params = params or {}
+        self.depends_on = list(depends_on)
+        self.version = version
+
+
+class Pipeline:
+    """
+    A small DAG runner that checkpoints the output of every stage.
+
+    Each stage is fingerprinted from its code (and the code it depends on), its version,
+    its params and the fingerprints of its inputs. A stage whose fingerprint matches the checkpoint on disk is not rerun,
+    and its output is only loaded when a later stage that must run needs it. If a
+    stage fails, every stage before it keeps its checkpoint, so the next run resumes
+    at the failed stage.
+
+    Attributes:
+        name (str): Pipeline name, used as the checkpoint sub folder.
+        stages (list): Stage objects in execution (topological) order.
+        checkpoint_dir (str): Folder for checkpoints. None disables checkpointing.
+        report (list): Per-stage report of the last run (status, seconds, peak_rss_mb, rows).
+        fingerprints (dict): Fingerprint of every source and stage in the last run.
+    """
+
+    def __init__(self, name, stages, checkpoint_dir=None):
+        self.name = name
+        self.stages = stages
+        self.checkpoint_dir = os.path.join(checkpoint_dir, name) if checkpoint_dir else None
+        self.report = []
+        self.fingerprints = {}
+
+    def run(self, targets=None, force=False, **sources):
+        """
+        Runs the pipeline, reusing checkpointed stages where possible.
+
+        Parameters:
+            targets (list, optional): Stage names whose outputs are returned.
+                Defaults to the last stage.
+            force (bool): Rerun every stage regardless of checkpoints.
+            **sources: Input values of the pipeline, keyed by name.
+
+        Returns:
+            dict: key = target name, value = stage output
+        """
+        targets = targets or [self.stages[-1].name]
+        self.report = []
+
+        # Fingerprint sources by content and stages by code, version, params and inputs
+        fingerprints = {name: fingerprint(value) for name, value in sources.items()}
+        for stage in self.stages:
+            fingerprints[stage.name] = self._stage_fingerprint(stage, fingerprints)
+        self.fingerprints = fingerprints
+
+        # Walk backwards to find which stages must run and which outputs are needed
+        needed = set(targets)
+        to_run = set()
+        for stage in reversed(self.stages):
+            if stage.name not in needed:
+                continue
+            if force or not self._is_cached(stage, fingerprints[stage.name]):
+                to_run.add(stage.name)
+                needed.update(stage.inputs)
+
+        outputs = dict(sources)
+        for stage in self.stages:
+            if stage.name not in needed:
+                self.report.append({"stage": stage.name, "status": "skipped",
+                                    "seconds": 0.0, "peak_rss_mb": None, "rows": 0})
+                continue
+
+            if stage.name not in to_run:
+                start = time.perf_counter()
+                outputs[stage.name] = self._load(stage)
+                self.report.append({"stage": stage.name, "status": "cached",
+                                    "seconds": time.perf_counter() - start, "peak_rss_mb": None, "rows": 0})
+                self._record(self.report[-1])
+                continue
+
+            outputs[stage.name] = self._run_stage(stage, outputs, fingerprints[stage.name])
+
+        return {name: outputs[name] for name in targets}
+
+    def print_report(self):
+        """
+        Prints the time and memory used by each stage of the last run.
+        """
+        print(f"Pipeline '{self.name}':")
+        for entry in self.report:
+            peak = f"{entry['peak_rss_mb']:10.1f} MB" if entry["peak_rss_mb"] is not None else f"{'-':>10}   "
+            print(f"  {entry['stage']:<20} {entry['status']:<8} "
+                  f"{entry['seconds']:8.2f}s {peak} {entry['rows']:>12} rows")
+
+    def _run_stage(self, stage, outputs, stage_fingerprint):
+        """
+        Runs a stage while measuring its time and peak RSS, then checkpoints it.
+        """
+        args = [outputs[name] for name in stage.inputs]
+        rows = sum(count_rows(arg) for arg in args)
+
+        memory.reset_peak_rss()
+        start = time.perf_counter()
+
+        try:
+            output = stage.func(*args, **stage.params)
+        except Exception:
+            self.report.append({"stage": stage.name, "status": "failed", "seconds": time.perf_counter() - start,
+                                "peak_rss_mb": memory.peak_rss_mb(), "rows": rows})
+            self._record(self.report[-1])
+            raise
+
+        self.report.append({"stage": stage.name, "status": "ran", "seconds": time.perf_counter() - start,
+                            "peak_rss_mb": memory.peak_rss_mb(), "rows": rows})
+        self._record(self.report[-1])
+        self._save(stage, output, stage_fingerprint)
+        return output
+
+    def _record(self, entry):
+        """
+        Publishes a stage report entry to the metrics registry.
+        """
+        metrics.observe_stage(self.name, entry["stage"], entry["status"], entry["seconds"], entry["rows"])
+        if entry["status"] in ("ran", "cached") and self.checkpoint_dir is not None:
+            metrics.record_cache("pipeline_checkpoint", entry["status"] == "cached")
+
+    def _stage_fingerprint(self, stage, fingerprints):
+        """
+        Hashes a stage's code and dependencies, version, params and input fingerprints.
+        """
+        h = hashlib.sha256()
+        h.update(stage.name.encode())
+        for obj in [stage.func] + stage.depends_on:
+            h.update(source(obj).encode())
+        h.update(str(stage.version).encode())
+        h.update(json.dumps(stage.params, sort_keys=True, default=str).encode())
+        for name in stage.inputs:
+            h.update(fingerprints[name].encode())
+        return h.hexdigest()
+
+    def _paths(self, stage):
+        return (os.path.join(self.checkpoint_dir, f"{stage.name}.pkl"),
+                os.path.join(self.checkpoint_dir, f"{stage.name}.json"))
+
+    def _is_cached(self, stage, stage_fingerprint):
+        if self.checkpoint_dir is None:
+            return False
+
+        data_path, meta_path = self._paths(stage)
+        if not (os.path.exists(data_path) and os.path.exists(meta_path)):
+            return False
+
+        with open(meta_path, "r") as f:
+            return json.load(f).get("fingerprint") == stage_fingerprint
+
+    def _load(self, stage):
+        data_path, _ = self._paths(stage)
+        with open(data_path, "rb") as f:
+            return pickle.load(f)
+
+    def _save(self, stage, output, stage_fingerprint):
+        """
+        Writes the stage output, then its fingerprint. The fingerprint is written last
+        so an interrupted write is never mistaken for a valid checkpoint.
+        """
+        if self.checkpoint_dir is None:
+            return
+
+        os.makedirs(self.checkpoint_dir, exist_ok=True)
+        data_path, meta_path = self._paths(stage)
+
+        if os.path.exists(meta_path):
+            os.remove(meta_path)
+
+        with open(data_path + ".tmp", "wb") as f:
+            pickle.dump(output, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(data_path + ".tmp", data_path)
+
+        with open(meta_path, "w") as f:
+            json.dump({"fingerprint": stage_fingerprint, "created": time.time()}, f)
+
+
+def source(obj):
+    """
+    Source code of a function, class or module (its qualified name if the source is unavailable).
+    """
+    try:
+        return inspect.getsource(obj)
+    except (OSError, TypeError):
+        return getattr(obj, "__qualname__", getattr(obj, "__name__", repr(obj)))
+
+
+def fingerprint(value):
+    """
+    Content hash of a pipeline source.
+
+    Params:
+        value: pandas.DataFrame, pandas.Series or any picklable object
+
+    Returns:
+        str: hex digest
+    """
+    h = hashlib.sha256()
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        h.update(pd.util.hash_pandas_object(value, index=True).values.tobytes())
+        if isinstance(value, pd.DataFrame):
+            h.update(json.dumps([str(c) for c in value.columns]).encode())
+    else:
+        h.update(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+    return h.hexdigest()
+
+
+def count_rows(value):
+    """
+    Number of DataFrame rows in a stage input (DataFrames nested in dicts/lists are summed).
+
+    Params:
+        value: stage input
+
+    Returns:
+        int
+    """
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return len(value)
+    if isinstance(value, dict):
+        return sum(count_rows(v) for v in value.values())
+    if isinstance(value, (list, tuple)):
+        return sum(count_rows(v) for v in value)
+    return 0
@@ -0,0 +1,283 @@
+import os
+import shutil
+import numpy as np
+import pandas as pd
+from backend_app.api.cluster_predictions.rollups import period_start
+
+# Globals
+COORD_DECIMALS = 3                  # Rounding of coordinates in lat_lng_dist (distribution cells, ~100 m)
+HORIZON_HOURS = 7 * 24              # Hours forecast by each prediction run
+COUNT_DECIMALS = 5                  # Rounding of predicted call counts (models predict in float32)
+
+
+class ClusterPrediction:
+    """
+    Factorized prediction for a single cluster.
+
+    Predicted call volumes are stored as a time series of cluster totals and one
+    shared coordinate distribution. Point volumes (total x distribution) are only
+    expanded for the time slice that is requested.
+
+    Attributes:
+        id (int): Cluster identification.
+        hourly (pandas.DataFrame): Predicted totals per hour.
+            - Year/Month/Day/Hour: Forecast hour.
+            - Count: Predicted calls for the cluster.
+        daily (pandas.DataFrame): Predicted totals per day.
+            - Year/Month/Day: Forecast day.
+            - Count: Predicted calls for the cluster.
+            - is_holiday/is_weekend: Calendar flags for the day.
+        lat_lng_dist (pandas.DataFrame): Shared coordinate distribution.
+            - Lat/Long: Coordinates.
+            - Distribution: Share of the cluster's call volume.
+    """
+    GRANULARITIES = {"daily": ["Year", "Month", "Day"],
+                     "hourly": ["Year", "Month", "Day", "Hour"],
+                     "weekly": ["Year", "Month", "Day"],
+                     "monthly": ["Year", "Month", "Day"]}
+
+    def __init__(self, id, hourly, daily, lat_lng_dist):
+        self.id = id
+        self.hourly = hourly
+        self.daily = daily
+        self.lat_lng_dist = lat_lng_dist
+
+    def totals(self, granularity="daily", start=None, end=None):
+        """
+        Returns the cluster totals for the given granularity.
+
+        Weekly and monthly totals are rolled up from the daily totals within
+        [start, end]. Time steps are clipped to the forecast: a day, week or month the
+        forecast only partly covers is dated by its first forecast day, and its 'Start'
+        and 'Hours' columns give the first forecast hour and the number of forecast
+        hours it sums.
+
+        Parameters:
+            granularity (str): "hourly", "daily", "weekly" or "monthly".
+            start (pandas.Timestamp, optional): First day of the slice.
+            end (pandas.Timestamp, optional): Last day of the slice.
+
+        Returns:
+            pandas.DataFrame: Time series of predicted cluster totals.
+        """
+        if granularity not in self.GRANULARITIES:
+            raise ValueError(f"Unknown granularity '{granularity}'.")
+        if granularity == "hourly":
+            totals = self.hourly.assign(Start=pd.to_datetime(self.hourly[["Year", "Month", "Day", "Hour"]]), Hours=1)
+        else:
+            totals = self.daily.assign(**self._day_coverage())
+
+        if start is not None and end is not None:
+            dates = totals["Start"].dt.normalize()
+            totals = totals[(dates >= start) & (dates <= end)]
+
+        if granularity in ("weekly", "monthly"):
+            periods = period_start(totals["Start"], granularity)
+            totals = (totals.groupby(periods.rename("Period"))
+                      .agg(Start=("Start", "min"), Count=("Count", "sum"), Hours=("Hours", "sum")).reset_index())
+            totals["Count"] = totals["Count"].round(COUNT_DECIMALS)
+            totals["Year"] = totals["Start"].dt.year
+            totals["Month"] = totals["Start"].dt.month
+            totals["Day"] = totals["Start"].dt.day
+            totals = totals[["Year", "Month", "Day", "Count", "Start", "Hours"]]
+
+        return totals
+
+    def _day_coverage(self):
+        """
+        First forecast hour and number of forecast hours of each daily total (a whole day
+        unless the forecast starts or ends within it, or no hourly totals were saved).
+        """
+        days = pd.to_datetime(self.daily[["Year", "Month", "Day"]])
+        if self.hourly.empty:
+            return {"Start": days, "Hours": 24}
+        hours = self.hourly.groupby(["Year", "Month", "Day"])["Hour"].agg(["min", "size"])
+        coverage = self.daily[["Year", "Month", "Day"]].merge(hours, left_on=["Year", "Month", "Day"],
+                                                            right_index=True, how="left")
+        return {"Start": days + pd.to_timedelta(coverage["min"].fillna(0).to_numpy(), unit="h"),
+                "Hours": coverage["size"].fillna(24).astype(int).to_numpy()}
+
+    def expand(self, start=None, end=None, granularity="daily"):
+        """
+        Expands the factorized prediction into per-coordinate volumes.
+
+        Only the totals within [start, end] (whole days, inclusive) are multiplied
+        out against the distribution.
+
+        Parameters:
+            start (pandas.Timestamp, optional): First day of the slice.
+            end (pandas.Timestamp, optional): Last day of the slice.
+            granularity (str): "hourly", "daily", "weekly" or "monthly".
+
+        Returns:
+            pandas.DataFrame: One row per (time, coordinate) with columns
+            Year, Month, Day, (Hour), Cluster_Count, Lat, Long, Cluster, Count, Distribution.
+        """
+        time_cols = self.GRANULARITIES[granularity]
+        totals = self.totals(granularity, start, end)
+
+        counts = totals["Count"].to_numpy(dtype=float)
+        dist = self.lat_lng_dist["Distribution"].to_numpy(dtype=float)
+        n_times, n_points = len(counts), len(dist)
+
+        # Outer product gives the volume for every (time, coordinate) pair
+        expanded = {col: np.repeat(totals[col].to_numpy(), n_points) for col in time_cols}
+        expanded["Cluster_Count"] = np.repeat(counts, n_points)
+        expanded["Lat"] = np.tile(self.lat_lng_dist["Lat"].to_numpy(), n_times)
+        expanded["Long"] = np.tile(self.lat_lng_dist["Long"].to_numpy(), n_times)
+        expanded["Cluster"] = self.id
+        expanded["Count"] = np.outer(counts, dist).ravel()
+        expanded["Distribution"] = np.tile(dist, n_times)
+
+        return pd.DataFrame(expanded)
+
+    def save(self, folder):
+        """
+        Saves the totals and distribution as CSV files in the given folder.
+
+        Parameters:
+            folder (str): Predictions folder.
+        """
+        self.hourly.to_csv(os.path.join(folder, f"cluster_{self.id}_hourly.csv"), index=False)
+        self.daily.to_csv(os.path.join(folder, f"cluster_{self.id}_daily.csv"), index=False)
+        self.lat_lng_dist.to_csv(os.path.join(folder, f"cluster_{self.id}_dist.csv"), index=False)
+
+    @classmethod
+    def load(cls, folder, cluster_id):
+        """
+        Loads a saved prediction from the given folder.
+
+        Parameters:
+            folder (str): Predictions folder.
+            cluster_id (int): Cluster identification.
+
+        Returns:
+            ClusterPrediction: The loaded prediction.
+        """
+        hourly = pd.read_csv(os.path.join(folder, f"cluster_{cluster_id}_hourly.csv"))
+        daily = pd.read_csv(os.path.join(folder, f"cluster_{cluster_id}_daily.csv"))
+        lat_lng_dist = pd.read_csv(os.path.join(folder, f"cluster_{cluster_id}_dist.csv"))
+        return cls(cluster_id, hourly, daily, lat_lng_dist)
+
+
+def prune_distribution(lat_lng_dist, top_k=None, mass=None):
+    """
+    Drops the long tail of a cluster's coordinate distribution. The pruned share is
+    redistributed over the kept cells in proportion to their shares.
+
+    Params:
+        lat_lng_dist: pandas.DataFrame - 'Lat', 'Long' and 'Distribution' columns
+        top_k: int - keep at most this many cells (None keeps every cell)
+        mass: float - keep the fewest cells holding this share of the calls (None keeps every cell)
+
+    Returns:
+        pandas.DataFrame - kept cells sorted by coordinate, with distributions summing to 1
+    """
+    if (top_k is None and mass is None) or lat_lng_dist.empty:
+        return lat_lng_dist
+
+    # Busiest cells first (ties in coordinate order, so pruning is deterministic)
+    ranked = lat_lng_dist.sort_values(["Distribution", "Lat", "Long"], ascending=[False, True, True], kind="stable")
+    keep = len(ranked)
+    if mass is not None:
+        cumulative = ranked["Distribution"].cumsum().to_numpy() / ranked["Distribution"].sum()
+        keep = min(keep, int(np.searchsorted(cumulative, mass - 1e-12)) + 1)
+    if top_k is not None:
+        keep = min(keep, top_k)
+
+    kept = ranked.iloc[:keep].sort_values(["Lat", "Long"]).reset_index(drop=True)
+    kept["Distribution"] = kept["Distribution"] / kept["Distribution"].sum()
+    return kept
+
+
+def save_predictions(predictions, folder):
+    """
+    Saves every cluster prediction into the predictions folder.
+
+    Params:
+        predictions: dict - key = cluster ID, value = ClusterPrediction
+        folder: str - predictions folder
+    """
+    for prediction in predictions.values():
+        prediction.save(folder)
+
+
+def load_predictions(folder):
+    """
+    Loads every cluster prediction saved in the predictions folder.
+
+    Params:
+        folder: str - predictions folder
+
+    Returns:
+        predictions: dict - key = cluster ID, value = ClusterPrediction
+    """
+    predictions = {}
+    for file in sorted(os.listdir(folder)):
+        if file.startswith("cluster_") and file.endswith("_dist.csv"):
+            cluster_id = int(file.split("_")[1])
+            predictions[cluster_id] = ClusterPrediction.load(folder, cluster_id)
+    return predictions
+
+
+def clear_predictions(folder):
+    """
+    Deletes every saved cluster prediction file in the predictions folder.
+
+    Params:
+        folder: str - predictions folder
+    """
+    for file in os.listdir(folder):
+        if file.startswith("cluster_") and file.endswith(".csv"):
+            os.remove(os.path.join(folder, file))
+
+
+# Subfolder of the predictions folder holding recently published prediction sets
+HISTORY_FOLDER = "history"
+
+
+def archive_predictions(predictions, folder, version, keep):
+    """
+    Saves a published prediction set under folder/history/<version> and deletes all but
+    the `keep` most recently archived sets.
+
+    Params:
+        predictions: dict - key = cluster ID, value = ClusterPrediction
+        folder: str - predictions folder
+        version: str - version ID of the prediction set
+        keep: int - number of archived sets to keep
+    """
+    history = os.path.join(folder, HISTORY_FOLDER)
+    target = os.path.join(history, version)
+    if not os.path.isdir(target):
+        tmp_target = target + ".tmp"
+        shutil.rmtree(tmp_target, ignore_errors=True)
+        os.makedirs(tmp_target)
+        save_predictions(predictions, tmp_target)
+        os.replace(tmp_target, target)
+    else:
+        os.utime(target)
+
+    archived = sorted((entry for entry in os.scandir(history) if entry.is_dir() and not entry.name.endswith(".tmp")),
+                      key=lambda entry: entry.stat().st_mtime_ns, reverse=True)
+    for entry in archived[keep:]:
+        shutil.rmtree(entry.path, ignore_errors=True)
+
+
+def load_archived_predictions(folder, version):
+    """
+    Loads an archived prediction set.
+
+    Params:
+        folder: str - predictions folder
+        version: str - version ID of the prediction set
+
+    Returns:
+        dict - key = cluster ID, value = ClusterPrediction, or None if the set is no longer archived
+    """
+    if not version.isalnum():
+        return None
+    target = os.path.join(folder, HISTORY_FOLDER, version)
+    if not os.path.isdir(target):
+        return None
+    return load_predictions(target)
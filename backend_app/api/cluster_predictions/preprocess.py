@@ -1,6 +1,5 @@
 import numpy as np
 import pandas as pd
-from sklearn.cluster import KMeans
 from pandas.tseries.holiday import USFederalHolidayCalendar
 
 # GLOBALS
@@ -10,30 +9,70 @@ COLS_TO_DROP = ['Unique ID', 'Nature Code', 'Street Address',
                 'Shift', 'Battalion', 'Division', 'DispatchNature',
                 'CauseCategory']
 
+# Compact dtypes for the engineered features (see clean)
+LOW_MEMORY_DTYPES = {'Year': 'int16', 'Month': 'int8', 'Day': 'int8', 'Hour': 'int8',
+                     'Day_of_Week': 'int8', 'is_holiday': 'int8', 'is_weekend': 'int8',
+                     'Hour_sin': 'float32', 'Hour_cos': 'float32', 'Day_sin': 'float32',
+                     'Day_cos': 'float32', 'Month_sin': 'float32', 'Month_cos': 'float32'}
 
-def data_import(df: pd.DataFrame) -> pd.DataFrame:
+# Columns of the raw CSV used by the model workflow
+USE_COLS = ['CauseCategory', 'Dispatched', 'Latitude', 'Longitude']
+
+
+def read_data(path: str, low_memory: bool = False) -> pd.DataFrame:
+    """
+    Read call data from CSV
+
+    Args:
+        path: path to the call data CSV
+        low_memory: only read the columns the model uses, with compact dtypes
+
+    Returns:
+        df: raw call data
+    """
+    if not low_memory:
+        return pd.read_csv(path)
+
+    return pd.read_csv(
+        path,
+        usecols=USE_COLS,
+        dtype={'CauseCategory': 'category', 'Latitude': 'float32', 'Longitude': 'float32'}
+    )
+
+
+def data_import(df: pd.DataFrame, low_memory: bool = False) -> pd.DataFrame:
     """
     Import data from CSV
+
+    In low memory mode only 'Dispatched', 'Latitude' and 'Longitude' are kept
+    (coordinates as float32) and the 'Date' column is not created.
     """
     # Get EMS data
-    ems_df = df[df['CauseCategory'] == 'EMS'].reset_index(drop=True)
+    is_ems = df['CauseCategory'] == 'EMS'
+    if low_memory:
+        ems_df = df.loc[is_ems, ['Dispatched', 'Latitude', 'Longitude']].reset_index(drop=True)
+        ems_df = ems_df.astype({'Latitude': 'float32', 'Longitude': 'float32'})
+    else:
+        ems_df = df[is_ems].reset_index(drop=True)
 
     # Convert 'Dispatched' column to datetime format
     ems_df['Dispatched'] = pd.to_datetime(ems_df['Dispatched'])
 
     # Get Date from 'Dispatched'
-    ems_df['Date'] = ems_df['Dispatched'].dt.date
+    if not low_memory:
+        ems_df['Date'] = ems_df['Dispatched'].dt.date
 
     print("Data imported - filtered to EMS")
     return ems_df
 
 
-def clean(df: pd.DataFrame) -> pd.DataFrame:
+def clean(df: pd.DataFrame, low_memory: bool = False) -> pd.DataFrame:
     """
     Cleans up dataframe by dropping unnecessary columns, renaming column names, adding dummy categories, and updating date/time with cyclical info
 
     Args:
         df: pandas Dataframe for EMS calls
+        low_memory: store calendar fields as small integers and cyclical features as float32
     
     Returns:
         df: updated dataframe
@@ -66,24 +105,31 @@ def clean(df: pd.DataFrame) -> pd.DataFrame:
     df['Month_sin'] = np.sin(2 * np.pi * df['Month'] / 12)
     df['Month_cos'] = np.cos(2 * np.pi * df['Month'] / 12)
 
+    if low_memory:
+        df = df.astype(LOW_MEMORY_DTYPES)
+
     return df
 
 
-def k_means(df: pd.DataFrame, num_clusters: int):
+def k_means(df: pd.DataFrame, num_clusters: int, low_memory: bool = False):
     """
     Group coordinates into clusters using K-Means
 
     Params:
         df: pandas.DataFrame - set of all coordinates in historical data
         num_cluster: int - number of clusters to group coordinates by
+        low_memory: bool - store cluster IDs as a categorical column
     
     Returns:
         df: panadas.DataFrame - original df with additional 'Clusters' column
     """
+    # Imported here so reading and cleaning calls does not load scikit-learn
+    from sklearn.cluster import KMeans
+
     cluster_df = df[['Latitude', 'Longitude']]
     model = KMeans(n_clusters=num_clusters)
     y_kmeans = model.fit_predict(cluster_df)
-    df['Cluster'] = y_kmeans
+    df['Cluster'] = pd.Categorical(y_kmeans) if low_memory else y_kmeans
 
     print(f"{num_clusters} clusters created")
     return df
@@ -100,7 +146,7 @@ def split_by_cluster(df):
     Returns:
         dfs: dict - dictionary where key = cluster id, value = cluster's data
     """
-    dfs = {key: value for key, value in df.groupby('Cluster')}
+    dfs = {key: value for key, value in df.groupby('Cluster', observed=True)}
     return dfs
 
 
@@ -0,0 +1,123 @@
+import pandas as pd
+
+# Time steps from finest to coarsest
+GRANULARITIES = ["hourly", "daily", "weekly", "monthly"]
+
+# Precomputed rollups of historical calls
+CALL_ROLLUPS = ["daily", "weekly", "monthly"]
+
+# Rounding of coordinates in the historical rollups (~1 km). Coarser than the forecast
+# distribution cells, since rollups keep every cell with a call in every period.
+ROLLUP_DECIMALS = 2
+
+# Time steps choose_granularity aims for over a range (a week of daily points, a quarter of
+# weekly points, a year of monthly points)
+MIN_PERIODS = 7
+
+
+def period_start(timestamps, granularity):
+    """
+    First instant of the period containing each timestamp (weeks start on Monday).
+
+    Params:
+        timestamps: pandas.Series - datetimes
+        granularity: str - one of GRANULARITIES
+
+    Returns:
+        pandas.Series - period starts
+    """
+    timestamps = pd.to_datetime(timestamps)
+    if granularity == "hourly":
+        return timestamps.dt.floor("h")
+    days = timestamps.dt.normalize()
+    if granularity == "daily":
+        return days
+    if granularity == "weekly":
+        return days - pd.to_timedelta(days.dt.weekday, unit="D")
+    if granularity == "monthly":
+        return days - pd.to_timedelta(days.dt.day - 1, unit="D")
+    raise ValueError(f"Unknown granularity '{granularity}'.")
+
+
+def period_range(start, end, granularity):
+    """
+    Widens [start, end] (whole days) to whole periods.
+
+    Returns:
+        tuple - (first period start, last day of the last period)
+    """
+    first = period_start(pd.Series([pd.Timestamp(start)]), granularity).iloc[0]
+    last = period_start(pd.Series([pd.Timestamp(end)]), granularity).iloc[0]
+    if granularity == "weekly":
+        last = last + pd.Timedelta(days=6)
+    elif granularity == "monthly":
+        last = last + pd.offsets.MonthEnd(0)
+    return first, last
+
+
+def count_periods(start, end, granularity):
+    """
+    Number of periods of a granularity touched by [start, end] (whole days).
+    """
+    first, last = period_range(start, end, granularity)
+    step = {"hourly": "h", "daily": "D", "weekly": "W-MON", "monthly": "MS"}[granularity]
+    if granularity == "hourly":
+        last = last + pd.Timedelta(hours=23)
+    return len(pd.date_range(first, last, freq=step))
+
+
+def choose_granularity(start, end, max_points, count_points=None, options=GRANULARITIES, min_periods=MIN_PERIODS):
+    """
+    Coarsest granularity that still splits [start, end] into at least min_periods time
+    steps and whose output fits the point budget. Short ranges that no option splits
+    that finely get the finest granularity that fits.
+
+    Params:
+        start: pandas.Timestamp - first day
+        end: pandas.Timestamp - last day
+        max_points: int - maximum number of points in the response
+        count_points: callable - number of output points of a granularity
+            (default one point per time step)
+        options: list - allowed granularities, finest first
+        min_periods: int - time steps wanted over the range
+
+    Returns:
+        str - granularity (the coarsest option if none fits the budget)
+    """
+    count_points = count_points or (lambda granularity: count_periods(start, end, granularity))
+    fitting = [granularity for granularity in options if count_points(granularity) <= max_points]
+    if not fitting:
+        return options[-1]
+    for granularity in reversed(fitting):
+        if count_periods(start, end, granularity) >= min_periods:
+            return granularity
+    return fitting[0]
+
+
+def rollup_calls(df, decimals=None, granularities=CALL_ROLLUPS):
+    """
+    Counts calls per period, cluster and rounded coordinate.
+
+    Params:
+        df: pandas.DataFrame - calls with 'Dispatched', 'Latitude', 'Longitude' and 'Cluster'
+        decimals: int - rounding of the coordinates (default ROLLUP_DECIMALS)
+        granularities: list - rollups to compute
+
+    Returns:
+        pandas.DataFrame - 'Granularity', 'Period', 'Cluster', 'Lat', 'Long' and 'Count' columns
+    """
+    decimals = ROLLUP_DECIMALS if decimals is None else decimals
+    cells = pd.DataFrame({
+        "Cluster": df["Cluster"].to_numpy(),
+        "Lat": df["Latitude"].astype(float).round(decimals).to_numpy(),
+        "Long": df["Longitude"].astype(float).round(decimals).to_numpy(),
+    })
+    dispatched = pd.to_datetime(df["Dispatched"]).reset_index(drop=True)
+
+    frames = []
+    for granularity in granularities:
+        counts = (cells.assign(Period=period_start(dispatched, granularity))
+                  .groupby(["Period", "Cluster", "Lat", "Long"], observed=True).size().reset_index(name="Count"))
+        counts.insert(0, "Granularity", granularity)
+        frames.append(counts)
+    return pd.concat(frames, ignore_index=True)
@@ -0,0 +1,126 @@
+import pickle
+import numpy as np
+from scipy.spatial import cKDTree
+
+
+class ClusterIndex:
+    """
+    Point-to-cluster lookup built from the k-means centroids at training time.
+
+    A point belongs to the cluster of its nearest centroid. Inside the training area
+    points are looked up in a precomputed grid; a grid cell only holds a cluster when
+    all four of its corners share the same nearest centroid (Voronoi regions are
+    convex, so the whole cell does too). Points in mixed cells or outside the grid
+    fall back to a KD-tree query over the centroids.
+
+    Attributes:
+        ids (numpy.ndarray): Cluster ID of every centroid.
+        centers (numpy.ndarray): Centroids as (latitude, longitude) rows.
+        tree (scipy.spatial.cKDTree): KD-tree over the centroids.
+        origin (tuple): (latitude, longitude) of the grid's lower left corner.
+        resolution (float): Grid cell size in degrees.
+        grid (numpy.ndarray): Index into ids for every cell, -1 where the cell is mixed.
+    """
+
+    def __init__(self, centroids, bounds, resolution=0.005):
+        """
+        Params:
+            centroids: dict - key = cluster ID, value = [latitude, longitude]
+            bounds: tuple - (min latitude, max latitude, min longitude, max longitude) covered by the grid
+            resolution: float - grid cell size in degrees
+        """
+        self.ids = np.array(sorted(centroids), dtype=np.int64)
+        self.centers = np.array([centroids[cluster_id] for cluster_id in self.ids], dtype=float)
+        self.tree = cKDTree(self.centers)
+        self.resolution = resolution
+
+        min_lat, max_lat, min_lng, max_lng = bounds
+        self.origin = (min_lat, min_lng)
+        n_lat = max(int(np.ceil((max_lat - min_lat) / resolution)), 1)
+        n_lng = max(int(np.ceil((max_lng - min_lng) / resolution)), 1)
+
+        # Nearest centroid of every grid corner
+        corner_lat = min_lat + np.arange(n_lat + 1) * resolution
+        corner_lng = min_lng + np.arange(n_lng + 1) * resolution
+        lat_grid, lng_grid = np.meshgrid(corner_lat, corner_lng, indexing="ij")
+        _, corners = self.tree.query(np.column_stack([lat_grid.ravel(), lng_grid.ravel()]))
+        corners = corners.reshape(n_lat + 1, n_lng + 1)
+
+        # A cell is unambiguous when its four corners agree
+        cell = corners[:-1, :-1]
+        same = (cell == corners[1:, :-1]) & (cell == corners[:-1, 1:]) & (cell == corners[1:, 1:])
+        self.grid = np.where(same, cell, -1).astype(np.int16)
+
+    @classmethod
+    def build(cls, centroids, latitudes, longitudes, resolution=0.005):
+        """
+        Builds the index over the bounding box of the training coordinates.
+
+        Params:
+            centroids: dict - key = cluster ID, value = [latitude, longitude]
+            latitudes: array-like - training latitudes
+            longitudes: array-like - training longitudes
+            resolution: float - grid cell size in degrees
+
+        Returns:
+            ClusterIndex
+        """
+        latitudes = np.asarray(latitudes, dtype=float)
+        longitudes = np.asarray(longitudes, dtype=float)
+        bounds = (latitudes.min(), latitudes.max(), longitudes.min(), longitudes.max())
+        return cls(centroids, bounds, resolution)
+
+    def assign(self, latitudes, longitudes):
+        """
+        Cluster of every point (vectorized).
+
+        Params:
+            latitudes: array-like - point latitudes
+            longitudes: array-like - point longitudes
+
+        Returns:
+            numpy.ndarray - cluster ID of every point
+        """
+        latitudes = np.asarray(latitudes, dtype=float)
+        longitudes = np.asarray(longitudes, dtype=float)
+
+        # Grid lookup
+        rows = np.floor((latitudes - self.origin[0]) / self.resolution).astype(np.int64)
+        cols = np.floor((longitudes - self.origin[1]) / self.resolution).astype(np.int64)
+        inside = (rows >= 0) & (rows < self.grid.shape[0]) & (cols >= 0) & (cols < self.grid.shape[1])
+
+        positions = np.full(len(latitudes), -1, dtype=np.int64)
+        positions[inside] = self.grid[rows[inside], cols[inside]]
+
+        # KD-tree for mixed cells and points outside the grid
+        unresolved = positions < 0
+        if unresolved.any():
+            _, positions[unresolved] = self.tree.query(
+                np.column_stack([latitudes[unresolved], longitudes[unresolved]]))
+
+        return self.ids[positions]
+
+    @staticmethod
+    def cells(latitudes, longitudes, decimals):
+        """
+        Distribution cell (rounded coordinate, as in coord_dist) of every point.
+
+        Params:
+            latitudes: array-like - point latitudes
+            longitudes: array-like - point longitudes
+            decimals: int - rounding of the distribution coordinates
+
+        Returns:
+            tuple - (rounded latitudes, rounded longitudes) as numpy.ndarray
+        """
+        return (np.round(np.asarray(latitudes, dtype=float), decimals),
+                np.round(np.asarray(longitudes, dtype=float), decimals))
+
+    def save(self, path):
+        with open(path, "wb") as f:
+            pickle.dump(self, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as f:
+            return pickle.load(f)
@@ -0,0 +1,66 @@
+import asyncio
+
+
+class VersionWatcher:
+    """
+    Watches the published model and prediction versions for server-sent events.
+
+    One watcher runs per process. While clients are subscribed, a single task reads
+    the version files every `interval` seconds and wakes every subscriber when one
+    changes, so the cost does not grow with the number of open connections. Versions
+    are written to disk by whichever worker trains or predicts, so every process sees
+    every change.
+
+    Attributes:
+        read: callable - returns {region name: version dict} (blocking, run via offload)
+        offload: coroutine function - runs a blocking function off the event loop
+        interval: float - seconds between reads
+        versions: dict - last read versions
+    """
+
+    def __init__(self, read, offload, interval=2.0):
+        self.read = read
+        self.offload = offload
+        self.interval = interval
+        self.versions = {}
+        self._changed = None
+        self._task = None
+        self._subscribers = 0
+
+    async def subscribe(self):
+        """
+        Registers a subscriber and returns the current versions.
+        """
+        self._subscribers += 1
+        if self._task is None or self._task.done():
+            self._changed = asyncio.Event()
+            self.versions = await self.offload(self.read)
+            self._task = asyncio.ensure_future(self._poll())
+        return self.versions
+
+    def unsubscribe(self):
+        self._subscribers -= 1
+
+    async def wait(self, timeout):
+        """
+        Waits until the versions change or the timeout expires.
+
+        Returns:
+            dict - current versions
+        """
+        changed = self._changed
+        try:
+            await asyncio.wait_for(asyncio.shield(changed.wait()), timeout)
+        except asyncio.TimeoutError:
+            pass
+        return self.versions
+
+    async def _poll(self):
+        while self._subscribers > 0:
+            await asyncio.sleep(self.interval)
+            versions = await self.offload(self.read)
+            if versions != self.versions:
+                self.versions = versions
+                # Wake everyone waiting on the old event, later waits use a new one
+                changed, self._changed = self._changed, asyncio.Event()
+                changed.set()
@@ -0,0 +1,59 @@
+import json
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from backend_app.api import regions
+from backend_app.api.views import CallDataChanged, load_training_data
+
+
+class Command(BaseCommand):
+    help = ("Walk-forward backtest of a region's forecasting engines: MAE/RMSE per cluster and "
+            "forecast day over rolling forecast origins, with the wall time of each fold.")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--region", default=None, help="region ID (default settings.FORECAST_DEFAULT_REGION)")
+        parser.add_argument("--folds", type=int, default=8, help="number of forecast origins")
+        parser.add_argument("--horizon", type=int, default=168, help="forecast hours per fold")
+        parser.add_argument("--step", type=int, default=168, help="hours between forecast origins")
+        parser.add_argument("--engine", default=None, help="engine name or 'auto' (default settings.FORECAST_ENGINE)")
+        parser.add_argument("--workers", type=int, default=None, help="parallel fold processes (default: CPU count)")
+        parser.add_argument("--out", default=None, help="write the full report as JSON to this path")
+
+    def handle(self, *args, **options):
+        try:
+            region = regions.get_region(options["region"])
+        except regions.UnknownRegion as e:
+            raise CommandError(str(e))
+        if options["folds"] < 1 or options["horizon"] < 1 or options["step"] < 1:
+            raise CommandError("--folds, --horizon and --step must be positive")
+
+        try:
+            data = load_training_data(region)
+        except CallDataChanged as e:
+            raise CommandError(str(e))
+        if data is None or data.empty:
+            raise CommandError(f"No call data for region '{region.name}'")
+
+        from backend_app.api.cluster_predictions import model
+        report = model.backtest_model(
+            data, region.checkpoint_folder, low_memory=settings.FORECAST_LOW_MEMORY,
+            folds=options["folds"], horizon=options["horizon"], step=options["step"],
+            engine=options["engine"] or settings.FORECAST_ENGINE,
+            engine_overrides=None if options["engine"] else settings.FORECAST_ENGINE_OVERRIDES,
+            workers=options["workers"])
+
+        self.stdout.write(f"{'cluster':>7} {'engine':<13} {'day':>3} {'MAE':>8} {'RMSE':>8}")
+        for row in report["horizons"]:
+            engine = next(c["engine"] for c in report["clusters"] if c["cluster"] == row["cluster"])
+            self.stdout.write(f"{row['cluster']:>7} {engine:<13} {row['horizon_day']:>3} {row['mae']:>8} {row['rmse']:>8}")
+        for row in report["clusters"]:
+            self.stdout.write(f"{row['cluster']:>7} {row['engine']:<13} {'all':>3} {row['mae']:>8} {row['rmse']:>8}")
+
+        seconds = [fold["seconds"] for fold in report["folds"]]
+        self.stdout.write(f"\n{len(seconds)} folds: {min(seconds)}-{max(seconds)} s per fold "
+                          f"(total {sum(seconds):.1f} s), wall time {report['seconds']} s")
+
+        if options["out"]:
+            with open(options["out"], "w") as f:
+                json.dump(report, f, indent=2)
+            self.stdout.write(f"Report saved to {options['out']}")
+        self.stdout.write(self.style.SUCCESS(f"Backtested {len(report['clusters'])} clusters of region '{region.name}'"))
@@ -0,0 +1,32 @@
+import os
+from django.core.management.base import BaseCommand, CommandError
+from backend_app.api import regions, store
+from backend_app.api.utils import versions
+from backend_app.api.cluster_predictions.preprocess import read_data
+
+
+class Command(BaseCommand):
+    help = "Import call data from a CSV file (default: the region's data.csv) into the SQLite store."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", nargs="?", default=None)
+        parser.add_argument("--region", default=None, help="region ID (default settings.FORECAST_DEFAULT_REGION)")
+        parser.add_argument("--replace", action="store_true", help="delete the region's existing calls first")
+
+    def handle(self, *args, **options):
+        try:
+            region = regions.get_region(options["region"])
+        except regions.UnknownRegion as e:
+            raise CommandError(str(e))
+
+        path = options["path"] or region.data_path
+        if not os.path.exists(path):
+            raise CommandError(f"Call data file not found: {path}")
+
+        df = read_data(path, low_memory=True)
+        if os.path.abspath(path) == os.path.abspath(region.data_path):
+            # Recorded so training knows the store matches data.csv (see views.load_training_data)
+            count = store.import_calls(df, region.name, versions.file_digest(path), replace=options["replace"])
+        else:
+            count = store.ingest_calls(df, region.name, replace=options["replace"])
+        self.stdout.write(self.style.SUCCESS(f"Imported {count} calls from {path} into region '{region.name}'"))
@@ -0,0 +1,60 @@
+# Generated by Django 5.1.2 on 2026-10-19 07:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0002_delete_callrecord_delete_prediction'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CallRecord',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('timestamp', models.DateTimeField()),
+                ('emergency_type', models.CharField(max_length=255)),
+                ('latitude', models.FloatField()),
+                ('longitude', models.FloatField()),
+                ('dispatch_time', models.DateTimeField()),
+                ('response_time', models.DateTimeField(blank=True, null=True)),
+                ('arrival_time', models.DateTimeField(blank=True, null=True)),
+                ('date', models.DateField()),
+                ('cluster', models.SmallIntegerField(blank=True, null=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['cluster', 'date'], name='call_cluster_date_idx'), models.Index(fields=['latitude', 'longitude', 'date'], name='call_lat_lng_date_idx'), models.Index(fields=['emergency_type', 'date'], name='call_type_date_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='Prediction',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('cluster', models.SmallIntegerField()),
+                ('granularity', models.CharField(choices=[('daily', 'Daily'), ('hourly', 'Hourly')], max_length=6)),
+                ('timestamp', models.DateTimeField()),
+                ('date', models.DateField()),
+                ('predicted_calls', models.FloatField()),
+                ('is_holiday', models.BooleanField(default=False)),
+                ('is_weekend', models.BooleanField(default=False)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['cluster', 'date'], name='prediction_cluster_date_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='PredictionDistribution',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('cluster', models.SmallIntegerField()),
+                ('latitude', models.FloatField()),
+                ('longitude', models.FloatField()),
+                ('distribution', models.FloatField()),
+            ],
+            options={
+                'indexes': [models.Index(fields=['cluster'], name='distribution_cluster_idx')],
+            },
+        ),
+    ]
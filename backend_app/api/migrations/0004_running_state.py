@@ -0,0 +1,38 @@
+# Generated by Django 5.1.2 on 2026-10-19 07:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0003_callrecord_prediction_store'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CoordinateCount',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('cluster', models.SmallIntegerField()),
+                ('latitude', models.FloatField()),
+                ('longitude', models.FloatField()),
+                ('count', models.IntegerField(default=0)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('cluster', 'latitude', 'longitude'), name='coordinate_count_cell_uniq')],
+            },
+        ),
+        migrations.CreateModel(
+            name='HourlyCount',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('cluster', models.SmallIntegerField()),
+                ('hour', models.DateTimeField()),
+                ('count', models.IntegerField(default=0)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('cluster', 'hour'), name='hourly_count_cluster_hour_uniq')],
+            },
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.1.2 on 2026-10-19 07:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0004_running_state'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CallRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('granularity', models.CharField(choices=[('daily', 'Daily'), ('weekly', 'Weekly'), ('monthly', 'Monthly')], max_length=7)),
+                ('period', models.DateField()),
+                ('cluster', models.SmallIntegerField()),
+                ('latitude', models.FloatField()),
+                ('longitude', models.FloatField()),
+                ('count', models.IntegerField(default=0)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('granularity', 'period', 'cluster', 'latitude', 'longitude'), name='call_rollup_cell_uniq')],
+            },
+        ),
+    ]
@@ -0,0 +1,113 @@
+# Generated by Django 5.1.2 on 2026-10-19 07:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0005_call_rollups'),
+    ]
+
+    operations = [
+        migrations.RemoveConstraint(
+            model_name='callrollup',
+            name='call_rollup_cell_uniq',
+        ),
+        migrations.RemoveConstraint(
+            model_name='coordinatecount',
+            name='coordinate_count_cell_uniq',
+        ),
+        migrations.RemoveConstraint(
+            model_name='hourlycount',
+            name='hourly_count_cluster_hour_uniq',
+        ),
+        migrations.RemoveIndex(
+            model_name='callrecord',
+            name='call_cluster_date_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='callrecord',
+            name='call_lat_lng_date_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='callrecord',
+            name='call_type_date_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='prediction',
+            name='prediction_cluster_date_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='predictiondistribution',
+            name='distribution_cluster_idx',
+        ),
+        migrations.AddField(
+            model_name='callrecord',
+            name='region',
+            field=models.CharField(default='charlotte', max_length=32),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='callrollup',
+            name='region',
+            field=models.CharField(default='charlotte', max_length=32),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='coordinatecount',
+            name='region',
+            field=models.CharField(default='charlotte', max_length=32),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='hourlycount',
+            name='region',
+            field=models.CharField(default='charlotte', max_length=32),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='prediction',
+            name='region',
+            field=models.CharField(default='charlotte', max_length=32),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='predictiondistribution',
+            name='region',
+            field=models.CharField(default='charlotte', max_length=32),
+            preserve_default=False,
+        ),
+        migrations.AddIndex(
+            model_name='callrecord',
+            index=models.Index(fields=['region', 'cluster', 'date'], name='call_region_cluster_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='callrecord',
+            index=models.Index(fields=['region', 'latitude', 'longitude', 'date'], name='call_region_lat_lng_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='callrecord',
+            index=models.Index(fields=['region', 'emergency_type', 'date'], name='call_region_type_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='prediction',
+            index=models.Index(fields=['region', 'cluster', 'date'], name='prediction_region_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='predictiondistribution',
+            index=models.Index(fields=['region', 'cluster'], name='distribution_region_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='callrollup',
+            constraint=models.UniqueConstraint(fields=('region', 'granularity', 'period', 'cluster', 'latitude', 'longitude'), name='call_rollup_region_cell_uniq'),
+        ),
+        migrations.AddConstraint(
+            model_name='coordinatecount',
+            constraint=models.UniqueConstraint(fields=('region', 'cluster', 'latitude', 'longitude'), name='coordinate_count_region_cell_uniq'),
+        ),
+        migrations.AddConstraint(
+            model_name='hourlycount',
+            constraint=models.UniqueConstraint(fields=('region', 'cluster', 'hour'), name='hourly_count_region_hour_uniq'),
+        ),
+    ]
@@ -0,0 +1,16 @@
+# Generated by Django 5.1.2 on 2026-10-19 08:43
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0006_region'),
+    ]
+
+    operations = [
+        migrations.DeleteModel(
+            name='HourlyCount',
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.1.2 on 2026-10-19 09:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0007_delete_hourlycount'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CallImport',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('region', models.CharField(max_length=32, unique=True)),
+                ('digest', models.CharField(max_length=64)),
+                ('calls', models.CharField(max_length=64)),
+                ('imported_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
@@ -1,7 +1,127 @@
 from django.db import models
 
 # ----------------------------------------------------------------------------------------------
-# If we decide to use an SQL database, this is a base setup for our SQL model.
+# SQLite storage for call history and published predictions (see store.py).
+# Every row belongs to a region (settings.FORECAST_REGIONS, see regions.py).
 # ----------------------------------------------------------------------------------------------
 
 # Table that holds all of our current data
+class CallRecord(models.Model):
+    """
+    A historical call. Indexed for range queries by cluster and by coordinate.
+    """
+    region = models.CharField(max_length=32)
+    timestamp = models.DateTimeField()
+    emergency_type = models.CharField(max_length=255)
+    latitude = models.FloatField()
+    longitude = models.FloatField()
+    dispatch_time = models.DateTimeField()
+    response_time = models.DateTimeField(blank=True, null=True)
+    arrival_time = models.DateTimeField(blank=True, null=True)
+    date = models.DateField()
+    cluster = models.SmallIntegerField(blank=True, null=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['region', 'cluster', 'date'], name='call_region_cluster_date_idx'),
+            models.Index(fields=['region', 'latitude', 'longitude', 'date'], name='call_region_lat_lng_date_idx'),
+            models.Index(fields=['region', 'emergency_type', 'date'], name='call_region_type_date_idx'),
+        ]
+
+
+# The data.csv a region's stored calls were imported from
+class CallImport(models.Model):
+    """
+    Content hash of the imported data.csv and the signature of the region's calls right
+    after the import (see store.calls_signature), which tells whether calls were added since.
+    """
+    region = models.CharField(max_length=32, unique=True)
+    digest = models.CharField(max_length=64)
+    calls = models.CharField(max_length=64)
+    imported_at = models.DateTimeField(auto_now=True)
+
+
+# Predicted call totals per cluster and time step (factorized, see ClusterPrediction)
+class Prediction(models.Model):
+    """
+    Predicted cluster total for one day or hour.
+    """
+    DAILY = 'daily'
+    HOURLY = 'hourly'
+
+    region = models.CharField(max_length=32)
+    cluster = models.SmallIntegerField()
+    granularity = models.CharField(max_length=6, choices=[(DAILY, 'Daily'), (HOURLY, 'Hourly')])
+    timestamp = models.DateTimeField()
+    date = models.DateField()
+    predicted_calls = models.FloatField()
+    is_holiday = models.BooleanField(default=False)
+    is_weekend = models.BooleanField(default=False)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['region', 'cluster', 'date'], name='prediction_region_date_idx'),
+        ]
+
+
+# Share of each cluster's predicted calls at each coordinate
+class PredictionDistribution(models.Model):
+    """
+    Coordinate distribution shared by every time step of a cluster's prediction.
+    """
+    region = models.CharField(max_length=32)
+    cluster = models.SmallIntegerField()
+    latitude = models.FloatField()
+    longitude = models.FloatField()
+    distribution = models.FloatField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['region', 'cluster'], name='distribution_region_idx'),
+        ]
+
+
+# ----------------------------------------------------------------------------------------------
+# Running state updated by call ingestion (see store.record_calls).
+# ----------------------------------------------------------------------------------------------
+
+# Calls per cluster and rounded coordinate (behind Cluster.lat_lng_dist)
+class CoordinateCount(models.Model):
+    """
+    Number of EMS calls in one cluster at one rounded coordinate.
+    """
+    region = models.CharField(max_length=32)
+    cluster = models.SmallIntegerField()
+    latitude = models.FloatField()
+    longitude = models.FloatField()
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['region', 'cluster', 'latitude', 'longitude'],
+                                    name='coordinate_count_region_cell_uniq'),
+        ]
+
+
+# Historical calls per period and rounded coordinate (heatmap rollups)
+class CallRollup(models.Model):
+    """
+    Number of EMS calls in one cluster at one rounded coordinate during one day, week or month.
+    """
+    DAILY = 'daily'
+    WEEKLY = 'weekly'
+    MONTHLY = 'monthly'
+
+    region = models.CharField(max_length=32)
+    granularity = models.CharField(max_length=7, choices=[(DAILY, 'Daily'), (WEEKLY, 'Weekly'), (MONTHLY, 'Monthly')])
+    period = models.DateField()
+    cluster = models.SmallIntegerField()
+    latitude = models.FloatField()
+    longitude = models.FloatField()
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['region', 'granularity', 'period', 'cluster', 'latitude', 'longitude'],
+                                    name='call_rollup_region_cell_uniq'),
+        ]
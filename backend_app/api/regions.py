@@ -0,0 +1,102 @@
+import os
+from django.conf import settings
+
+# ----------------------------------------------------------------------------------------------
+# Region-scoped file paths (settings.FORECAST_REGIONS)
+# ----------------------------------------------------------------------------------------------
+DATA_FOLDER = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data")
+
+
+class UnknownRegion(ValueError):
+    """
+    Raised for a region that is not configured in settings.FORECAST_REGIONS.
+    """
+
+
+class Region:
+    """
+    Files of one region. The default region keeps the original layout directly under
+    DATA_FOLDER, every other region lives in DATA_FOLDER/regions/<name>.
+
+    Attributes:
+        name (str): Key of settings.FORECAST_REGIONS.
+        label (str): Display name.
+        center (list): [latitude, longitude] the map opens at.
+        root (str): Folder holding the region's data, model and predictions.
+    """
+
+    def __init__(self, name, root, label=None, center=None):
+        self.name = name
+        self.root = root
+        self.label = label or name
+        self.center = center
+
+    @property
+    def data_path(self):
+        return os.path.join(self.root, "data.csv")
+
+    @property
+    def model_folder(self):
+        return os.path.join(self.root, "model")
+
+    @property
+    def cluster_path(self):
+        return os.path.join(self.model_folder, "clusters.pkl")
+
+    @property
+    def index_path(self):
+        return os.path.join(self.model_folder, "spatial_index.pkl")
+
+    @property
+    def boundaries_path(self):
+        return os.path.join(self.model_folder, "boundaries.json")
+
+    @property
+    def predictions_folder(self):
+        return os.path.join(self.root, "predictions")
+
+    @property
+    def checkpoint_folder(self):
+        return os.path.join(self.root, "checkpoints")
+
+    @property
+    def feature_folder(self):
+        return os.path.join(self.root, "features")
+
+    def to_json(self):
+        return {"id": self.name, "name": self.label, "center": self.center,
+                "default": self.name == settings.FORECAST_DEFAULT_REGION}
+
+
+def get_region(name=None):
+    """
+    Look up a configured region. Only names listed in settings are accepted, so a
+    region name can never point outside DATA_FOLDER.
+
+    Params:
+        name: str - region name (None or "" for settings.FORECAST_DEFAULT_REGION)
+
+    Returns:
+        Region
+
+    Raises:
+        UnknownRegion: if the region is not configured
+    """
+    name = name or settings.FORECAST_DEFAULT_REGION
+    if name not in settings.FORECAST_REGIONS:
+        raise UnknownRegion(f"Unknown region '{name}'. Choose from: {', '.join(settings.FORECAST_REGIONS)}")
+
+    config = settings.FORECAST_REGIONS[name]
+    if name == settings.FORECAST_DEFAULT_REGION:
+        root = DATA_FOLDER
+    else:
+        root = os.path.join(DATA_FOLDER, "regions", name)
+    return Region(name, root, config.get("name"), config.get("center"))
+
+
+def all_regions():
+    """
+    Returns:
+        list - every configured Region
+    """
+    return [get_region(name) for name in settings.FORECAST_REGIONS]
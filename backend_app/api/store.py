@@ -0,0 +1,387 @@
+import itertools
+import pandas as pd
+from django.db import connection, transaction
+from django.db.models import Count, Max
+from .models import CallImport, CallRecord, Prediction, PredictionDistribution, CoordinateCount, CallRollup
+from .cluster_predictions.prediction import ClusterPrediction
+from .cluster_predictions.rollups import rollup_calls
+
+# Rows per INSERT batch
+BATCH_SIZE = 5000
+
+
+# ----------------------------------------------------------------------------------------------
+# Calls
+# ----------------------------------------------------------------------------------------------
+def _aware(series):
+    """
+    Treats naive timestamps as UTC (settings.TIME_ZONE) so Django stores them without warnings.
+    """
+    series = pd.to_datetime(series)
+    return series.dt.tz_localize("UTC") if series.dt.tz is None else series
+
+
+def ingest_calls(df, region, replace=False, batch_size=BATCH_SIZE):
+    """
+    Stores raw call data (data.csv schema) as CallRecord rows.
+
+    Params:
+        df: pandas.DataFrame - calls with 'CauseCategory', 'Dispatched', 'Latitude', 'Longitude'
+        region: str - region name
+        replace: bool - delete the region's existing calls first
+        batch_size: int - rows per INSERT batch
+
+    Returns:
+        int - number of stored calls
+    """
+    dispatched = _aware(df['Dispatched'])
+    dates = dispatched.dt.date
+    clusters = df['Cluster'] if 'Cluster' in df.columns else [None] * len(df)
+
+    records = (
+        CallRecord(
+            region=region,
+            timestamp=ts,
+            emergency_type=cause,
+            latitude=float(lat),
+            longitude=float(lng),
+            dispatch_time=ts,
+            date=day,
+            cluster=None if cluster is None or pd.isna(cluster) else int(cluster),
+        )
+        for ts, day, cause, lat, lng, cluster in zip(
+            dispatched, dates, df['CauseCategory'], df['Latitude'], df['Longitude'], clusters)
+    )
+
+    with transaction.atomic():
+        if replace:
+            CallRecord.objects.filter(region=region).delete()
+        _bulk_create(CallRecord, records, batch_size)
+
+    return len(df)
+
+
+def load_calls(region, emergency_type=None, start=None, end=None):
+    """
+    Loads calls with an indexed range query.
+
+    Params:
+        region: str - region name
+        emergency_type: str - only load calls of this cause category (e.g. "EMS")
+        start: datetime.date - first day (inclusive)
+        end: datetime.date - last day (inclusive)
+
+    Returns:
+        pandas.DataFrame - 'CauseCategory', 'Dispatched', 'Latitude', 'Longitude' columns
+    """
+    calls = CallRecord.objects.filter(region=region)
+    if emergency_type is not None:
+        calls = calls.filter(emergency_type=emergency_type)
+    if start is not None:
+        calls = calls.filter(date__gte=start)
+    if end is not None:
+        calls = calls.filter(date__lte=end)
+
+    rows = calls.values_list('emergency_type', 'dispatch_time', 'latitude', 'longitude').iterator(chunk_size=BATCH_SIZE)
+    df = pd.DataFrame.from_records(rows, columns=['CauseCategory', 'Dispatched', 'Latitude', 'Longitude'])
+    if not df.empty:
+        df['Dispatched'] = pd.to_datetime(df['Dispatched'], utc=True).dt.tz_localize(None)
+    return df
+
+
+def has_calls(region):
+    return CallRecord.objects.filter(region=region).exists()
+
+
+def import_calls(df, region, digest, replace=False):
+    """
+    Stores the calls of a region's data.csv and records which file they came from.
+
+    Params:
+        df: pandas.DataFrame - calls read from data.csv
+        region: str - region name
+        digest: str - content hash of data.csv (versions.file_digest)
+        replace: bool - delete the region's existing calls first
+
+    Returns:
+        int - number of stored calls
+    """
+    with transaction.atomic():
+        count = ingest_calls(df, region, replace=replace)
+        CallImport.objects.update_or_create(region=region,
+                                            defaults={"digest": digest, "calls": calls_signature(region)})
+    return count
+
+
+def call_import(region):
+    """
+    The last data.csv import of a region.
+
+    Returns:
+        dict - 'digest' of the file and 'calls' signature right after the import, or None
+    """
+    return CallImport.objects.filter(region=region).values("digest", "calls").first()
+
+
+def calls_signature(region):
+    """
+    Cheap signature of a region's stored calls (row count and highest row ID). Calls are
+    only appended or replaced, and both change the signature.
+
+    Returns:
+        str - e.g. "20000:20000" ("0:None" without calls)
+    """
+    summary = CallRecord.objects.filter(region=region).aggregate(count=Count('id'), last=Max('id'))
+    return f"{summary['count']}:{summary['last']}"
+
+
+# ----------------------------------------------------------------------------------------------
+# Running state (coordinate counts per cluster)
+# ----------------------------------------------------------------------------------------------
+def record_calls(df, region, coord_decimals, batch_size=BATCH_SIZE):
+    """
+    Stores a batch of clustered calls and adds its EMS calls to the running coordinate
+    counts and the historical rollups. Only rows touched by the batch are written, so the
+    cost is proportional to the batch size rather than to the call history.
+
+    Params:
+        df: pandas.DataFrame - calls with 'CauseCategory', 'Dispatched', 'Latitude', 'Longitude' and 'Cluster'
+        region: str - region name
+        coord_decimals: int - rounding of the coordinate counts (same as coord_dist)
+        batch_size: int - rows per INSERT batch
+
+    Returns:
+        pandas.Series - number of EMS calls added per cluster
+    """
+    ems = df[df['CauseCategory'] == 'EMS']
+    cells = (ems.assign(Lat=ems['Latitude'].astype(float).round(coord_decimals),
+                        Long=ems['Longitude'].astype(float).round(coord_decimals))
+             .groupby(['Cluster', 'Lat', 'Long']).size().reset_index(name='Count'))
+
+    with transaction.atomic():
+        ingest_calls(df, region, batch_size=batch_size)
+        _increment(CoordinateCount, ['region', 'cluster', 'latitude', 'longitude'], (
+            (region, int(cluster), float(lat), float(lng), int(count))
+            for cluster, lat, lng, count in zip(cells['Cluster'], cells['Lat'], cells['Long'], cells['Count'])))
+        _increment(CallRollup, ['region', 'granularity', 'period', 'cluster', 'latitude', 'longitude'],
+                   _rollup_rows(rollup_calls(ems), region))
+
+    return ems.groupby('Cluster').size()
+
+
+def reset_running_state(clusters, region):
+    """
+    Replaces the region's running state with the counts of freshly trained clusters.
+    Rows are written with the raw executemany path of _increment (no ORM object per row).
+
+    Params:
+        clusters: list - trained Cluster objects (lat_lng_dist)
+        region: str - region name
+    """
+    def coordinate_rows():
+        for cluster in clusters:
+            dist = cluster.lat_lng_dist
+            for lat, lng, count in zip(dist['Lat'], dist['Long'], dist['Count']):
+                yield region, int(cluster.id), float(lat), float(lng), int(count)
+
+    with transaction.atomic():
+        CoordinateCount.objects.filter(region=region).delete()
+        _increment(CoordinateCount, ['region', 'cluster', 'latitude', 'longitude'], coordinate_rows())
+
+
+def reset_call_rollups(df, region):
+    """
+    Replaces the region's historical heatmap rollups with the rollups of a call history.
+
+    Params:
+        df: pandas.DataFrame - EMS calls with 'Dispatched', 'Latitude', 'Longitude' and 'Cluster'
+        region: str - region name
+    """
+    with transaction.atomic():
+        CallRollup.objects.filter(region=region).delete()
+        _increment(CallRollup, ['region', 'granularity', 'period', 'cluster', 'latitude', 'longitude'],
+                   _rollup_rows(rollup_calls(df), region))
+
+
+def load_call_rollups(region, granularity, start, end):
+    """
+    Loads historical call counts per coordinate with an indexed range query.
+
+    Params:
+        region: str - region name
+        granularity: str - "daily", "weekly" or "monthly"
+        start: datetime.date - first period start (inclusive)
+        end: datetime.date - last period start (inclusive)
+
+    Returns:
+        pandas.DataFrame - 'Period', 'Cluster', 'Lat', 'Long' and 'Count' columns
+    """
+    rows = (CallRollup.objects.filter(region=region, granularity=granularity, period__gte=start, period__lte=end)
+            .order_by('period', 'cluster').values_list('period', 'cluster', 'latitude', 'longitude', 'count'))
+    df = pd.DataFrame.from_records(rows, columns=['Period', 'Cluster', 'Lat', 'Long', 'Count'])
+    df['Period'] = pd.to_datetime(df['Period'])
+    return df
+
+
+def count_call_rollups(region, granularity, start, end):
+    """
+    Number of rows load_call_rollups would return for the same range.
+    """
+    return CallRollup.objects.filter(region=region, granularity=granularity, period__gte=start, period__lte=end).count()
+
+
+def has_running_state(region):
+    return CoordinateCount.objects.filter(region=region).exists()
+
+
+def load_coordinate_distribution(region, cluster):
+    """
+    Loads a cluster's running coordinate counts as a lat_lng_dist frame.
+
+    Params:
+        region: str - region name
+        cluster: int - cluster ID
+
+    Returns:
+        pandas.DataFrame - 'Lat', 'Long', 'Cluster', 'Count' and 'Distribution' columns
+    """
+    df = pd.DataFrame.from_records(
+        CoordinateCount.objects.filter(region=region, cluster=cluster).order_by('latitude', 'longitude')
+        .values_list('latitude', 'longitude', 'count'),
+        columns=['Lat', 'Long', 'Count'])
+    df.insert(2, 'Cluster', cluster)
+    total = df['Count'].sum()
+    df['Distribution'] = df['Count'] / total if total > 0 else 0.0
+    return df
+
+
+def _rollup_rows(rollups, region):
+    periods = pd.to_datetime(rollups['Period']).dt.strftime('%Y-%m-%d')
+    return ((region, granularity, period, int(cluster), float(lat), float(lng), int(count))
+            for granularity, period, cluster, lat, lng, count in zip(
+                rollups['Granularity'], periods, rollups['Cluster'],
+                rollups['Lat'], rollups['Long'], rollups['Count']))
+
+
+def _increment(model, key_fields, rows):
+    """
+    Adds counts to existing rows, inserting missing ones (SQLite upsert).
+
+    Params:
+        model: CoordinateCount or CallRollup
+        key_fields: list - columns of the model's unique constraint
+        rows: iterable - tuples of key values followed by the count to add
+    """
+    table = model._meta.db_table
+    columns = ", ".join(key_fields + ["count"])
+    placeholders = ", ".join(["%s"] * (len(key_fields) + 1))
+    sql = (f"INSERT INTO {table} ({columns}) VALUES ({placeholders}) "
+           f"ON CONFLICT ({', '.join(key_fields)}) DO UPDATE SET count = count + excluded.count")
+    rows = iter(rows)
+    with connection.cursor() as cursor:
+        while batch := list(itertools.islice(rows, BATCH_SIZE)):
+            cursor.executemany(sql, batch)
+
+
+# ----------------------------------------------------------------------------------------------
+# Predictions
+# ----------------------------------------------------------------------------------------------
+def save_predictions(predictions, region, batch_size=BATCH_SIZE):
+    """
+    Replaces the region's published predictions in one transaction.
+
+    Params:
+        predictions: dict - key = cluster ID, value = ClusterPrediction
+        region: str - region name
+        batch_size: int - rows per INSERT batch
+    """
+    def prediction_rows():
+        for cluster_id, cluster_prediction in predictions.items():
+            for granularity in (Prediction.DAILY, Prediction.HOURLY):
+                totals = cluster_prediction.totals(granularity)
+                if totals.empty:
+                    continue
+                hours = totals['Hour'] if 'Hour' in totals.columns else 0
+                timestamps = _aware(pd.to_datetime(totals[['Year', 'Month', 'Day']]) + pd.to_timedelta(hours, unit='h'))
+                holidays = totals['is_holiday'] if 'is_holiday' in totals.columns else [0] * len(totals)
+                weekends = totals['is_weekend'] if 'is_weekend' in totals.columns else [0] * len(totals)
+                for ts, count, holiday, weekend in zip(timestamps, totals['Count'], holidays, weekends):
+                    yield Prediction(region=region, cluster=int(cluster_id), granularity=granularity, timestamp=ts,
+                                     date=ts.date(), predicted_calls=float(count),
+                                     is_holiday=bool(holiday), is_weekend=bool(weekend))
+
+    def distribution_rows():
+        for cluster_id, cluster_prediction in predictions.items():
+            dist = cluster_prediction.lat_lng_dist
+            for lat, lng, weight in zip(dist['Lat'], dist['Long'], dist['Distribution']):
+                yield PredictionDistribution(region=region, cluster=int(cluster_id), latitude=float(lat),
+                                             longitude=float(lng), distribution=float(weight))
+
+    with transaction.atomic():
+        Prediction.objects.filter(region=region).delete()
+        PredictionDistribution.objects.filter(region=region).delete()
+        _bulk_create(Prediction, prediction_rows(), batch_size)
+        _bulk_create(PredictionDistribution, distribution_rows(), batch_size)
+
+
+def load_predictions(region, start=None, end=None):
+    """
+    Loads a region's published predictions. Totals are read with an indexed
+    (region, cluster, date) range query, so only the requested days are loaded.
+
+    Params:
+        region: str - region name
+        start: datetime.date - first day (inclusive)
+        end: datetime.date - last day (inclusive)
+
+    Returns:
+        predictions: dict - key = cluster ID, value = ClusterPrediction
+    """
+    predictions = {}
+    cluster_ids = (PredictionDistribution.objects.filter(region=region)
+                   .values_list('cluster', flat=True).distinct().order_by('cluster'))
+
+    for cluster_id in cluster_ids:
+        totals = Prediction.objects.filter(region=region, cluster=cluster_id)
+        if start is not None:
+            totals = totals.filter(date__gte=start)
+        if end is not None:
+            totals = totals.filter(date__lte=end)
+
+        rows = pd.DataFrame.from_records(
+            totals.values_list('granularity', 'timestamp', 'predicted_calls', 'is_holiday', 'is_weekend'),
+            columns=['granularity', 'timestamp', 'Count', 'is_holiday', 'is_weekend'])
+        timestamps = pd.to_datetime(rows['timestamp'], utc=True)
+        rows['Year'] = timestamps.dt.year
+        rows['Month'] = timestamps.dt.month
+        rows['Day'] = timestamps.dt.day
+        rows['Hour'] = timestamps.dt.hour
+        rows[['is_holiday', 'is_weekend']] = rows[['is_holiday', 'is_weekend']].astype(int)
+
+        is_daily = rows['granularity'] == Prediction.DAILY
+        daily = rows.loc[is_daily, ['Year', 'Month', 'Day', 'Count', 'is_holiday', 'is_weekend']]
+        hourly = rows.loc[~is_daily, ['Year', 'Month', 'Day', 'Hour', 'Count']]
+
+        lat_lng_dist = pd.DataFrame.from_records(
+            PredictionDistribution.objects.filter(region=region, cluster=cluster_id).order_by('id')
+            .values_list('latitude', 'longitude', 'distribution'),
+            columns=['Lat', 'Long', 'Distribution'])
+
+        predictions[cluster_id] = ClusterPrediction(
+            cluster_id, hourly.reset_index(drop=True), daily.reset_index(drop=True), lat_lng_dist)
+
+    return predictions
+
+
+def _bulk_create(model, objects, batch_size):
+    """
+    Inserts objects from an iterator in fixed-size batches.
+    """
+    batch = []
+    for obj in objects:
+        batch.append(obj)
+        if len(batch) >= batch_size:
+            model.objects.bulk_create(batch, batch_size=batch_size)
+            batch = []
+    if batch:
+        model.objects.bulk_create(batch, batch_size=batch_size)
@@ -1,3 +1,576 @@
-from django.test import TestCase
+import io
+import os
+import json
+import time
+import pickle
+import shutil
+import asyncio
+import tempfile
+import threading
+import contextlib
+from types import SimpleNamespace
+import numpy as np
+import pandas as pd
+from django.test import SimpleTestCase, TestCase, override_settings
+from . import regions, store, views
+from .models import CallRollup, CoordinateCount
+from .cluster_predictions import backtest, engines, model, rollups
+from .cluster_predictions.cluster import Cluster
+from .cluster_predictions.create_prediction_df import create_prediction_df, create_prediction_input_df
+from .cluster_predictions.pipeline import Pipeline, Stage
+from .cluster_predictions.prediction import ClusterPrediction, prune_distribution
+from .cluster_predictions.preprocess import clean
+from .cluster_predictions.spatial_index import ClusterIndex
+from .utils import versions
+from .utils.cache import MemoryLRUCache, SingleFlightCache
 
-# Create your tests here.
+
+def sparse_hourly_counts(rate, weeks, seed=0):
+    """
+    Poisson hourly call counts in the format of the hourly_counts stage
+    (hours without calls have no row).
+    """
+    rng = np.random.default_rng(seed)
+    hours = pd.date_range("2024-01-01", periods=weeks * 168, freq="h")
+    counts = rng.poisson(rate, len(hours))
+    df = pd.DataFrame({"Date-Hr": hours, "Count": counts})
+    return df[df["Count"] > 0].reset_index(drop=True)
+
+
+# ----------------------------------------------------------------------------------------------
+# Pipeline checkpoints
+# ----------------------------------------------------------------------------------------------
+def scale(value):
+    return value * 2
+
+
+def scale_differently(value):
+    return value * 3
+
+
+class PipelineFingerprintTests(SimpleTestCase):
+    def run_stage(self, checkpoint_dir, **stage_options):
+        pipeline = Pipeline("test", [Stage("double", lambda value: scale(value), ["value"], **stage_options)],
+                            checkpoint_dir)
+        pipeline.run(value=21)
+        return pipeline.report[-1]["status"]
+
+    def test_dependencies_and_version_invalidate_checkpoints(self):
+        with tempfile.TemporaryDirectory() as checkpoint_dir:
+            self.assertEqual(self.run_stage(checkpoint_dir, depends_on=[scale]), "ran")
+            self.assertEqual(self.run_stage(checkpoint_dir, depends_on=[scale]), "cached")
+            # Same stage function, changed callee source
+            self.assertEqual(self.run_stage(checkpoint_dir, depends_on=[scale_differently]), "ran")
+            self.assertEqual(self.run_stage(checkpoint_dir, depends_on=[scale_differently], version=2), "ran")
+            self.assertEqual(self.run_stage(checkpoint_dir, depends_on=[scale_differently], version=2), "cached")
+
+
+# ----------------------------------------------------------------------------------------------
+# Forecasting engines
+# ----------------------------------------------------------------------------------------------
+class HoltWintersEngineTests(SimpleTestCase):
+    def test_low_rate_series_counts_empty_hours_as_zero(self):
+        data = clean(sparse_hourly_counts(0.3, weeks=8))
+        features = [col for col in data.columns if col not in ("Date-Hr", "Count")]
+        model = engines.HoltWintersEngine().fit(data[features], data["Count"])
+
+        future = clean(pd.DataFrame({"Date-Hr": pd.date_range("2024-02-26", periods=168, freq="h")}))
+        # Treating empty hours as missing forecast ~1.1 calls/hour here
+        self.assertAlmostEqual(model.predict(future[features]).mean(), 0.3, delta=0.15)
+
+    def test_auto_selects_holt_winters_for_sparse_clusters(self):
+        data = sparse_hourly_counts(0.3, weeks=8)
+        self.assertEqual(engines.select_engine(data, "auto"), engines.HoltWintersEngine.name)
+
+
+# ----------------------------------------------------------------------------------------------
+# Low-memory training
+# ----------------------------------------------------------------------------------------------
+class LowMemoryTrainingTests(SimpleTestCase):
+    def trained_cluster(self, low_memory):
+        cluster = Cluster(0, clean(sparse_hourly_counts(3.0, weeks=52), low_memory), lat_lng_dist=None, boundary=[])
+        with contextlib.redirect_stdout(io.StringIO()):
+            model.create_models([cluster], low_memory=low_memory)
+        return cluster
+
+    def test_low_memory_drops_the_history_from_the_pickle(self):
+        kept, released = self.trained_cluster(False), self.trained_cluster(True)
+        self.assertIsNotNone(kept.data)
+        self.assertIsNone(released.data)
+        self.assertLess(len(pickle.dumps(released)), len(pickle.dumps(kept)) / 2)
+
+    def test_prediction_inputs_without_history(self):
+        released = self.trained_cluster(True)
+        self.assertEqual(len(create_prediction_df(released, start=pd.Timestamp("2024-03-01"))), 168)
+        with self.assertRaises(ValueError):
+            create_prediction_input_df(released)
+
+    def test_prediction_input_leaves_cluster_data_untouched(self):
+        kept = self.trained_cluster(False)
+        kept.data["Date-Hr"] = kept.data["Date-Hr"].astype(str)
+        last_week = create_prediction_input_df(kept)
+
+        self.assertLessEqual(last_week["Date-Hr"].max() - last_week["Date-Hr"].min(), pd.Timedelta(days=7))
+        self.assertEqual(kept.data["Date-Hr"].dtype, object)
+
+
+# ----------------------------------------------------------------------------------------------
+# Backtest
+# ----------------------------------------------------------------------------------------------
+class BacktestFoldTests(SimpleTestCase):
+    def setUp(self):
+        self.data = clean(sparse_hourly_counts(0.5, 4))
+        backtest._FEATURES[0] = self.data
+        self.addCleanup(backtest._FEATURES.clear)
+
+    def test_newest_fold_ends_at_the_last_hour(self):
+        origins = backtest.fold_origins({0: self.data}, folds=3, horizon=48, step=24)
+        self.assertEqual(origins, list(pd.date_range("2024-01-25", "2024-01-27", freq="D")))
+        self.assertEqual(origins[-1] + pd.Timedelta(hours=47), self.data["Date-Hr"].max())
+
+    def test_fold_trains_only_on_earlier_hours(self):
+        origin = pd.Timestamp("2024-01-25")
+        fold = backtest.run_fold(0, origin, 48, "holt_winters")
+        self.assertEqual(fold["train_rows"], int((self.data["Date-Hr"] < origin).sum()))
+
+        # Errors are forecast - actual, with hours without calls counted as 0
+        train = self.data[self.data["Date-Hr"] < origin]
+        features = [col for col in self.data.columns if col not in ("Date-Hr", "Count")]
+        engine = engines.create_engine("holt_winters")
+        engine.fit(train[features], train["Count"])
+        hours = pd.date_range(origin, periods=48, freq="h")
+        forecast = engine.predict(clean(pd.DataFrame({"Date-Hr": hours}))[features])
+        actual = self.data.set_index("Date-Hr")["Count"].reindex(hours, fill_value=0).to_numpy(dtype=float)
+        np.testing.assert_allclose(fold["errors"], forecast - actual)
+
+        report = backtest.score([fold])
+        self.assertEqual([row["horizon_day"] for row in report["horizons"]], [1, 2])
+        self.assertEqual(report["clusters"][0]["mae"], round(float(np.mean(np.abs(fold["errors"]))), 4))
+
+
+# ----------------------------------------------------------------------------------------------
+# Predictions
+# ----------------------------------------------------------------------------------------------
+def flat_prediction(start, hours, cells=((35.2, -80.8, 1.0),)):
+    """
+    ClusterPrediction of one call per hour for the given forecast hours, spread over
+    (lat, lng, share) cells.
+    """
+    times = pd.Series(pd.date_range(start, periods=hours, freq="h"))
+    hourly = pd.DataFrame({"Year": times.dt.year, "Month": times.dt.month, "Day": times.dt.day,
+                           "Hour": times.dt.hour, "Count": 1.0})
+    daily = hourly.groupby(["Year", "Month", "Day"], as_index=False)["Count"].sum()
+    dist = pd.DataFrame(list(cells), columns=["Lat", "Long", "Distribution"])
+    return ClusterPrediction(0, hourly, daily, dist)
+
+
+class ClusterPredictionTotalsTests(SimpleTestCase):
+    def test_partial_week_is_dated_by_its_first_forecast_day(self):
+        totals = flat_prediction("2026-12-24", 7 * 24).totals("weekly")
+        self.assertEqual(totals["Start"].tolist(), [pd.Timestamp("2026-12-24"), pd.Timestamp("2026-12-28")])
+        self.assertEqual(totals["Hours"].tolist(), [96, 72])
+        self.assertEqual(totals["Count"].tolist(), [96.0, 72.0])
+
+    def test_partial_month_and_days_count_forecast_hours(self):
+        prediction = flat_prediction("2026-01-31 10:00", 3)
+        monthly = prediction.totals("monthly")
+        self.assertEqual(monthly["Start"].tolist(), [pd.Timestamp("2026-01-31 10:00")])
+        self.assertEqual(monthly["Hours"].tolist(), [3])
+        self.assertEqual(prediction.totals("daily")["Hours"].tolist(), [3])
+
+
+class PruneDistributionTests(SimpleTestCase):
+    cells = pd.DataFrame({"Lat": [35.1, 35.2, 35.3, 35.4], "Long": -80.8, "Distribution": [0.1, 0.5, 0.3, 0.1]})
+
+    def test_top_k_keeps_the_busiest_cells_and_redistributes(self):
+        kept = prune_distribution(self.cells, top_k=2)
+        self.assertEqual(kept["Lat"].tolist(), [35.2, 35.3])
+        np.testing.assert_allclose(kept["Distribution"], [0.625, 0.375])
+
+    def test_mass_keeps_the_fewest_cells_holding_the_share(self):
+        self.assertEqual(prune_distribution(self.cells, mass=0.8)["Lat"].tolist(), [35.2, 35.3])
+        # Ties are broken by coordinate
+        self.assertEqual(prune_distribution(self.cells, mass=0.9)["Lat"].tolist(), [35.1, 35.2, 35.3])
+        self.assertIs(prune_distribution(self.cells), self.cells)
+
+
+class FixedModel:
+    """
+    Model predicting the same float32 count for every hour, like XGBoost's float32 output.
+    """
+
+    def predict(self, df):
+        return np.full(len(df), 40.1, dtype=np.float32)
+
+
+class PredictionCountTests(SimpleTestCase):
+    def test_float32_predictions_serialize_rounded(self):
+        frames = pd.DataFrame({"Year": 2026, "Month": 10, "Day": 19, "Hour": range(24),
+                               "is_holiday": 0, "is_weekend": 0})
+        cluster = SimpleNamespace(id=0, model=FixedModel(), feature_columns=["Hour"])
+        hourly = model.make_predictions([frames], [cluster])
+        daily = model.aggregate_daily_data({0: frames.assign(Count=hourly[0]["Count"])})
+
+        self.assertEqual(json.dumps(hourly[0]["Count"].tolist()[:1]), "[40.1]")
+        self.assertEqual(json.dumps(daily[0]["Count"].tolist()), "[962.4]")
+
+
+class HeatmapDeltaTests(SimpleTestCase):
+    def test_reports_added_changed_and_removed_points(self):
+        base = {0: flat_prediction("2026-10-19", 48)}
+        current = {0: flat_prediction("2026-10-20", 48, cells=((35.2, -80.8, 0.5), (35.3, -80.9, 0.5)))}
+        delta = views.heatmap_delta(base, current, None, None, "daily")
+
+        day = lambda date: int(pd.Timestamp(date).timestamp() * 1000)
+        self.assertEqual(delta["times"], {"added": [day("2026-10-21")], "removed": [day("2026-10-19")]})
+        # Points at a removed time are dropped with it, not listed one by one
+        self.assertEqual(delta["removed"], [])
+        self.assertEqual(delta["changed"], [[-80.8, 35.2, day("2026-10-20"), 0, 12.0, 24.0]])
+        added = sorted((f["properties"]["time"], f["geometry"]["coordinates"][1]) for f in delta["added"])
+        self.assertEqual(added, [(day("2026-10-20"), 35.3), (day("2026-10-21"), 35.2), (day("2026-10-21"), 35.3)])
+
+    def test_same_predictions_have_no_changes(self):
+        predictions = {0: flat_prediction("2026-10-19", 48)}
+        delta = views.heatmap_delta(predictions, predictions, None, None, "daily")
+        self.assertEqual(delta, {"times": {"added": [], "removed": []}, "added": [], "changed": [], "removed": []})
+
+
+# ----------------------------------------------------------------------------------------------
+# Spatial index
+# ----------------------------------------------------------------------------------------------
+class ClusterIndexTests(SimpleTestCase):
+    def test_assign_matches_nearest_centroid(self):
+        rng = np.random.default_rng(0)
+        centroids = {cluster_id: [35.2 + rng.normal(0, 0.1), -80.8 + rng.normal(0, 0.1)] for cluster_id in range(8)}
+        index = ClusterIndex.build(centroids, rng.uniform(35.0, 35.4, 1000), rng.uniform(-81.0, -80.6, 1000))
+
+        # Includes points outside the grid, which fall back to the KD-tree
+        latitudes, longitudes = rng.uniform(34.9, 35.5, 20000), rng.uniform(-81.1, -80.5, 20000)
+        centers = np.array([centroids[cluster_id] for cluster_id in range(8)])
+        distances = (latitudes[:, None] - centers[:, 0]) ** 2 + (longitudes[:, None] - centers[:, 1]) ** 2
+        np.testing.assert_array_equal(index.assign(latitudes, longitudes), distances.argmin(axis=1))
+
+
+# ----------------------------------------------------------------------------------------------
+# Caches
+# ----------------------------------------------------------------------------------------------
+class MemoryLRUCacheTests(SimpleTestCase):
+    def test_least_recently_used_entries_are_evicted_over_budget(self):
+        cache, loads = MemoryLRUCache(300), []
+
+        def get(key, version=1, size=100):
+            return cache.get(key, version, lambda: loads.append(key) or key, sizer=lambda value: size)
+
+        for key in ("a", "b", "c"):
+            get(key)
+        get("a")
+        get("d")
+        self.assertEqual((cache.bytes, list(cache._entries)), (300, ["c", "a", "d"]))
+        get("b")
+        self.assertEqual(loads, ["a", "b", "c", "d", "b"])
+
+        # Values larger than the budget are returned but not cached
+        get("huge", size=301)
+        self.assertNotIn("huge", cache._entries)
+
+    def test_new_version_reloads(self):
+        cache, loads = MemoryLRUCache(10 ** 6), []
+        load = lambda: loads.append(1) or len(loads)
+        self.assertEqual([cache.get("model", 1, load), cache.get("model", 1, load), cache.get("model", 2, load)],
+                         [1, 1, 2])
+        cache.invalidate("model")
+        self.assertEqual(cache.get("model", 2, load), 3)
+        self.assertEqual(cache.bytes, cache._entries["model"][2])
+
+
+class SingleFlightCacheTests(SimpleTestCase):
+    def concurrent_gets(self, cache, compute, callers=8):
+        """
+        Runs callers identical lookups while the first computation is still running.
+        """
+        started, release, results = threading.Event(), threading.Event(), []
+
+        def slow_compute():
+            started.set()
+            release.wait(5)
+            return compute()
+
+        def get():
+            try:
+                results.append(cache.get("key", slow_compute))
+            except ValueError as e:
+                results.append(e)
+
+        threads = [threading.Thread(target=get) for _ in range(callers)]
+        threads[0].start()
+        started.wait(5)
+        for thread in threads[1:]:
+            thread.start()
+        time.sleep(0.2)
+        release.set()
+        for thread in threads:
+            thread.join(5)
+        return results
+
+    def test_concurrent_lookups_share_one_computation(self):
+        calls = []
+        results = self.concurrent_gets(SingleFlightCache(0), lambda: calls.append(1) or "body")
+        self.assertEqual((len(calls), results), (1, ["body"] * 8))
+
+    def test_errors_are_shared_and_not_cached(self):
+        def fail():
+            raise ValueError("boom")
+
+        cache = SingleFlightCache(60)
+        results = self.concurrent_gets(cache, fail)
+        self.assertTrue(all(isinstance(result, ValueError) for result in results))
+        self.assertEqual(cache.get("key", lambda: "body"), "body")
+
+    def test_results_are_reused_for_ttl_unless_not_cacheable(self):
+        cache, calls = SingleFlightCache(60, max_entries=2), []
+        compute = lambda: calls.append(1) or len(calls)
+        self.assertEqual([cache.get("a", compute), cache.get("a", compute)], [1, 1])
+        self.assertEqual([cache.get("b", compute, lambda result: False), cache.get("b", compute)], [2, 3])
+
+        # The oldest result is dropped over max_entries
+        cache.get("c", compute)
+        self.assertEqual(cache.get("a", compute), 5)
+
+        expired = SingleFlightCache(0.01)
+        expired.get("a", compute)
+        time.sleep(0.02)
+        self.assertEqual(expired.get("a", compute), 7)
+
+    def test_async_lookups_share_one_computation(self):
+        cache, calls = SingleFlightCache(0), []
+
+        async def compute():
+            calls.append(1)
+            await asyncio.sleep(0.05)
+            return "body"
+
+        async def lookups():
+            return await asyncio.gather(*(cache.aget("key", compute) for _ in range(8)))
+
+        self.assertEqual(asyncio.run(lookups()), ["body"] * 8)
+        self.assertEqual(len(calls), 1)
+
+
+# ----------------------------------------------------------------------------------------------
+# SQLite store
+# ----------------------------------------------------------------------------------------------
+def calls_frame(calls):
+    """
+    Clustered calls from (dispatched, cause, lat, lng, cluster) tuples.
+    """
+    return pd.DataFrame(calls, columns=["Dispatched", "CauseCategory", "Latitude", "Longitude", "Cluster"])
+
+
+class StoreTests(TestCase):
+    def test_increment_adds_to_existing_rows(self):
+        key = ["region", "cluster", "latitude", "longitude"]
+        store._increment(CoordinateCount, key, [("test", 0, 35.2, -80.8, 2), ("test", 1, 35.3, -80.9, 1)])
+        store._increment(CoordinateCount, key, [("test", 0, 35.2, -80.8, 3)])
+
+        counts = dict(CoordinateCount.objects.filter(region="test").values_list("cluster", "count"))
+        self.assertEqual(counts, {0: 5, 1: 1})
+
+    def test_record_calls_updates_counts_and_rollups(self):
+        store.record_calls(calls_frame([
+            ("2026-10-19 08:10", "EMS", 35.2001, -80.8001, 0),
+            ("2026-10-19 09:20", "EMS", 35.2002, -80.8002, 0),
+            ("2026-10-21 10:00", "EMS", 35.2001, -80.8001, 0),
+            ("2026-10-21 11:00", "Fire", 35.2001, -80.8001, 0),
+        ]), "test", coord_decimals=3)
+        added = store.record_calls(calls_frame([("2026-10-19 12:00", "EMS", 35.2, -80.8, 0)]), "test", coord_decimals=3)
+
+        self.assertEqual(added.to_dict(), {0: 1})
+        self.assertEqual(store.calls_signature("test").split(":")[0], "5")
+        dist = store.load_coordinate_distribution("test", 0)
+        self.assertEqual(dist[["Lat", "Long", "Count"]].values.tolist(), [[35.2, -80.8, 4]])
+
+        rollups = {(granularity, str(period)): count for granularity, period, count in
+                   CallRollup.objects.filter(region="test").values_list("granularity", "period", "count")}
+        self.assertEqual(rollups, {("daily", "2026-10-19"): 3, ("daily", "2026-10-21"): 1,
+                                   ("weekly", "2026-10-19"): 4, ("monthly", "2026-10-01"): 4})
+        weekly = store.load_call_rollups("test", "weekly", pd.Timestamp("2026-10-19").date(),
+                                         pd.Timestamp("2026-10-19").date())
+        self.assertEqual(weekly["Count"].tolist(), [4])
+
+    def test_reset_call_rollups_replaces_previous_counts(self):
+        calls = calls_frame([("2026-10-19 08:10", "EMS", 35.2, -80.8, 0), ("2026-10-20 09:00", "EMS", 35.2, -80.8, 0)])
+        store.record_calls(calls, "test", coord_decimals=3)
+        store.reset_call_rollups(calls.iloc[:1][["Dispatched", "Latitude", "Longitude", "Cluster"]], "test")
+        self.assertEqual(sorted(CallRollup.objects.filter(region="test").values_list("count", flat=True)), [1, 1, 1])
+
+
+# ----------------------------------------------------------------------------------------------
+# Train/predict API
+# ----------------------------------------------------------------------------------------------
+def write_call_data(path, calls=3000, seed=0):
+    """
+    data.csv with EMS calls around five centers over eight weeks.
+    """
+    rng = np.random.default_rng(seed)
+    centers = rng.uniform([35.1, -80.95], [35.35, -80.7], size=(5, 2))
+    points = centers[rng.integers(0, 5, calls)] + rng.normal(0, 0.01, (calls, 2))
+    dispatched = pd.Timestamp("2026-08-01") + pd.to_timedelta(rng.uniform(0, 56 * 24, calls), unit="h")
+    pd.DataFrame({"CauseCategory": "EMS", "Dispatched": dispatched.strftime("%m/%d/%Y %H:%M"),
+                  "Latitude": points[:, 0], "Longitude": points[:, 1]}).to_csv(path, index=False)
+
+
+class DataFolderTestCase(TestCase):
+    """
+    Points regions.DATA_FOLDER at a temporary folder holding a generated data.csv.
+    """
+
+    def setUp(self):
+        self.data_folder = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.data_folder, ignore_errors=True)
+        self.original_folder = regions.DATA_FOLDER
+        regions.DATA_FOLDER = self.data_folder
+        self.addCleanup(setattr, regions, "DATA_FOLDER", self.original_folder)
+        self.region = regions.get_region()
+        write_call_data(self.region.data_path)
+
+    def request(self, method, path, status=200):
+        # Training and prediction print their progress
+        with contextlib.redirect_stdout(io.StringIO()):
+            response = getattr(self.client, method)(path)
+        self.assertEqual(response.status_code, status, response.content)
+        return response.json()
+
+
+class TrainingDataImportTests(DataFolderTestCase):
+    def test_changed_data_csv_is_reimported_until_calls_are_added(self):
+        self.assertEqual(len(views.load_training_data(self.region)), 3000)
+        self.assertEqual(len(views.load_training_data(self.region)), 3000)
+
+        write_call_data(self.region.data_path, calls=2000, seed=1)
+        self.assertEqual(len(views.load_training_data(self.region)), 2000)
+
+        store.record_calls(calls_frame([("2026-09-01 10:00", "EMS", 35.2, -80.8, 0)]), self.region.name,
+                           coord_decimals=3)
+        self.assertEqual(len(views.load_training_data(self.region)), 2001)
+        write_call_data(self.region.data_path, calls=1000, seed=2)
+        with self.assertRaises(views.CallDataChanged):
+            views.load_training_data(self.region)
+
+
+class TrainPredictSkipTests(DataFolderTestCase):
+    def test_unchanged_inputs_skip_until_forced_or_calls_arrive(self):
+        trained = self.request("post", "/api/train/")
+        self.assertFalse(trained["skipped"])
+        self.assertEqual(self.request("post", "/api/train/"),
+                         {"message": "Model is up to date; training skipped.", "version": trained["version"],
+                          "skipped": True})
+        self.assertFalse(self.request("post", "/api/train/?force=true")["skipped"])
+
+        # A replaced data.csv is re-imported and trained on
+        write_call_data(self.region.data_path, calls=2500, seed=1)
+        self.assertFalse(self.request("post", "/api/train/")["skipped"])
+        self.assertEqual(store.calls_signature(self.region.name).split(":")[0], "2500")
+        self.assertTrue(self.request("post", "/api/train/")["skipped"])
+
+        predicted = self.request("get", "/api/predict/")
+        self.assertFalse(predicted["skipped"])
+        self.assertTrue(self.request("get", "/api/predict/")["skipped"])
+        self.assertFalse(self.request("get", "/api/predict/?force=1")["skipped"])
+
+        # New calls change both fingerprints
+        store.record_calls(calls_frame([("2026-09-01 10:00", "EMS", 35.2, -80.8, 0)]), self.region.name,
+                           coord_decimals=3)
+        self.assertFalse(self.request("get", "/api/predict/")["skipped"])
+        self.assertFalse(self.request("post", "/api/train/")["skipped"])
+
+
+# ----------------------------------------------------------------------------------------------
+# Heatmap API
+# ----------------------------------------------------------------------------------------------
+class ChooseGranularityTests(SimpleTestCase):
+    def choose(self, start, end, **options):
+        return rollups.choose_granularity(pd.Timestamp(start), pd.Timestamp(end), **{"max_points": 10 ** 6, **options})
+
+    def test_longer_ranges_use_coarser_granularities(self):
+        self.assertEqual(self.choose("2026-10-19", "2026-10-20"), "hourly")
+        self.assertEqual(self.choose("2026-10-19", "2026-10-25"), "daily")
+        self.assertEqual(self.choose("2026-10-01", "2026-12-31"), "weekly")
+        self.assertEqual(self.choose("2025-01-01", "2026-12-31"), "monthly")
+
+    def test_point_budget_moves_to_a_coarser_granularity(self):
+        # 7 days x 1000 coordinates do not fit, one week does
+        points = lambda granularity: rollups.count_periods(pd.Timestamp("2026-10-19"), pd.Timestamp("2026-10-25"),
+                                                           granularity) * 1000
+        self.assertEqual(self.choose("2026-10-19", "2026-10-25", max_points=6999, count_points=points), "weekly")
+
+    def test_short_ranges_get_the_finest_option(self):
+        self.assertEqual(self.choose("2026-10-19", "2026-10-20", options=rollups.CALL_ROLLUPS), "daily")
+
+
+class HeatmapGranularityTests(DataFolderTestCase):
+    def test_auto_granularity_and_point_budget(self):
+        self.request("post", "/api/train/")
+        self.request("get", "/api/predict/")
+
+        # Auto is the default: a week of forecast is daily, eight weeks of calls weekly
+        self.assertEqual(self.request("get", "/api/heatmap/")["granularity"], "daily")
+        historical = self.request("get", "/api/heatmap/?mode=historical&start_date=2026-08-01&end_date=2026-09-25")
+        self.assertEqual(historical["granularity"], "weekly")
+        self.assertEqual({feature["properties"]["time"] for feature in historical["features"]},
+                         {int(week.timestamp() * 1000) for week in pd.date_range("2026-07-27", "2026-09-22", freq="W-MON")})
+
+        # Long forecasts are rolled up instead of exceeding the point budget, and are not published
+        published = versions.read_version(self.region.predictions_folder)
+        self.assertEqual(self.request("get", "/api/forecast/?horizon=2000&output=geojson")["granularity"], "weekly")
+        self.assertEqual(versions.read_version(self.region.predictions_folder), published)
+        error = self.request("get", "/api/forecast/?horizon=2000&output=geojson&granularity=hourly", status=400)
+        self.assertIn(f"(max {views.MAX_HEATMAP_POINTS})", error["error"])
+
+
+# ----------------------------------------------------------------------------------------------
+# Profiling
+# ----------------------------------------------------------------------------------------------
+class ProfilingTests(DataFolderTestCase):
+    def test_profiled_requests_save_their_own_reports(self):
+        folder = os.path.join(self.data_folder, "profiles")
+        self.assertNotIn("X-Profile-Id", self.client.get("/api/heatmap/?profile=1"))
+
+        with override_settings(FORECAST_PROFILING=True, FORECAST_PROFILE_FOLDER=folder):
+            responses = [self.client.get("/api/heatmap/?profile=1"), self.client.get("/api/heatmap/",
+                                                                                      HTTP_X_PROFILE="1")]
+        profile_ids = [response["X-Profile-Id"] for response in responses]
+        self.assertEqual(len(set(profile_ids)), 2)
+        self.assertTrue(all(response["Server-Timing"].startswith("profile;dur=") for response in responses))
+        self.assertEqual(sorted(os.listdir(folder)),
+                         sorted(profile_id + extension for profile_id in profile_ids
+                                for extension in (".txt", ".collapsed")))
+        with open(os.path.join(folder, profile_ids[0] + ".txt")) as f:
+            self.assertIn("build_heatmap", f.read())
+
+
+# ----------------------------------------------------------------------------------------------
+# Locate API
+# ----------------------------------------------------------------------------------------------
+class LocateTests(SimpleTestCase):
+    def test_rejects_non_finite_coordinates(self):
+        for query in ("lat=nan&lng=-80.8", "lat=35.2&lng=inf", "lat=-Infinity&lng=-80.8"):
+            with self.subTest(query=query):
+                response = self.client.get(f"/api/locate/?{query}")
+                self.assertEqual(response.status_code, 400)
+                self.assertEqual(response.json(), {"error": "Coordinates must be finite numbers."})
+
+
+# ----------------------------------------------------------------------------------------------
+# Call Ingestion API
+# ----------------------------------------------------------------------------------------------
+class IngestCallsTests(TestCase):
+    def test_rejects_non_finite_and_out_of_range_coordinates(self):
+        calls = [{"Dispatched": "2026-10-19 08:00", "Latitude": 35.2, "Longitude": -80.8},
+                 {"Dispatched": "2026-10-19 09:00", "Latitude": "inf", "Longitude": -80.8},
+                 {"Dispatched": "2026-10-19 10:00", "Latitude": 95.0, "Longitude": -80.8},
+                 {"Dispatched": "2026-10-19 11:00", "Latitude": 35.2, "Longitude": "-Infinity"}]
+        response = self.client.post("/api/calls/", json.dumps(calls), content_type="application/json")
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()["rows"], [1, 2, 3])
+        self.assertFalse(store.has_calls(regions.get_region().name))
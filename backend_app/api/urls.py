@@ -1,12 +1,27 @@
+from django.conf import settings
 from django.urls import path
 from .views import (
-    get_heatmap, train_model, get_boundaries, make_predictions
+    get_heatmap, train_model, get_boundaries, make_predictions, ingest_calls, locate, get_regions, get_metrics,
+    get_versions, get_events, get_forecast, get_heatmap_async, get_boundaries_async, get_events_unavailable
 )
 
+# Native async variants under ASGI (see asgi.py). The event stream is only served there.
+if settings.FORECAST_ASYNC_VIEWS:
+    get_heatmap, get_boundaries = get_heatmap_async, get_boundaries_async
+else:
+    get_events = get_events_unavailable
+
 urlpatterns = [
     # API endpoints in use
     path('heatmap/', get_heatmap, name='get_heatmap'),
     path('train/', train_model, name='train_model'),
     path('boundaries/', get_boundaries, name='get_boundaries'),
-    path('predict/', make_predictions, name='make_predictions')
+    path('predict/', make_predictions, name='make_predictions'),
+    path('forecast/', get_forecast, name='get_forecast'),
+    path('calls/', ingest_calls, name='ingest_calls'),
+    path('locate/', locate, name='locate'),
+    path('regions/', get_regions, name='get_regions'),
+    path('versions/', get_versions, name='get_versions'),
+    path('events/', get_events, name='get_events'),
+    path('metrics/', get_metrics, name='get_metrics')
 ]
\ No newline at end of file
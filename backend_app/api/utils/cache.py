@@ -0,0 +1,256 @@
+"""
+Per-process caches.
+
+MemoryLRUCache holds loaded artifacts (region models and prediction sets). Entries are
+evicted least recently used first once their estimated memory exceeds the cache's
+budget, so one budget is shared by every region: idle regions are dropped while busy
+ones stay loaded.
+
+SingleFlightCache holds rendered responses for a few seconds and lets identical
+concurrent requests share one computation.
+"""
+import sys
+import time
+import asyncio
+import threading
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+from . import metrics
+
+
+class MemoryLRUCache:
+    """
+    LRU cache bounded by the estimated size of its values.
+
+    Every entry carries a version (e.g. a file modification time or content hash). A
+    lookup with a different version reloads the value, so workers pick up a retrained
+    model or new predictions without a restart.
+
+    Attributes:
+        name (str): Cache label in the metrics.
+        max_bytes (int): Memory budget.
+        bytes (int): Estimated size of the cached values.
+    """
+
+    def __init__(self, max_bytes, name="cache"):
+        self.name = name
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, version, loader, sizer=None):
+        """
+        Returns the cached value, loading it on a miss.
+
+        Params:
+            key: hashable - entry key
+            version: hashable - version of the value (a different version is a miss)
+            loader: callable - loads the value
+            sizer: callable - estimated size of the value in bytes (default estimate_size)
+
+        Returns:
+            the cached or loaded value
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == version:
+                self._entries.move_to_end(key)
+                metrics.record_cache(self.name, True)
+                return entry[1]
+        metrics.record_cache(self.name, False)
+
+        # Load outside the lock so a slow load does not block other keys
+        value = loader()
+        size = (sizer or estimate_size)(value)
+
+        with self._lock:
+            self._discard(key)
+            if size <= self.max_bytes:
+                self._entries[key] = (version, value, size)
+                self.bytes += size
+                while self.bytes > self.max_bytes:
+                    _, (_, _, evicted_size) = self._entries.popitem(last=False)
+                    self.bytes -= evicted_size
+                    metrics.CACHE_EVICTIONS.inc(cache=self.name)
+            metrics.CACHE_BYTES.set(self.bytes, cache=self.name)
+            metrics.CACHE_ENTRIES.set(len(self._entries), cache=self.name)
+        return value
+
+    def invalidate(self, key):
+        with self._lock:
+            self._discard(key)
+            metrics.CACHE_BYTES.set(self.bytes, cache=self.name)
+            metrics.CACHE_ENTRIES.set(len(self._entries), cache=self.name)
+
+    def _discard(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.bytes -= entry[2]
+
+
+def estimate_size(value, _seen=None):
+    """
+    Estimated memory of a value in bytes. DataFrames, arrays and forecasting engines
+    are measured directly, containers and objects are walked recursively.
+
+    Params:
+        value: any object
+
+    Returns:
+        int - bytes
+    """
+    seen = _seen if _seen is not None else set()
+    if id(value) in seen:
+        return 0
+    seen.add(id(value))
+
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        usage = value.memory_usage(deep=True)
+        return int(usage.sum() if isinstance(value, pd.DataFrame) else usage)
+    if isinstance(value, np.ndarray):
+        return int(value.nbytes)
+    if isinstance(value, (bytes, bytearray, str)):
+        return sys.getsizeof(value)
+    if hasattr(value, "serialize"):
+        # Forecasting engines (fitted boosters are not plain Python objects)
+        return len(value.serialize())
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(estimate_size(k, seen) + estimate_size(v, seen) for k, v in value.items())
+    if isinstance(value, (list, tuple, set)):
+        return sys.getsizeof(value) + sum(estimate_size(item, seen) for item in value)
+    if hasattr(value, "__dict__"):
+        return sys.getsizeof(value) + estimate_size(vars(value), seen)
+    return sys.getsizeof(value)
+
+
+class SingleFlightCache:
+    """
+    Short-lived cache of computed results where concurrent lookups of the same missing
+    key wait for one computation and share its result (single flight). Works for threads
+    (get) and for coroutines on an event loop (aget).
+
+    Attributes:
+        name (str): Cache label in the metrics.
+        ttl (float): Seconds a result is served from the cache.
+        max_entries (int): Maximum number of cached results (oldest are dropped first).
+    """
+
+    def __init__(self, ttl, max_entries=64, name="results"):
+        self.name = name
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._results = OrderedDict()
+        self._flights = {}
+        self._async_flights = {}
+        self._lock = threading.Lock()
+
+    def get(self, key, compute, cacheable=None):
+        """
+        Returns the cached result, or computes it once for every concurrent caller.
+
+        Params:
+            key: hashable - normalized request key
+            compute: callable - computes the result
+            cacheable: callable - whether a result may be kept for ttl seconds (default all)
+
+        Returns:
+            the result
+        """
+        with self._lock:
+            result = self._fresh(key)
+            if result is not None:
+                metrics.record_cache(self.name, True)
+                return result[0]
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+
+        if not leader:
+            flight.done.wait()
+            metrics.record_cache(self.name, True)
+            metrics.COALESCED_REQUESTS.inc(cache=self.name)
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+
+        metrics.record_cache(self.name, False)
+        try:
+            flight.value = compute()
+            self._store(key, flight.value, cacheable)
+            return flight.value
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+
+    async def aget(self, key, compute, cacheable=None):
+        """
+        Async variant of get. Waiting callers await the leader's task instead of
+        holding a thread.
+
+        Params:
+            key: hashable - normalized request key
+            compute: callable - coroutine function computing the result
+            cacheable: callable - whether a result may be kept for ttl seconds (default all)
+
+        Returns:
+            the result
+        """
+        with self._lock:
+            result = self._fresh(key)
+        if result is not None:
+            metrics.record_cache(self.name, True)
+            return result[0]
+
+        task = self._async_flights.get(key)
+        if task is not None:
+            metrics.record_cache(self.name, True)
+            metrics.COALESCED_REQUESTS.inc(cache=self.name)
+            return await asyncio.shield(task)
+
+        async def lead():
+            try:
+                value = await compute()
+                self._store(key, value, cacheable)
+                return value
+            finally:
+                self._async_flights.pop(key, None)
+
+        metrics.record_cache(self.name, False)
+        task = self._async_flights[key] = asyncio.ensure_future(lead())
+        return await asyncio.shield(task)
+
+    def _fresh(self, key):
+        entry = self._results.get(key)
+        if entry is None:
+            return None
+        if entry[1] < time.monotonic():
+            del self._results[key]
+            return None
+        return (entry[0],)
+
+    def _store(self, key, value, cacheable):
+        if self.ttl <= 0 or (cacheable is not None and not cacheable(value)):
+            return
+        with self._lock:
+            self._results.pop(key, None)
+            self._results[key] = (value, time.monotonic() + self.ttl)
+            while len(self._results) > self.max_entries:
+                self._results.popitem(last=False)
+
+
+class _Flight:
+    """
+    One in-flight computation that other threads wait on.
+    """
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
@@ -14,9 +14,11 @@ def predictions_to_json(df: pd.DataFrame) -> dict:
 
     for index, row in df.iterrows():
         # Convert to Unix timestamp 
+        # Hourly predictions carry an 'Hour' column, daily predictions start at midnight
         timestamp = int(pd.Timestamp(year=int(row['Year']), 
                                     month=int(row['Month']), 
-                                    day=int(row['Day'])).timestamp() * 1000)
+                                    day=int(row['Day']),
+                                    hour=int(row.get('Hour', 0))).timestamp() * 1000)
 
         # Normalize call volume
         # We can use this if we want to scale the volume of calls instead of using the raw value
@@ -46,6 +48,21 @@ def predictions_to_json(df: pd.DataFrame) -> dict:
     return {"features": features}
 
 
+def feature_times(df: pd.DataFrame) -> pd.Series:
+    """
+    Unix timestamps (ms) of prediction rows, as set in the "time" property by predictions_to_json.
+
+    Params:
+        df: pandas.DataFrame - prediction data
+
+    Returns:
+        pandas.Series - int64 timestamps
+    """
+    parts = df[["Year", "Month", "Day"]].set_axis(["year", "month", "day"], axis=1)
+    parts["hour"] = df["Hour"] if "Hour" in df.columns else 0
+    return (pd.to_datetime(parts) - pd.Timestamp(0)) // pd.Timedelta(milliseconds=1)
+
+
 def boundaries_to_geojson(boundaries_dict):
     """
     Convert cluster boundary data to GeoJSON format.
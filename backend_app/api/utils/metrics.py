@@ -0,0 +1,272 @@
+"""
+In-process metrics exposed in the Prometheus text format.
+
+Metrics are kept in memory per process (no external service). Recording is a dict
+lookup and a few additions under a lock, so it is cheap enough to leave on under load.
+"""
+import time
+import bisect
+import inspect
+import functools
+import threading
+
+# Default latency buckets in seconds
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+
+class Metric:
+    """
+    Base class for a labelled metric.
+
+    Attributes:
+        name (str): Metric name.
+        help (str): Description shown in the exposition.
+        labels (tuple): Label names.
+    """
+    type = None
+
+    def __init__(self, name, help, labels=()):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels):
+        return tuple(str(labels.get(label, "")) for label in self.labels)
+
+    def _format_labels(self, key, extra=None):
+        pairs = list(zip(self.labels, key)) + (extra or [])
+        if not pairs:
+            return ""
+        escaped = [(k, v.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")) for k, v in pairs]
+        return "{" + ",".join(f'{k}="{v}"' for k, v in escaped) + "}"
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.type}"]
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            lines.extend(self._render_value(key, value))
+        return lines
+
+    def _render_value(self, key, value):
+        return [f"{self.name}{self._format_labels(key)} {value}"]
+
+
+class Counter(Metric):
+    """
+    Monotonically increasing counter.
+    """
+    type = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def get(self, **labels):
+        return self._values.get(self._key(labels), 0)
+
+
+class Gauge(Metric):
+    """
+    Value that can go up and down.
+    """
+    type = "gauge"
+
+    def set(self, value, **labels):
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def clear(self, **labels):
+        """
+        Removes every value, or only the values matching the given labels.
+        """
+        with self._lock:
+            if not labels:
+                self._values.clear()
+                return
+            positions = [(self.labels.index(label), str(value)) for label, value in labels.items()]
+            for key in [key for key in self._values if all(key[i] == value for i, value in positions)]:
+                del self._values[key]
+
+
+class Histogram(Metric):
+    """
+    Histogram with fixed buckets (cumulative in the exposition).
+    """
+    type = "histogram"
+
+    def __init__(self, name, help, labels=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, help, labels)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            state[0][index] += 1
+            state[1] += value
+            state[2] += 1
+
+    def _render_value(self, key, value):
+        counts, total, count = value
+        lines = []
+        cumulative = 0
+        for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+            cumulative += bucket_count
+            le = "+Inf" if bound == float("inf") else repr(float(bound))
+            lines.append(f"{self.name}_bucket{self._format_labels(key, [('le', le)])} {cumulative}")
+        lines.append(f"{self.name}_sum{self._format_labels(key)} {total}")
+        lines.append(f"{self.name}_count{self._format_labels(key)} {count}")
+        return lines
+
+
+class Registry:
+    """
+    Collection of metrics rendered together.
+    """
+
+    def __init__(self):
+        self.metrics = []
+
+    def register(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def render(self):
+        lines = []
+        for metric in self.metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+# ----------------------------------------------------------------------------------------------
+# Application metrics
+# ----------------------------------------------------------------------------------------------
+REGISTRY = Registry()
+
+REQUEST_LATENCY = REGISTRY.register(Histogram(
+    "ems_http_request_duration_seconds", "Latency of API requests.", ["endpoint", "status"]))
+STAGE_LATENCY = REGISTRY.register(Histogram(
+    "ems_pipeline_stage_duration_seconds", "Duration of pipeline stages.", ["pipeline", "stage", "status"]))
+STAGE_ROWS = REGISTRY.register(Counter(
+    "ems_pipeline_stage_rows_total", "Input rows processed by pipeline stages.", ["pipeline", "stage"]))
+CACHE_REQUESTS = REGISTRY.register(Counter(
+    "ems_cache_requests_total", "Cache lookups by cache and result (hit/miss).", ["cache", "result"]))
+CACHE_HIT_RATIO = REGISTRY.register(Gauge(
+    "ems_cache_hit_ratio", "Share of cache lookups that were hits.", ["cache"]))
+CACHE_BYTES = REGISTRY.register(Gauge(
+    "ems_cache_bytes", "Estimated memory held by a cache.", ["cache"]))
+CACHE_ENTRIES = REGISTRY.register(Gauge(
+    "ems_cache_entries", "Number of entries in a cache.", ["cache"]))
+COALESCED_REQUESTS = REGISTRY.register(Counter(
+    "ems_coalesced_requests_total", "Requests that waited on an identical in-flight computation.", ["cache"]))
+CACHE_EVICTIONS = REGISTRY.register(Counter(
+    "ems_cache_evictions_total", "Entries evicted to stay within a cache's memory budget.", ["cache"]))
+PREDICTION_FILE_BYTES = REGISTRY.register(Gauge(
+    "ems_prediction_file_bytes", "Size of each published prediction file.", ["region", "file"]))
+MODEL_INFO = REGISTRY.register(Gauge(
+    "ems_model_info", "Currently published model version of each region.", ["region", "version"]))
+MODEL_TRAINED = REGISTRY.register(Gauge(
+    "ems_model_trained_timestamp_seconds", "Unix time the current model of each region was trained.", ["region"]))
+
+
+def timed_view(endpoint):
+    """
+    Decorator recording the latency and status code of a view (sync or async).
+
+    Params:
+        endpoint: str - endpoint label
+
+    Returns:
+        decorator
+    """
+    def decorator(view):
+        if inspect.iscoroutinefunction(view):
+            @functools.wraps(view)
+            async def async_wrapper(request, *args, **kwargs):
+                start = time.perf_counter()
+                status = 500
+                try:
+                    response = await view(request, *args, **kwargs)
+                    status = response.status_code
+                    return response
+                finally:
+                    REQUEST_LATENCY.observe(time.perf_counter() - start, endpoint=endpoint, status=status)
+            return async_wrapper
+
+        @functools.wraps(view)
+        def wrapper(request, *args, **kwargs):
+            start = time.perf_counter()
+            status = 500
+            try:
+                response = view(request, *args, **kwargs)
+                status = response.status_code
+                return response
+            finally:
+                REQUEST_LATENCY.observe(time.perf_counter() - start, endpoint=endpoint, status=status)
+        return wrapper
+    return decorator
+
+
+def observe_stage(pipeline, stage, status, seconds, rows=0):
+    """
+    Records one pipeline stage execution.
+
+    Params:
+        pipeline: str - pipeline name
+        stage: str - stage name
+        status: str - ran, cached or failed
+        seconds: float - stage duration
+        rows: int - input rows processed by the stage
+    """
+    STAGE_LATENCY.observe(seconds, pipeline=pipeline, stage=stage, status=status)
+    if rows:
+        STAGE_ROWS.inc(rows, pipeline=pipeline, stage=stage)
+
+
+def record_cache(cache, hit):
+    """
+    Records a cache lookup and updates the cache's hit ratio.
+
+    Params:
+        cache: str - cache name
+        hit: bool - whether the lookup was a hit
+    """
+    CACHE_REQUESTS.inc(cache=cache, result="hit" if hit else "miss")
+    hits = CACHE_REQUESTS.get(cache=cache, result="hit")
+    misses = CACHE_REQUESTS.get(cache=cache, result="miss")
+    CACHE_HIT_RATIO.set(hits / (hits + misses), cache=cache)
+
+
+def set_model_version(region, version, trained_at=None):
+    """
+    Publishes the current model version of a region.
+
+    Params:
+        region: str - region name
+        version: str - model version ID
+        trained_at: float - Unix time the model was trained
+    """
+    MODEL_INFO.clear(region=region)
+    MODEL_INFO.set(1, region=region, version=version)
+    if trained_at is not None:
+        MODEL_TRAINED.set(trained_at, region=region)
+
+
+def set_prediction_files(file_sizes, region=""):
+    """
+    Publishes the size of each prediction file.
+
+    Params:
+        file_sizes: dict - key = file name, value = size in bytes
+        region: str - region name ("" for files shared by every region, e.g. the SQLite database)
+    """
+    PREDICTION_FILE_BYTES.clear(region=region)
+    for file, size in file_sizes.items():
+        PREDICTION_FILE_BYTES.set(size, region=region, file=file)
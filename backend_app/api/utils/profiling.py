@@ -0,0 +1,221 @@
+"""
+Opt-in profiling of single API requests.
+
+A request with ?profile=1 (or an 'X-Profile: 1' header) runs its view under cProfile
+while a sampling thread records the view's call stack every few milliseconds. Two
+reports are saved to settings.FORECAST_PROFILE_FOLDER:
+    <id>.txt        - top functions by cumulative and own time (pstats)
+    <id>.collapsed  - sampled stacks in the collapsed format ("a;b;c 12"), ready for
+                      flamegraph.pl or speedscope
+The normal response is returned with an X-Profile-Id header naming the reports.
+
+Async views (ASGI) do their blocking work on worker threads (views.offload). Their
+profile follows the request into those threads through a context variable, so the
+reports cover the offloaded work of that request only, not the shared event loop.
+
+Profiling is allowed for staff users, or for everyone when settings.FORECAST_PROFILING
+is on (development and staging only: profiled requests are several times slower).
+"""
+import io
+import os
+import sys
+import time
+import uuid
+import pstats
+import inspect
+import cProfile
+import functools
+import threading
+import contextvars
+from collections import Counter
+from django.conf import settings
+
+# Functions listed per sort order in the text report
+TOP_FUNCTIONS = 40
+
+# Profile of the current async request, carried into offloaded calls (see call)
+ACTIVE_SESSION = contextvars.ContextVar("ems_profile_session", default=None)
+
+
+def requested(request):
+    """
+    Whether a request asks to be profiled and is allowed to.
+
+    Params:
+        request: django.http.HttpRequest
+
+    Returns:
+        bool
+    """
+    flag = request.GET.get("profile") or request.headers.get("X-Profile") or ""
+    if flag.lower() not in ("1", "true", "yes"):
+        return False
+    user = getattr(request, "user", None)
+    return settings.FORECAST_PROFILING or bool(user is not None and user.is_staff)
+
+
+class StackSampler:
+    """
+    Samples the call stacks of a set of threads at a fixed interval.
+
+    Attributes:
+        interval (float): Seconds between samples.
+        stacks (collections.Counter): key = collapsed stack (outermost frame first), value = samples.
+    """
+
+    def __init__(self, interval):
+        self.interval = interval
+        self.stacks = Counter()
+        self._thread_ids = set()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="ems-profile-sampler", daemon=True)
+
+    def add(self, thread_id):
+        with self._lock:
+            self._thread_ids.add(thread_id)
+
+    def discard(self, thread_id):
+        with self._lock:
+            self._thread_ids.discard(thread_id)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def collapsed(self):
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            with self._lock:
+                thread_ids = list(self._thread_ids)
+            frames = sys._current_frames()
+            for thread_id in thread_ids:
+                frame = frames.get(thread_id)
+                names = []
+                while frame is not None:
+                    code = frame.f_code
+                    names.append(f"{os.path.basename(code.co_filename)}:{code.co_qualname}")
+                    frame = frame.f_back
+                if names:
+                    self.stacks[";".join(reversed(names))] += 1
+
+
+class ProfileSession:
+    """
+    Profilers of one request: a cProfile per profiled call and a sampler over the threads
+    running them.
+
+    Attributes:
+        profilers (list): cProfile.Profile of every profiled call.
+        sampler (StackSampler): Stack samples of the threads while they run a profiled call.
+    """
+
+    def __init__(self):
+        self.profilers = []
+        self.sampler = StackSampler(settings.FORECAST_PROFILE_INTERVAL_MS / 1000)
+
+    def call(self, function, *args, **kwargs):
+        profiler = cProfile.Profile()
+        self.profilers.append(profiler)
+        thread_id = threading.get_ident()
+        self.sampler.add(thread_id)
+        try:
+            return profiler.runcall(function, *args, **kwargs)
+        finally:
+            self.sampler.discard(thread_id)
+
+
+def call(function, *args):
+    """
+    Runs a function under the profile of the current async request, if it is profiled
+    (used by views.offload on the worker thread).
+    """
+    session = ACTIVE_SESSION.get()
+    if session is None:
+        return function(*args)
+    return session.call(function, *args)
+
+
+def top_functions(profilers, limit=TOP_FUNCTIONS):
+    """
+    Text report of the functions with the most cumulative and own time.
+
+    Params:
+        profilers: list - cProfile.Profile objects, merged into one report
+        limit: int - functions listed per sort order
+    """
+    if not profilers:
+        return "No profiled calls\n"
+    out = io.StringIO()
+    stats = pstats.Stats(*profilers, stream=out).strip_dirs()
+    for order in ("cumulative", "tottime"):
+        out.write(f"Top {limit} functions by {order} time\n")
+        stats.sort_stats(order).print_stats(limit)
+    return out.getvalue()
+
+
+def save_reports(request, endpoint, session, seconds, response):
+    """
+    Writes the reports of a profiled request and names them in its response headers.
+    """
+    # Random suffix: requests profiled in the same second get their own reports
+    profile_id = f"{time.strftime('%Y%m%d-%H%M%S')}-{endpoint}-{uuid.uuid4().hex}"
+    os.makedirs(settings.FORECAST_PROFILE_FOLDER, exist_ok=True)
+    with open(os.path.join(settings.FORECAST_PROFILE_FOLDER, profile_id + ".txt"), "w") as f:
+        f.write(f"{request.method} {request.get_full_path()}  {seconds * 1000:.1f} ms\n\n")
+        f.write(top_functions(session.profilers))
+    with open(os.path.join(settings.FORECAST_PROFILE_FOLDER, profile_id + ".collapsed"), "w") as f:
+        f.write(session.sampler.collapsed())
+
+    response["X-Profile-Id"] = profile_id
+    response["Server-Timing"] = f"profile;dur={seconds * 1000:.1f}"
+    return response
+
+
+def profiled_view(endpoint):
+    """
+    Decorator running a view (sync or async) under the profilers when the request asks for
+    it (see requested). Other requests only pay for the check.
+
+    Params:
+        endpoint: str - endpoint name used in the report IDs
+    """
+    def decorator(view):
+        if inspect.iscoroutinefunction(view):
+            @functools.wraps(view)
+            async def async_wrapper(request, *args, **kwargs):
+                if not requested(request):
+                    return await view(request, *args, **kwargs)
+
+                session = ProfileSession()
+                token = ACTIVE_SESSION.set(session)
+                start = time.perf_counter()
+                session.sampler.start()
+                try:
+                    response = await view(request, *args, **kwargs)
+                finally:
+                    session.sampler.stop()
+                    ACTIVE_SESSION.reset(token)
+                return save_reports(request, endpoint, session, time.perf_counter() - start, response)
+            return async_wrapper
+
+        @functools.wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if not requested(request):
+                return view(request, *args, **kwargs)
+
+            session = ProfileSession()
+            start = time.perf_counter()
+            session.sampler.start()
+            try:
+                response = session.call(view, request, *args, **kwargs)
+            finally:
+                session.sampler.stop()
+            return save_reports(request, endpoint, session, time.perf_counter() - start, response)
+        return wrapper
+    return decorator
@@ -0,0 +1,61 @@
+import os
+import json
+import time
+import hashlib
+
+VERSION_FILE = "version.json"
+
+
+def file_digest(path, length=12):
+    """
+    Short content hash of a file, used as an artifact version.
+
+    Params:
+        path: str - file to hash
+        length: int - number of hex characters to keep
+
+    Returns:
+        str - hex digest
+    """
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()[:length]
+
+
+def write_version(folder, version, **fields):
+    """
+    Records the version of the artifact stored in a folder (model or predictions).
+
+    Params:
+        folder: str - artifact folder
+        version: str - version ID
+        **fields: extra metadata saved alongside the version
+
+    Returns:
+        dict - the saved version info
+    """
+    info = {"version": version, "created": time.time(), **fields}
+    tmp_path = os.path.join(folder, VERSION_FILE + ".tmp")
+    with open(tmp_path, "w") as f:
+        json.dump(info, f)
+    os.replace(tmp_path, os.path.join(folder, VERSION_FILE))
+    return info
+
+
+def read_version(folder):
+    """
+    Reads the version info of the artifact stored in a folder.
+
+    Params:
+        folder: str - artifact folder
+
+    Returns:
+        dict - version info, or None if no version has been recorded
+    """
+    try:
+        with open(os.path.join(folder, VERSION_FILE), "r") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
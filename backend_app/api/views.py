@@ -1,213 +1,1316 @@
 import pandas as pd
+import numpy as np
 import os
+import copy
 import json
+import math
 import pickle
+from concurrent.futures import ThreadPoolExecutor
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import HttpResponse, StreamingHttpResponse
+from django.views.decorators.http import require_GET
 from rest_framework.decorators import api_view
+from rest_framework.renderers import JSONRenderer
 from rest_framework.response import Response
-from .utils import geojson_converter
-from .cluster_predictions import model
+from . import events, regions, store
+from .utils import cache, geojson_converter, metrics, profiling, versions
+from .cluster_predictions import pipeline, prediction, rollups
+# The training and inference stack (model, preprocess, spatial_index: xgboost, scikit-learn,
+# scipy) is imported on demand by the views that use it, so workers that only serve
+# heatmaps and boundaries from published predictions never load it.
 
 # ----------------------------------------------------------------------------------------------
-# Global File Paths
+# Regions (file paths per region are in regions.py)
 # ----------------------------------------------------------------------------------------------
-DATA_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "data.csv")
-MODEL_FOLDER = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "model")
-CLUSTER_PATH = os.path.join(MODEL_FOLDER, "clusters.pkl")
-PREDICTIONS_FOLDER = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "predictions")
-GEOJSON_FOLDER = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "geojson")
+# Loaded spatial indexes, boundaries and prediction sets of every region, within one memory budget
+REGION_CACHE = cache.MemoryLRUCache(settings.FORECAST_REGION_CACHE_MB * 1024 * 1024, "region")
+
+
+def request_region(request):
+    """
+    Region selected by the 'region' query parameter (default settings.FORECAST_DEFAULT_REGION).
+
+    Raises:
+        regions.UnknownRegion: if the region is not configured
+    """
+    return regions.get_region(request.GET.get("region"))
+
+
+def file_version(path):
+    """
+    Modification time of a file, used as the cache version of what was loaded from it.
+
+    Returns:
+        int or None if the file does not exist
+    """
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+# ----------------------------------------------------------------------------------------------
+# Storage (settings.FORECAST_STORE: 'sqlite' or 'csv')
+# ----------------------------------------------------------------------------------------------
+class CallDataChanged(Exception):
+    """
+    Raised when a region's data.csv no longer matches the calls imported into the store
+    and calls were added since, so it can be neither used nor re-imported safely.
+    """
+
+
+def load_training_data(region):
+    """
+    Load the call history of a region used for training.
+    With the SQLite store, the region's data.csv is imported on first use and again
+    whenever its content changes (unless calls were added through /api/calls since the
+    last import), and EMS calls are read with an indexed query.
+
+    Returns:
+        pandas.DataFrame or None if no call data exists
+
+    Raises:
+        CallDataChanged: if data.csv changed after calls were added to the store
+    """
+    from .cluster_predictions import preprocess
+
+    if settings.FORECAST_STORE == "sqlite":
+        if os.path.exists(region.data_path):
+            digest = versions.file_digest(region.data_path)
+            imported = store.call_import(region.name)
+            has_calls = store.has_calls(region.name)
+            if not has_calls or imported is None or imported["digest"] != digest:
+                # Replacing is safe while the store holds nothing but the previous import
+                if has_calls and (imported is None or imported["calls"] != store.calls_signature(region.name)):
+                    raise CallDataChanged(
+                        f"{region.data_path} differs from the calls imported into the store, and calls were "
+                        "added since. Run 'manage.py import_calls --replace' to rebuild the store from it.")
+                store.import_calls(preprocess.read_data(region.data_path, low_memory=True), region.name,
+                                   digest, replace=True)
+        if not store.has_calls(region.name):
+            return None
+        return store.load_calls(region.name, emergency_type="EMS")
+
+    if not os.path.exists(region.data_path):
+        return None
+    return preprocess.read_data(region.data_path, settings.FORECAST_LOW_MEMORY)
+
+
+def read_published_predictions(region, start=None, end=None):
+    """
+    Read a region's published predictions from the store, restricted to [start, end]
+    where the store supports it.
+
+    Returns:
+        dict - key = cluster ID, value = ClusterPrediction
+    """
+    if settings.FORECAST_STORE == "sqlite":
+        return store.load_predictions(region.name, start, end)
+
+    try:
+        return prediction.load_predictions(region.predictions_folder)
+    except FileNotFoundError:
+        return {}
+
+
+def load_published_predictions(region, start=None, end=None):
+    """
+    Load a region's published predictions. Versioned prediction sets are loaded whole
+    once per process and kept in REGION_CACHE until a new set is published.
+
+    Returns:
+        dict - key = cluster ID, value = ClusterPrediction
+    """
+    version_info = versions.read_version(region.predictions_folder)
+    if version_info is None:
+        # Published before prediction sets were versioned
+        return read_published_predictions(region, start, end)
+
+    return REGION_CACHE.get(("predictions", region.name), version_info["version"],
+                            lambda: read_published_predictions(region))
+
+
+def publish_predictions(region, predictions, inputs=None):
+    """
+    Replace a region's published predictions with a new prediction set and record
+    its version (content hash), which tells every worker to reload it.
+
+    Params:
+        inputs: str - fingerprint of the prediction inputs (see prediction_fingerprint)
+
+    Returns:
+        dict - the recorded version info
+    """
+    os.makedirs(region.predictions_folder, exist_ok=True)
+    if settings.FORECAST_STORE == "sqlite":
+        store.save_predictions(predictions, region.name)
+    else:
+        prediction.clear_predictions(region.predictions_folder)
+        prediction.save_predictions(predictions, region.predictions_folder)
+
+    version_info = versions.write_version(region.predictions_folder, pipeline.fingerprint(predictions)[:12],
+                                          inputs=inputs)
+
+    # Keep recent sets as bases for delta heatmap responses
+    prediction.archive_predictions(predictions, region.predictions_folder, version_info["version"],
+                                   settings.FORECAST_PREDICTION_HISTORY)
+    return version_info
+
+
+def load_archived_predictions(region, version):
+    """
+    Load one of a region's recently published prediction sets.
+
+    Returns:
+        dict - key = cluster ID, value = ClusterPrediction, or None if the set is no longer kept
+    """
+    return REGION_CACHE.get(("archived", region.name, version), version,
+                            lambda: prediction.load_archived_predictions(region.predictions_folder, version))
 
 
 # ----------------------------------------------------------------------------------------------
 # Heatmap API
 # ----------------------------------------------------------------------------------------------
+# Maximum number of points (time steps x coordinates) in one heatmap response, about 7 days
+# of hourly points over 3000 coordinates
+MAX_HEATMAP_POINTS = 500_000
+
+# Rendered heatmap responses. Identical concurrent requests (same normalized parameters and
+# data version) share one computation, which is then reused for a few seconds.
+HEATMAP_RESPONSES = cache.SingleFlightCache(settings.FORECAST_HEATMAP_CACHE_SECONDS, name="heatmap")
+
+
+@metrics.timed_view("heatmap")
+@profiling.profiled_view("heatmap")
 @api_view(['GET'])
 def get_heatmap(request):
     """
     Retrieve heatmap data for a given time range with optional query parameters.
 
+    Longer ranges use coarser rollups (daily, weekly or monthly points), so a one-year
+    heatmap has about as many points as a one-week one and every response has at most
+    MAX_HEATMAP_POINTS points.
+
     Query Parameters:
         start_date: str (YYYY-MM-DD) - The beginning of the time range.
-        end_date: str (YYYY-MM-DD) - The end of the time range (max 7 days difference).
+        end_date: str (YYYY-MM-DD) - The end of the time range.
+        granularity: str (hourly|daily|weekly|monthly|auto) - Time step of the heatmap points
+            (default auto: the coarsest time step giving rollups.MIN_PERIODS steps over the
+            range, see rollups.choose_granularity).
+        mode: str (forecast|historical) - Predicted calls (default) or actual calls. The
+            historical mode requires a date range and is widened to whole periods.
+        region: str - Region ID (default settings.FORECAST_DEFAULT_REGION).
+        since_version: str - Prediction version the client already holds (forecast mode).
+            Returns the changes since that version (see heatmap_delta) while it is one of
+            the last settings.FORECAST_PREDICTION_HISTORY published sets, otherwise the
+            full heatmap.
 
     Returns:
-        JSON response containing a single combined GeoJSON heatmap object.
+        JSON response containing a single combined GeoJSON heatmap object, with the
+        prediction "version" in the forecast mode.
     """
-    # Get all prediction files
-    prediction_files = []
-    for file in os.listdir(PREDICTIONS_FOLDER):
-        if file.startswith("cluster_") and file.endswith(".csv"):
-            prediction_files.append(file)
+    query = request.GET
+    key = heatmap_key(query)
+    # Profiled requests are always rendered, so the profile shows the work behind the response
+    if key is None or profiling.requested(request):
+        content, status = render_json(build_heatmap, query)
+    else:
+        content, status = HEATMAP_RESPONSES.get(key, lambda: render_json(build_heatmap, query), cacheable_response)
+    return HttpResponse(content, status=status, content_type="application/json")
 
-    # If no prediction files exist, return error
-    if not prediction_files:
-        return Response({"error": "No prediction data found. Please run /predict first."}, status=404)
 
-    # geojson requires a list/array for the features rather than a dict/obj
-    combined_geojson = {"type": "FeatureCollection", "features": []}
+def heatmap_key(query):
+    """
+    Normalized heatmap parameters and the version of the data they are served from
+    (the prediction set, or the model whose rollups the historical mode reads).
+
+    Params:
+        query: QueryDict - query parameters of get_heatmap
+
+    Returns:
+        tuple or None if the parameters are invalid (build_heatmap reports the error)
+    """
+    try:
+        region = regions.get_region(query.get("region"))
+        start_date, end_date = query.get("start_date"), query.get("end_date")
+        if start_date and end_date:
+            dates = (pd.to_datetime(start_date).date().isoformat(), pd.to_datetime(end_date).date().isoformat())
+        else:
+            dates = (None, None)
+    except Exception:
+        return None
+
+    mode = query.get("mode", "forecast")
+    version_info = versions.read_version(region.predictions_folder if mode == "forecast" else region.model_folder)
+    return (region.name, mode, query.get("granularity", "auto"), *dates, query.get("since_version"),
+            version_info["version"] if version_info else None)
 
-    # Get query date parameters
-    start_date = request.GET.get("start_date")
-    end_date = request.GET.get("end_date")
-    json_index = 0
 
-    # Loop through each prediction file
-    for file in prediction_files:
-        # Extract cluster ID from filename
-        cluster_id = file.split("_")[1].split(".")[0]  
-        file_path = os.path.join(PREDICTIONS_FOLDER, file)
+def render_json(build, query):
+    """
+    Build a response body and render it to JSON bytes.
+
+    Returns:
+        tuple - (JSON bytes, HTTP status)
+    """
+    body, status = build(query)
+    return JSONRenderer().render(body), status
+
+
+def cacheable_response(result):
+    # Server errors are not reused
+    return result[1] < 500
 
+
+def build_heatmap(query):
+    """
+    Build the heatmap response (shared by get_heatmap and get_heatmap_async).
+
+    Params:
+        query: QueryDict - query parameters of get_heatmap
+
+    Returns:
+        tuple - (JSON body, HTTP status)
+    """
+    # Get query parameters
+    try:
+        region = regions.get_region(query.get("region"))
+    except regions.UnknownRegion as e:
+        return {"error": str(e)}, 400
+    start_date = query.get("start_date")
+    end_date = query.get("end_date")
+    granularity = query.get("granularity", "auto")
+    mode = query.get("mode", "forecast")
+
+    if mode not in ("forecast", "historical"):
+        return {"error": "Mode must be 'forecast' or 'historical'."}, 400
+
+    options = rollups.GRANULARITIES if mode == "forecast" else rollups.CALL_ROLLUPS
+    if granularity != "auto" and granularity not in options:
+        return {"error": f"Granularity must be one of: {', '.join(options + ['auto'])}."}, 400
+
+    start_dt, end_dt = None, None
+    if start_date and end_date:
         try:
-            # Read cluster prediction data
-            df = pd.read_csv(file_path)
+            start_dt = pd.to_datetime(start_date)
+            end_dt = pd.to_datetime(end_date)
+        except Exception as e:
+            return {"error": f"Invalid date format: {e}"}, 400
+
+        if end_dt < start_dt:
+            return {"error": "end_date must not be before start_date."}, 400
+    elif mode == "historical":
+        return {"error": "The historical mode requires start_date and end_date."}, 400
+
+    if mode == "historical":
+        # Pick the rollup, then ensure its rows fit the point budget
+        def count_points(granularity):
+            first, last = rollups.period_range(start_dt, end_dt, granularity)
+            return store.count_call_rollups(region.name, granularity, first.date(), last.date())
+
+        try:
+            granularity = resolve_granularity(granularity, start_dt, end_dt, count_points, options)
+        except ValueError as e:
+            return {"error": str(e)}, 400
+
+        combined_geojson = {"type": "FeatureCollection", "granularity": granularity, "features": []}
+        first, last = rollups.period_range(start_dt, end_dt, granularity)
+        df = store.load_call_rollups(region.name, granularity, first.date(), last.date())
+        if df.empty:
+            return {"error": "No historical call data found. Please run /train first."}, 404
+
+        # Same columns as an expanded prediction, dated by the start of each period
+        df["Cluster_Count"] = df.groupby(["Period", "Cluster"])["Count"].transform("sum")
+        df["Year"] = df["Period"].dt.year
+        df["Month"] = df["Period"].dt.month
+        df["Day"] = df["Period"].dt.day
+        combined_geojson["features"].extend(geojson_converter.predictions_to_json(df)["features"].values())
+        return combined_geojson, 200
 
-            # Convert date columns to datetime if filtering is needed
-            if start_date and end_date:
-                try:
-                    df["date"] = pd.to_datetime(df[["Year", "Month", "Day"]])
-                    start_dt = pd.to_datetime(start_date)
-                    end_dt = pd.to_datetime(end_date)
+    # Load the factorized predictions (totals + distribution) for every cluster
+    version_info = versions.read_version(region.predictions_folder)
+    predictions = load_published_predictions(
+        region,
+        start_dt.date() if start_dt is not None else None,
+        end_dt.date() if end_dt is not None else None
+    )
 
-                    # Ensure the time range is valid (max 7 days)
-                    if (end_dt - start_dt).days > 7 or (end_dt - start_dt).days < 0:
-                        return Response({"error": "Time range is not at or within 7 day range."}, status=400)
+    # If no predictions exist, return error
+    if not predictions:
+        return {"error": "No prediction data found. Please run /predict first."}, 404
 
-                    # Filter data within the time range
-                    df = df[(df["date"] >= start_dt) & (df["date"] <= end_dt)]
+    # Pick the time step over the requested range (or the whole forecast), then ensure the
+    # expanded points fit the budget
+    first_day, last_day = start_dt, end_dt
+    if first_day is None:
+        days = pd.to_datetime(next(iter(predictions.values())).daily[["Year", "Month", "Day"]])
+        first_day, last_day = days.min(), days.max()
+    cells = sum(len(cluster_prediction.lat_lng_dist) for cluster_prediction in predictions.values())
+    try:
+        granularity = resolve_granularity(
+            granularity, first_day, last_day,
+            lambda granularity: rollups.count_periods(first_day, last_day, granularity) * cells, options)
+    except ValueError as e:
+        return {"error": str(e)}, 400
+
+    version = version_info["version"] if version_info else None
+    since_version = query.get("since_version")
+    if since_version and version is not None:
+        base = predictions if since_version == version else load_archived_predictions(region, since_version)
+        if base is not None:
+            try:
+                delta = heatmap_delta(base, predictions, start_dt, end_dt, granularity)
+            except Exception as e:
+                return {"error": f"Failed to compare predictions: {e}"}, 500
+            return {"type": "HeatmapDelta", "granularity": granularity, "version": version,
+                    "since_version": since_version, **delta}, 200
+    # geojson requires a list/array for the features rather than a dict/obj
+    combined_geojson = {"type": "FeatureCollection", "granularity": granularity, "features": [],
+                        "version": version}
+    combined_geojson["periods"] = forecast_periods(predictions, start_dt, end_dt, granularity)
 
-                except Exception as e:
-                    return Response({"error": f"Invalid date format: {e}"}, status=400)
+    # Loop through each cluster prediction
+    for cluster_id, cluster_prediction in predictions.items():
+        try:
+            # Expand point volumes only for the requested slice
+            df = cluster_prediction.expand(start_dt, end_dt, granularity)
 
             # Convert DataFrame to GeoJSON and add "Cluster" property
             geojson_features = geojson_converter.predictions_to_json(df)["features"]
-                
+
             # Append to combined GeoJSON
-            for feature in geojson_features.values():
-                # combined_geojson["features"][json_index] = feature
-                # json_index += 1
-                combined_geojson["features"].append(feature)
+            combined_geojson["features"].extend(geojson_features.values())
 
         except Exception as e:
-            return Response({"error": f"Failed to process cluster {cluster_id}: {e}"}, status=500)
+            return {"error": f"Failed to process cluster {cluster_id}: {e}"}, 500
+
+    return combined_geojson, 200
+
+
+def resolve_granularity(granularity, start, end, count_points, options=rollups.GRANULARITIES):
+    """
+    Time step of a heatmap response, resolving 'auto' with rollups.choose_granularity.
+
+    Params:
+        granularity: str - requested granularity or 'auto'
+        start: pandas.Timestamp - first day of the range
+        end: pandas.Timestamp - last day of the range
+        count_points: callable - number of points the response has at a granularity
+        options: list - allowed granularities, finest first
+
+    Returns:
+        str - granularity
+
+    Raises:
+        ValueError: if the response would have more than MAX_HEATMAP_POINTS points
+    """
+    if granularity == "auto":
+        granularity = rollups.choose_granularity(start, end, MAX_HEATMAP_POINTS, count_points, options)
+    points = count_points(granularity)
+    if points > MAX_HEATMAP_POINTS:
+        raise ValueError(f"The {granularity} heatmap would have {points} points (max {MAX_HEATMAP_POINTS}). "
+                         f"Use a coarser granularity, a shorter range or 'auto'.")
+    return granularity
+
+
+def forecast_periods(predictions, start_dt, end_dt, granularity):
+    """
+    Time steps of a forecast heatmap with the forecast hours each one sums (steps at the
+    ends of the forecast can cover part of a day, week or month, see ClusterPrediction.totals).
+
+    Returns:
+        list - {"time": Unix ms as in the features, "hours": forecast hours} per time step
+    """
+    totals = next(iter(predictions.values())).totals(granularity, start_dt, end_dt)
+    times = geojson_converter.feature_times(totals)
+    return [{"time": int(time), "hours": int(hours)} for time, hours in zip(times, totals["Hours"])]
+
+
+# Columns identifying one heatmap point
+POINT_KEY = ["Long", "Lat", "Time", "Cluster"]
+
 
-    return Response(combined_geojson, status=200)
+def expand_points(predictions, start_dt, end_dt, granularity):
+    """
+    Point volumes of every cluster, keyed like the heatmap features (POINT_KEY, with
+    Time in Unix ms) and rounded like their volumes.
+
+    Returns:
+        pandas.DataFrame
+    """
+    frames = [cluster_prediction.expand(start_dt, end_dt, granularity) for cluster_prediction in predictions.values()]
+    points = pd.concat(frames, ignore_index=True)
+    points["Time"] = geojson_converter.feature_times(points)
+    points["Volume"] = points["Count"].round(5)
+    points["Cluster_Volume"] = points["Cluster_Count"].round(5)
+    return points
+
+
+def heatmap_delta(base, predictions, start_dt, end_dt, granularity):
+    """
+    Changes of the heatmap between two prediction sets over the same slice.
+
+    Params:
+        base: dict - prediction set the client holds (key = cluster ID, value = ClusterPrediction)
+        predictions: dict - current prediction set
+
+    Returns:
+        dict -
+            times: {"added": [...], "removed": [...]} - time steps (Unix ms) new in or gone
+                from the slice. Clients drop every point at a removed time.
+            added: list - GeoJSON features of new points
+            changed: list - [lng, lat, time, cluster_id, volume, cluster_volume] of points
+                whose volumes changed
+            removed: list - [lng, lat, time, cluster_id] of points gone at the remaining times
+    """
+    current = expand_points(predictions, start_dt, end_dt, granularity)
+    previous = expand_points(base, start_dt, end_dt, granularity)
+    merged = current.merge(previous[POINT_KEY + ["Volume", "Cluster_Volume"]], on=POINT_KEY, how="outer",
+                           suffixes=("", "_Base"), indicator=True)
+
+    current_times, previous_times = set(current["Time"].tolist()), set(previous["Time"].tolist())
+    removed_times = previous_times - current_times
 
+    added = merged[merged["_merge"] == "left_only"]
+    removed = merged[(merged["_merge"] == "right_only") & ~merged["Time"].isin(removed_times)]
+    both = merged[merged["_merge"] == "both"]
+    changed = both[(both["Volume"] != both["Volume_Base"]) | (both["Cluster_Volume"] != both["Cluster_Volume_Base"])]
 
+    def rows(df, columns):
+        return [list(row) for row in zip(*(df[column].tolist() for column in columns))]
 
+    return {
+        "times": {"added": sorted(current_times - previous_times), "removed": sorted(removed_times)},
+        "added": list(geojson_converter.predictions_to_json(added)["features"].values()),
+        "changed": rows(changed, POINT_KEY + ["Volume", "Cluster_Volume"]),
+        "removed": rows(removed, POINT_KEY),
+    }
+
+
+@metrics.timed_view("boundaries")
 @api_view(['GET'])
 def get_boundaries(request):
     """
     Retrieve boundaries for each cluster.
 
+    Query Parameters:
+        region: str - Region ID (default settings.FORECAST_DEFAULT_REGION).
+
     Returns:
         GeoJSON response containing cluster boundaries as a polygon feature type.
     """
-    boundaries_path = os.path.join(MODEL_FOLDER, "boundaries.json")
+    body, status = build_boundaries(request.GET)
+    return Response(body, status=status)
+
+
+def build_boundaries(query):
+    """
+    Build the boundaries response (shared by get_boundaries and get_boundaries_async).
+
+    Params:
+        query: QueryDict - query parameters of get_boundaries
+
+    Returns:
+        tuple - (GeoJSON body, HTTP status)
+    """
+    try:
+        region = regions.get_region(query.get("region"))
+    except regions.UnknownRegion as e:
+        return {"error": str(e)}, 400
 
     # Check if boundaries file exists
-    if not os.path.exists(boundaries_path):
-        return Response({"error": "Cluster boundaries not found"}, status=404)
+    version = file_version(region.boundaries_path)
+    if version is None:
+        return {"error": "Cluster boundaries not found"}, 404
+
+    def load_boundaries():
+        with open(region.boundaries_path, "r") as f:
+            return geojson_converter.boundaries_to_geojson(json.load(f))
 
-    # Load boundaries JSON file
+    # Load boundaries JSON file and convert it to GeoJSON (once per model version)
     try:
-        with open(boundaries_path, "r") as f:
-            boundaries = json.load(f)
+        geojson_boundaries = REGION_CACHE.get(("boundaries", region.name), version, load_boundaries)
     except Exception as e:
-        return Response({"error": f"Failed to load boundaries: {e}"}, status=500)
+        return {"error": f"Failed to load boundaries: {e}"}, 500
+
+    return geojson_boundaries, 200
+
+
+@metrics.timed_view("regions")
+@api_view(['GET'])
+def get_regions(request):
+    """
+    List the regions served by this deployment.
+
+    Returns:
+        JSON list with the ID, name, map center and default flag of each region.
+    """
+    return Response([region.to_json() for region in regions.all_regions()], status=200)
+
+
+def region_versions(region):
+    """
+    Current model and prediction version IDs of a region (None until first published).
+
+    Returns:
+        dict - region, model and predictions version IDs
+    """
+    model_info = versions.read_version(region.model_folder)
+    predictions_info = versions.read_version(region.predictions_folder)
+    return {
+        "region": region.name,
+        "model": model_info["version"] if model_info else None,
+        "predictions": predictions_info["version"] if predictions_info else None,
+    }
+
+
+@metrics.timed_view("versions")
+@api_view(['GET'])
+def get_versions(request):
+    """
+    Current model and prediction versions of a region. Clients that cannot keep an
+    /api/events stream open poll this instead and refetch the heatmap on change.
+
+    Query Parameters:
+        region: str - Region ID (default settings.FORECAST_DEFAULT_REGION).
+
+    Returns:
+        JSON with the region, model and predictions version IDs.
+    """
+    try:
+        region = request_region(request)
+    except regions.UnknownRegion as e:
+        return Response({"error": str(e)}, status=400)
 
-    # Convert boundaries to GeoJSON
-    geojson_boundaries = geojson_converter.boundaries_to_geojson(boundaries)
-    return Response(geojson_boundaries, status=200)
+    return Response(region_versions(region), status=200)
+
+
+# ----------------------------------------------------------------------------------------------
+# Async Heatmap API (ASGI deployment, settings.FORECAST_ASYNC_VIEWS)
+# ----------------------------------------------------------------------------------------------
+# Bounded pool for file/database reads and GeoJSON conversion. Waiting requests are held by
+# the event loop, so concurrent clients do not each need a thread.
+ASYNC_EXECUTOR = ThreadPoolExecutor(max_workers=settings.FORECAST_ASYNC_WORKERS, thread_name_prefix="ems-async")
+
+
+async def offload(function, *args):
+    """
+    Run a blocking function on ASYNC_EXECUTOR without blocking the event loop. The call is
+    profiled when its request is (see profiling.call).
+    """
+    return await sync_to_async(profiling.call, thread_sensitive=False, executor=ASYNC_EXECUTOR)(function, *args)
+
+
+@metrics.timed_view("heatmap")
+@profiling.profiled_view("heatmap")
+@require_GET
+async def get_heatmap_async(request):
+    """
+    Native async variant of get_heatmap (same parameters and response). Requests waiting
+    on an identical in-flight heatmap await it on the event loop.
+    """
+    key = await offload(heatmap_key, request.GET)
+
+    def render():
+        return offload(render_json, build_heatmap, request.GET)
+
+    # Profiled requests are always rendered, as in get_heatmap
+    if key is None or profiling.requested(request):
+        content, status = await render()
+    else:
+        content, status = await HEATMAP_RESPONSES.aget(key, render, cacheable_response)
+    return HttpResponse(content, status=status, content_type="application/json")
+
+
+@metrics.timed_view("boundaries")
+@require_GET
+async def get_boundaries_async(request):
+    """
+    Native async variant of get_boundaries (same parameters and response).
+    """
+    content, status = await offload(render_json, build_boundaries, request.GET)
+    return HttpResponse(content, status=status, content_type="application/json")
+
+
+def read_all_versions():
+    return {region.name: region_versions(region) for region in regions.all_regions()}
+
+
+# One per process: a single poll of the version files serves every open event stream
+VERSION_WATCHER = events.VersionWatcher(read_all_versions, offload, settings.FORECAST_EVENTS_POLL_SECONDS)
+
+
+@require_GET
+async def get_events(request):
+    """
+    Server-sent events stream announcing new model and prediction versions of a region.
+
+    A 'version' event with the current versions is sent on connect and again whenever a
+    new model is trained or new predictions are published, so clients refetch the heatmap
+    only on change instead of polling it. Idle streams get a keep-alive comment every
+    settings.FORECAST_EVENTS_KEEPALIVE_SECONDS. Meant for the ASGI deployment, where an
+    open stream does not hold a worker thread.
+
+    Query Parameters:
+        region: str - Region ID (default settings.FORECAST_DEFAULT_REGION).
+
+    Returns:
+        text/event-stream, e.g.
+            event: version
+            id: <model version>:<predictions version>
+            data: {"region": "charlotte", "model": "...", "predictions": "..."}
+    """
+    try:
+        region = request_region(request)
+    except regions.UnknownRegion as e:
+        return HttpResponse(json.dumps({"error": str(e)}), status=400, content_type="application/json")
+
+    async def stream():
+        sent = None
+        current = await VERSION_WATCHER.subscribe()
+        try:
+            # Reconnect delay (ms) for the browser's EventSource
+            yield "retry: 5000\n\n"
+            while True:
+                versions_info = current.get(region.name)
+                if versions_info != sent:
+                    sent = versions_info
+                    yield (f"event: version\nid: {versions_info['model']}:{versions_info['predictions']}\n"
+                           f"data: {json.dumps(versions_info)}\n\n")
+                else:
+                    yield ": keep-alive\n\n"
+                current = await VERSION_WATCHER.wait(settings.FORECAST_EVENTS_KEEPALIVE_SECONDS)
+        finally:
+            VERSION_WATCHER.unsubscribe()
+
+    response = StreamingHttpResponse(stream(), content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"
+    return response
+
+
+@require_GET
+def get_events_unavailable(request):
+    """
+    /api/events under WSGI (settings.FORECAST_ASYNC_VIEWS off). A WSGI server drains a streaming
+    response's async generator before sending anything, so an event stream would never deliver
+    an event and would hold a worker thread. The 501 makes EventSource clients give up on the
+    stream and poll /api/versions instead.
+    """
+    return HttpResponse(json.dumps({"error": "Live version events require the ASGI server. Poll /api/versions/."}),
+                        status=501, content_type="application/json")
 
 
 # ----------------------------------------------------------------------------------------------
 # Model Workflow API
 # ----------------------------------------------------------------------------------------------
+# Train and predict record a fingerprint of their inputs in the version.json of their output
+# and return the existing model/predictions while the fingerprint is unchanged (unless
+# ?force=true), so repeated calls cost a few small queries instead of a full run.
+def force_requested(request):
+    """
+    Whether the 'force' query parameter asks to rerun work whose inputs are unchanged.
+    """
+    return request.GET.get("force", "").lower() in ("1", "true", "yes")
+
+
+def training_fingerprint(region):
+    """
+    Fingerprint of a region's training inputs: its call data (content hash of data.csv and,
+    with the SQLite store, the signature of the stored calls) and the training settings.
+    data.csv is hashed even when the store already holds calls, so a replaced file reaches
+    training (see load_training_data).
+
+    Returns:
+        str or None if the region has no call data
+    """
+    data = {}
+    if os.path.exists(region.data_path):
+        data["csv"] = versions.file_digest(region.data_path)
+    if settings.FORECAST_STORE == "sqlite" and store.has_calls(region.name):
+        data["sqlite"] = store.calls_signature(region.name)
+    if not data:
+        return None
+
+    return pipeline.fingerprint({
+        "data": data,
+        "store": settings.FORECAST_STORE,
+        "low_memory": settings.FORECAST_LOW_MEMORY,
+        "engine": settings.FORECAST_ENGINE,
+        "engine_overrides": settings.FORECAST_ENGINE_OVERRIDES,
+        "external_memory": settings.FORECAST_EXTERNAL_MEMORY,
+        "split": settings.FORECAST_EXTERNAL_MEMORY_SPLIT,
+    })[:12]
+
+
+def prediction_fingerprint(region, start, horizon=prediction.HORIZON_HOURS):
+    """
+    Fingerprint of a region's prediction inputs: model version, forecast start and horizon,
+    distribution pruning and, when the running state is used, the stored calls.
+
+    Returns:
+        str
+    """
+    model_info = versions.read_version(region.model_folder) or {}
+    inputs = {
+        "model": model_info.get("version"),
+        "start": start.isoformat(),
+        "horizon": horizon,
+        "top_k": settings.FORECAST_DISTRIBUTION_TOP_K,
+        "mass": settings.FORECAST_DISTRIBUTION_MASS,
+    }
+    if store.has_running_state(region.name):
+        inputs["calls"] = store.calls_signature(region.name)
+    return pipeline.fingerprint(inputs)[:12]
+
+
+def up_to_date(folder, fingerprint, *paths):
+    """
+    Version info of the artifact in a folder if it was built from the same inputs
+    and all of its files exist, else None.
+    """
+    info = versions.read_version(folder)
+    if fingerprint is None or not info or info.get("inputs") != fingerprint:
+        return None
+    return info if all(os.path.exists(path) for path in paths) else None
+
+
+@metrics.timed_view("train")
+@profiling.profiled_view("train")
 @api_view(['POST'])
 def train_model(request):
     """
-    Trigger workflow to retrain the model using all current data in backend_app/data/data.csv.
+    Trigger workflow to retrain a region's model using all of its current call data
+    (backend_app/data/data.csv for the default region).
+
+    Query Parameters:
+        region: str - Region ID (default settings.FORECAST_DEFAULT_REGION).
+        force: bool - retrain even if the call data and training settings are unchanged.
 
     Returns:
         JSON response indicating the success of the model training process.
     """
     try:
-        # Ensure model and predictions directories exist
-        os.makedirs(MODEL_FOLDER, exist_ok=True)
-        os.makedirs(PREDICTIONS_FOLDER, exist_ok=True)
+        region = request_region(request)
+    except regions.UnknownRegion as e:
+        return Response({"error": str(e)}, status=400)
 
-        # Check if the dataset exists
-        if not os.path.exists(DATA_PATH):
-            return Response({"error": "Training data file not found."}, status=404)
+    try:
+        # Skip training if the current model was trained on the same inputs
+        current = up_to_date(region.model_folder, training_fingerprint(region),
+                             region.cluster_path, region.boundaries_path, region.index_path)
+        if current and not force_requested(request):
+            return Response({"message": "Model is up to date; training skipped.",
+                             "version": current["version"], "skipped": True}, status=200)
+
+        # Ensure model and predictions directories exist
+        os.makedirs(region.model_folder, exist_ok=True)
+        os.makedirs(region.predictions_folder, exist_ok=True)
 
         # Load data
         try:
-            input_df = pd.read_csv(DATA_PATH)
+            input_df = load_training_data(region)
+            if input_df is None:
+                return Response({"error": "Training data file not found."}, status=404)
             if input_df.empty:
                 return Response({"error": "Training data is empty."}, status=400)
+        except CallDataChanged as e:
+            return Response({"error": str(e)}, status=409)
         except Exception as e:
-            return Response({"error": f"Error reading CSV: {e}"}, status=500)
+            return Response({"error": f"Error reading training data: {e}"}, status=500)
 
         # Train the model
         try:
-            clusters, boundaries = model.prepare_and_train_model(input_df)
+            from .cluster_predictions import model
+            clusters, boundaries, cluster_index = model.prepare_and_train_model(
+                input_df, region.checkpoint_folder, low_memory=settings.FORECAST_LOW_MEMORY,
+                engine=settings.FORECAST_ENGINE, engine_overrides=settings.FORECAST_ENGINE_OVERRIDES,
+                feature_dir=region.feature_folder if settings.FORECAST_EXTERNAL_MEMORY else None,
+                split=settings.FORECAST_EXTERNAL_MEMORY_SPLIT)
 
             # Dump the trained model into a pickle file
-            with open(CLUSTER_PATH, "wb") as f:
+            with open(region.cluster_path, "wb") as f:
                 pickle.dump(clusters, f)
             
             # Dump the boundaries into a JSON file
-            with open(os.path.join(MODEL_FOLDER, "boundaries.json"), "w") as f:
+            with open(region.boundaries_path, "w") as f:
                 json.dump(boundaries, f)
+
+            # Save the point-to-cluster lookup used by call ingestion and point queries
+            cluster_index.save(region.index_path)
+
+            # Restart the running counts and historical heatmap rollups from the training data
+            store.reset_running_state(clusters, region.name)
+            calls = input_df.loc[input_df['CauseCategory'] == 'EMS', ['Dispatched', 'Latitude', 'Longitude']].dropna()
+            calls['Cluster'] = cluster_index.assign(calls['Latitude'], calls['Longitude'])
+            store.reset_call_rollups(calls, region.name)
+
+            # Record the model version (content hash of the pickled clusters) and its inputs
+            # (fingerprinted after loading, which imports data.csv into the store on first use)
+            version_info = versions.write_version(region.model_folder, versions.file_digest(region.cluster_path),
+                                                  inputs=training_fingerprint(region))
+            metrics.set_model_version(region.name, version_info["version"], version_info["created"])
         except Exception as e:
             return Response({"error": f"Model training failed: {e}"}, status=500)
 
-        return Response({"message": "Model training completed successfully."}, status=200)
+        return Response({"message": "Model training completed successfully.",
+                         "version": version_info["version"], "skipped": False}, status=200)
 
     except Exception as e:
         return Response({"error": f"An error occurred: {e}"}, status=500)
 
 
+@metrics.timed_view("predict")
+@profiling.profiled_view("predict")
 @api_view(['GET'])
 def make_predictions(request):
     """
-    Load the trained clusters and run predictions.
+    Load a region's trained clusters and run predictions.
+
+    Query Parameters:
+        region: str - Region ID (default settings.FORECAST_DEFAULT_REGION).
+        force: bool - predict even if the model, forecast start and calls are unchanged.
 
     Returns:
         JSON response indicating the success of the prediction process.
     """
+    try:
+        region = request_region(request)
+    except regions.UnknownRegion as e:
+        return Response({"error": str(e)}, status=400)
+
     try:
         # Ensure model exists
-        if not os.path.exists(CLUSTER_PATH):
+        if not os.path.exists(region.cluster_path):
             return Response({"error": "Trained model not found. Run training first."}, status=404)
 
-        # Load trained clusters
+        # Skip prediction if the published predictions were made from the same inputs
+        start = pd.Timestamp.today().normalize()
+        inputs = prediction_fingerprint(region, start)
+        current = up_to_date(region.predictions_folder, inputs)
+        if current and not force_requested(request):
+            return Response({"message": "Predictions are up to date; prediction skipped.",
+                             "version": current["version"], "skipped": True}, status=200)
+
+        # Load trained clusters with the coordinate distributions kept current by call ingestion
         try:
-            with open(CLUSTER_PATH, "rb") as f:
-                clusters = pickle.load(f)
+            clusters = load_trained_clusters(region)
         except Exception as e:
             return Response({"error": f"Failed to load model: {e}"}, status=500)
 
-        # Delete existing prediction files
-        for file in os.listdir(PREDICTIONS_FOLDER):
-            if file.startswith("cluster_") and file.endswith(".csv"):
-                os.remove(os.path.join(PREDICTIONS_FOLDER, file))
-
         # Make predictions
         try:
-            predictions_dict = model.predict_model(clusters)
+            from .cluster_predictions import model
+            predictions_dict = model.predict_model(clusters, region.checkpoint_folder, start=start,
+                                                   top_k=settings.FORECAST_DISTRIBUTION_TOP_K,
+                                                   mass=settings.FORECAST_DISTRIBUTION_MASS)
         except Exception as e:
             return Response({"error": f"Prediction process failed: {e}"}, status=500)
 
-        # Save predictions to CSV
+        # Replace the published predictions (totals + distribution)
         try:
-            for cluster_id, df in predictions_dict.items():
-                output_file = os.path.join(PREDICTIONS_FOLDER, f"cluster_{cluster_id}.csv")
-                df.to_csv(output_file, index=False)
+            version_info = publish_predictions(region, predictions_dict, inputs)
 
-            return Response({"message": "Predictions completed and saved successfully."}, status=200)
+            return Response({"message": "Predictions completed and saved successfully.",
+                             "version": version_info["version"], "skipped": False}, status=200)
 
         except Exception as e:
             return Response({"error": f"Failed to save predictions: {e}"}, status=500)
 
     except Exception as e:
         return Response({"error": f"An error occurred: {e}"}, status=500)
+
+
+def load_trained_clusters(region):
+    """
+    Load a region's trained clusters with the coordinate distributions kept current by
+    call ingestion. The unpickled model stays in REGION_CACHE until it is retrained; every
+    call gets its own copies of the Cluster objects, so predicting never changes the cached ones.
+
+    Returns:
+        list - Cluster objects, or None if no model has been trained
+    """
+    version = file_version(region.cluster_path)
+    if version is None:
+        return None
+
+    def load():
+        with open(region.cluster_path, "rb") as f:
+            return pickle.load(f)
+
+    clusters = [copy.copy(cluster) for cluster in REGION_CACHE.get(("clusters", region.name), version, load)]
+    if store.has_running_state(region.name):
+        for cluster in clusters:
+            cluster.lat_lng_dist = store.load_coordinate_distribution(region.name, int(cluster.id))
+    return clusters
+
+
+# ----------------------------------------------------------------------------------------------
+# Forecast API (on-demand forecasts, the published predictions are left untouched)
+# ----------------------------------------------------------------------------------------------
+# Response layouts (the "format" query parameter is taken by DRF content negotiation)
+FORECAST_OUTPUTS = ["compact", "geojson"]
+
+# Computed forecasts, reused like heatmap responses for identical requests
+FORECAST_RESPONSES = cache.SingleFlightCache(settings.FORECAST_HEATMAP_CACHE_SECONDS, name="forecast")
+
+
+@metrics.timed_view("forecast")
+@profiling.profiled_view("forecast")
+@api_view(['GET'])
+def get_forecast(request):
+    """
+    Forecast a region's calls for any start and horizon with the trained model, without
+    publishing the result.
+
+    Query Parameters:
+        start: str (YYYY-MM-DD or YYYY-MM-DDTHH:00) - First forecast hour (default today at midnight).
+        horizon: int - Number of forecast hours (default prediction.HORIZON_HOURS, at most
+            settings.FORECAST_MAX_HORIZON_HOURS).
+        granularity: str (hourly|daily|weekly|monthly|auto) - Time step of the forecast
+            (default auto, picked over the forecast days like in /api/heatmap).
+        output: str (compact|geojson) - Predicted totals per cluster and time step (default),
+            or heatmap points like /api/heatmap (at most MAX_HEATMAP_POINTS points).
+        region: str - Region ID (default settings.FORECAST_DEFAULT_REGION).
+
+    Returns:
+        JSON response with the forecast and the model version it was made with. Time steps
+        are clipped to the forecast hours: the first and last day, week or month can be
+        partial, so each step comes with its first forecast hour ("times") and the number
+        of forecast hours it sums ("hours", or "periods" in the geojson output).
+    """
+    query = request.GET
+    key = forecast_key(query)
+    if key is None or profiling.requested(request):
+        content, status = render_json(build_forecast, query)
+    else:
+        content, status = FORECAST_RESPONSES.get(key, lambda: render_json(build_forecast, query), cacheable_response)
+    return HttpResponse(content, status=status, content_type="application/json")
+
+
+def forecast_params(query):
+    """
+    Validated parameters of a forecast request.
+
+    Params:
+        query: QueryDict - query parameters of get_forecast
+
+    Returns:
+        dict - region, start, horizon, granularity (possibly 'auto', see forecast_granularity),
+        output and days (first and last forecast day)
+
+    Raises:
+        regions.UnknownRegion: if the region is not configured
+        ValueError: if a parameter is invalid
+    """
+    region = regions.get_region(query.get("region"))
+
+    try:
+        start = pd.Timestamp(query["start"]).floor("h") if query.get("start") else pd.Timestamp.today().normalize()
+    except ValueError as e:
+        raise ValueError(f"Invalid start: {e}")
+
+    try:
+        horizon = int(query.get("horizon", prediction.HORIZON_HOURS))
+    except ValueError:
+        raise ValueError("Horizon must be a whole number of hours.")
+    if not 1 <= horizon <= settings.FORECAST_MAX_HORIZON_HOURS:
+        raise ValueError(f"Horizon must be between 1 and {settings.FORECAST_MAX_HORIZON_HOURS} hours.")
+
+    granularity = query.get("granularity", "auto")
+    if granularity != "auto" and granularity not in rollups.GRANULARITIES:
+        raise ValueError(f"Granularity must be one of: {', '.join(rollups.GRANULARITIES + ['auto'])}.")
+
+    output = query.get("output", "compact")
+    if output not in FORECAST_OUTPUTS:
+        raise ValueError(f"Output must be one of: {', '.join(FORECAST_OUTPUTS)}.")
+
+    days = (start.normalize(), (start + pd.Timedelta(hours=horizon - 1)).normalize())
+    return {"region": region, "start": start, "horizon": horizon, "granularity": granularity,
+            "output": output, "days": days}
+
+
+def forecast_granularity(params, clusters):
+    """
+    Time step of a forecast, resolving 'auto' like /api/heatmap. The compact output has
+    one point per cluster and time step; the geojson output one per coordinate kept by
+    prune_distribution (at most settings.FORECAST_DISTRIBUTION_TOP_K per cluster).
+
+    Params:
+        params: dict - see forecast_params
+        clusters: list - trained Cluster objects
+
+    Returns:
+        str - granularity
+
+    Raises:
+        ValueError: if the geojson output would have more than MAX_HEATMAP_POINTS points
+    """
+    first_day, last_day = params["days"]
+    if params["output"] == "geojson":
+        top_k = settings.FORECAST_DISTRIBUTION_TOP_K
+        cells = sum(len(cluster.lat_lng_dist) if top_k is None else min(len(cluster.lat_lng_dist), top_k)
+                    for cluster in clusters)
+    else:
+        cells = len(clusters)
+    return resolve_granularity(params["granularity"], first_day, last_day,
+                               lambda granularity: rollups.count_periods(first_day, last_day, granularity) * cells)
+
+
+def forecast_key(query):
+    """
+    Normalized forecast parameters and the fingerprint of the inputs the forecast is made
+    from (model version, start, horizon, calls), or None if the request is invalid.
+    """
+    try:
+        params = forecast_params(query)
+    except (regions.UnknownRegion, ValueError):
+        return None
+    region = params["region"]
+    return ("forecast", region.name, prediction_fingerprint(region, params["start"], params["horizon"]),
+            params["start"], params["granularity"], params["output"])
+
+
+def build_forecast(query):
+    """
+    Build the forecast response. The feature matrix of the forecast hours is built once
+    for every cluster and each cluster's model predicts all hours in one call (see
+    model.predict_model); nothing is checkpointed or published.
+
+    Params:
+        query: QueryDict - query parameters of get_forecast
+
+    Returns:
+        tuple - (JSON body, HTTP status)
+    """
+    try:
+        params = forecast_params(query)
+    except (regions.UnknownRegion, ValueError) as e:
+        return {"error": str(e)}, 400
+    region = params["region"]
+
+    try:
+        clusters = load_trained_clusters(region)
+    except Exception as e:
+        return {"error": f"Failed to load model: {e}"}, 500
+    if clusters is None:
+        return {"error": "Trained model not found. Run training first."}, 404
+
+    try:
+        granularity = forecast_granularity(params, clusters)
+    except ValueError as e:
+        return {"error": str(e)}, 400
+
+    try:
+        from .cluster_predictions import model
+        predictions = model.predict_model(clusters, start=params["start"], horizon=params["horizon"],
+                                          top_k=settings.FORECAST_DISTRIBUTION_TOP_K,
+                                          mass=settings.FORECAST_DISTRIBUTION_MASS)
+    except Exception as e:
+        return {"error": f"Forecast failed: {e}"}, 500
+
+    model_info = versions.read_version(region.model_folder) or {}
+    body = {"region": region.name, "model_version": model_info.get("version"),
+            "start": params["start"].isoformat(), "horizon": params["horizon"], "granularity": granularity}
+
+    if params["output"] == "geojson":
+        features = []
+        for cluster_prediction in predictions.values():
+            df = cluster_prediction.expand(granularity=granularity)
+            features.extend(geojson_converter.predictions_to_json(df)["features"].values())
+        return {"type": "FeatureCollection", **body, "periods": forecast_periods(predictions, None, None, granularity),
+                "features": features}, 200
+
+    # Compact: one series of predicted totals per cluster over shared time steps
+    totals = {cluster_id: cluster_prediction.totals(granularity)
+              for cluster_id, cluster_prediction in predictions.items()}
+    steps = next(iter(totals.values()))
+    counts = {str(cluster_id): df["Count"].to_numpy(dtype=float) for cluster_id, df in totals.items()}
+
+    body["times"] = [time.isoformat() for time in steps["Start"]]
+    body["hours"] = steps["Hours"].astype(int).tolist()
+    body["clusters"] = {cluster_id: np.round(values, 4).tolist() for cluster_id, values in counts.items()}
+    body["total"] = np.round(np.sum(list(counts.values()), axis=0), 4).tolist()
+    return body, 200
+
+
+# ----------------------------------------------------------------------------------------------
+# Call Ingestion API
+# ----------------------------------------------------------------------------------------------
+def load_cluster_index(region):
+    """
+    Load the spatial index saved with a region's model, reusing it until the model is retrained.
+
+    Returns:
+        ClusterIndex or None if no model has been trained
+    """
+    version = file_version(region.index_path)
+    if version is None:
+        return None
+    from .cluster_predictions import spatial_index
+
+    return REGION_CACHE.get(("index", region.name), version,
+                            lambda: spatial_index.ClusterIndex.load(region.index_path))
+
+
+@metrics.timed_view("locate")
+@api_view(['GET'])
+def locate(request):
+    """
+    Look up the cluster and distribution cell of one or more coordinates.
+
+    Query Params:
+        lat: float - latitude (repeat lat/lng for several points)
+        lng: float - longitude
+        region: str - region ID (default settings.FORECAST_DEFAULT_REGION)
+
+    Returns:
+        JSON list with the cluster and rounded (distribution cell) coordinate of each point.
+    """
+    try:
+        region = request_region(request)
+    except regions.UnknownRegion as e:
+        return Response({"error": str(e)}, status=400)
+
+    try:
+        latitudes = [float(lat) for lat in request.query_params.getlist('lat')]
+        longitudes = [float(lng) for lng in request.query_params.getlist('lng')]
+    except ValueError:
+        return Response({"error": "Coordinates must be numbers."}, status=400)
+    # float() accepts 'nan' and 'inf', which no nearest-centroid lookup can place
+    if not all(math.isfinite(value) for value in latitudes + longitudes):
+        return Response({"error": "Coordinates must be finite numbers."}, status=400)
+    if not latitudes or len(latitudes) != len(longitudes):
+        return Response({"error": "Provide the same number of 'lat' and 'lng' parameters."}, status=400)
+
+    cluster_index = load_cluster_index(region)
+    if cluster_index is None:
+        return Response({"error": "Trained model not found. Run training first."}, status=404)
+
+    cluster_ids = cluster_index.assign(latitudes, longitudes)
+    cell_lats, cell_lngs = cluster_index.cells(latitudes, longitudes, prediction.COORD_DECIMALS)
+
+    return Response([
+        {"lat": lat, "lng": lng, "cluster_id": int(cluster_id), "cell": [float(cell_lat), float(cell_lng)]}
+        for lat, lng, cluster_id, cell_lat, cell_lng in zip(latitudes, longitudes, cluster_ids, cell_lats, cell_lngs)
+    ], status=200)
+
+
+CALL_FIELDS = ['Dispatched', 'Latitude', 'Longitude']
+
+
+@metrics.timed_view("calls")
+@api_view(['POST'])
+def ingest_calls(request):
+    """
+    Ingest a batch of call events. Each call is assigned to its cluster with the spatial index,
+    stored, and added to the running coordinate counts and historical rollups of its cluster.
+    Requires the SQLite store: with settings.FORECAST_STORE = 'csv', training reads data.csv
+    and ingested calls would never reach the model.
+
+    Body:
+        JSON list of calls (or {"calls": [...]}) with 'Dispatched', 'Latitude' and 'Longitude'
+        and an optional 'CauseCategory' (defaults to "EMS").
+
+    Query Params:
+        region: str - region ID (default settings.FORECAST_DEFAULT_REGION)
+
+    Returns:
+        JSON response with the number of calls stored and EMS calls added per cluster, or a
+        400 error listing the 'rows' (batch positions) whose coordinates are invalid.
+    """
+    try:
+        region = request_region(request)
+    except regions.UnknownRegion as e:
+        return Response({"error": str(e)}, status=400)
+
+    if settings.FORECAST_STORE != "sqlite":
+        return Response({"error": "Call ingestion requires FORECAST_STORE = 'sqlite'. "
+                                  "With the csv store, append calls to the region's data.csv and retrain."},
+                        status=409)
+
+    calls = request.data.get("calls") if isinstance(request.data, dict) else request.data
+    if not isinstance(calls, list) or not calls:
+        return Response({"error": "Expected a non-empty list of calls."}, status=400)
+
+    # Validate the batch
+    try:
+        calls_df = pd.DataFrame.from_records(calls)
+    except (TypeError, ValueError) as e:
+        return Response({"error": f"Invalid calls: {e}"}, status=400)
+    missing = [field for field in CALL_FIELDS if field not in calls_df.columns]
+    if missing:
+        return Response({"error": f"Missing fields: {', '.join(missing)}"}, status=400)
+
+    try:
+        calls_df['Dispatched'] = pd.to_datetime(calls_df['Dispatched'])
+        calls_df['Latitude'] = pd.to_numeric(calls_df['Latitude'])
+        calls_df['Longitude'] = pd.to_numeric(calls_df['Longitude'])
+    except (TypeError, ValueError) as e:
+        return Response({"error": f"Invalid calls: {e}"}, status=400)
+    if calls_df[CALL_FIELDS].isna().any().any():
+        return Response({"error": "Calls must have a 'Dispatched' time and coordinates."}, status=400)
+    # pd.to_numeric accepts 'inf', which no nearest-centroid lookup can place
+    latitudes, longitudes = calls_df['Latitude'].to_numpy(dtype=float), calls_df['Longitude'].to_numpy(dtype=float)
+    invalid = ~(np.isfinite(latitudes) & np.isfinite(longitudes) & (np.abs(latitudes) <= 90) & (np.abs(longitudes) <= 180))
+    if invalid.any():
+        return Response({"error": "Coordinates must be finite, with latitudes in [-90, 90] and longitudes in [-180, 180].",
+                         "rows": np.flatnonzero(invalid).tolist()}, status=400)
+    if 'CauseCategory' not in calls_df.columns:
+        calls_df['CauseCategory'] = 'EMS'
+    calls_df['CauseCategory'] = calls_df['CauseCategory'].fillna('EMS')
+
+    # Ensure model exists
+    cluster_index = load_cluster_index(region)
+    if cluster_index is None:
+        return Response({"error": "Trained model not found. Run training first."}, status=404)
+
+    try:
+        # Models trained before ingestion existed start their running state from the pickle
+        if not store.has_running_state(region.name):
+            with open(region.cluster_path, "rb") as f:
+                store.reset_running_state(pickle.load(f), region.name)
+
+        calls_df['Cluster'] = cluster_index.assign(calls_df['Latitude'], calls_df['Longitude'])
+        added = store.record_calls(calls_df, region.name, prediction.COORD_DECIMALS)
+    except Exception as e:
+        return Response({"error": f"Failed to ingest calls: {e}"}, status=500)
+
+    return Response({
+        "ingested": len(calls_df),
+        "clusters": {int(cluster_id): int(count) for cluster_id, count in added.items()}
+    }, status=200)
+
+
+# ----------------------------------------------------------------------------------------------
+# Metrics API
+# ----------------------------------------------------------------------------------------------
+def get_metrics(request):
+    """
+    Expose request, pipeline stage, cache and model metrics of this process.
+
+    Returns:
+        Plain text response in the Prometheus exposition format.
+    """
+    # Model versions and prediction file sizes are read from disk at scrape time
+    for region in regions.all_regions():
+        version_info = versions.read_version(region.model_folder)
+        if version_info:
+            metrics.set_model_version(region.name, version_info["version"], version_info.get("created"))
+
+        if settings.FORECAST_STORE == "csv" and os.path.isdir(region.predictions_folder):
+            metrics.set_prediction_files({
+                file: os.path.getsize(os.path.join(region.predictions_folder, file))
+                for file in os.listdir(region.predictions_folder)
+                if file.startswith("cluster_") and file.endswith(".csv")
+            }, region.name)
+
+    if settings.FORECAST_STORE == "sqlite":
+        db_path = str(settings.DATABASES["default"]["NAME"])
+        metrics.set_prediction_files({
+            os.path.basename(path): os.path.getsize(path)
+            for path in (db_path, db_path + "-wal") if os.path.exists(path)
+        })
+
+    return HttpResponse(metrics.REGISTRY.render(), content_type="text/plain; version=0.0.4; charset=utf-8")
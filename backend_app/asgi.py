@@ -5,6 +5,10 @@ It exposes the ASGI callable as a module-level variable named ``application``.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.1/howto/deployment/asgi/
+
+The ASGI deployment serves /api/heatmap and /api/boundaries with native async views
+(settings.FORECAST_ASYNC_VIEWS), e.g.:
+    uvicorn backend_app.asgi:application --workers 2
 """
 
 import os
@@ -12,5 +16,6 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend_app.settings')
+os.environ.setdefault('FORECAST_ASYNC_VIEWS', '1')
 
 application = get_asgi_application()
@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.1/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -81,6 +82,10 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        'OPTIONS': {
+            # WAL lets heatmap reads run while a new prediction set is being written
+            'init_command': 'PRAGMA journal_mode=WAL; PRAGMA synchronous=NORMAL;',
+        },
     }
 }
 
@@ -129,4 +134,76 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 # Allows different domains/ports on local machines.
 CORS_ALLOWED_ORIGINS = [
     "http://localhost:5173"
-]
\ No newline at end of file
+]
+
+
+# Forecasting workflow (FORECAST_*)
+
+# Low memory mode reads only the columns the model uses, stores features with compact
+# dtypes and drops each cluster's data and train/test copies once its model is trained.
+FORECAST_LOW_MEMORY = False
+
+# Where calls and predictions are stored: 'sqlite' (indexed tables, see api/store.py)
+# or 'csv' (data.csv and per-cluster prediction files).
+FORECAST_STORE = 'sqlite'
+
+# Forecasting engine of each cluster: 'xgboost', 'holt_winters', or 'auto' (Holt-Winters for
+# clusters averaging fewer than engines.LOW_VOLUME_CALLS_PER_HOUR calls). Overrides map a
+# cluster ID to an engine, e.g. {3: 'holt_winters'}.
+FORECAST_ENGINE = 'xgboost'
+FORECAST_ENGINE_OVERRIDES = {}
+
+# Out-of-core training: each cluster's features are saved as chunks under the region's
+# features/ folder and streamed through XGBoost's external memory, so training memory
+# does not grow with the length of the history. Test rows are held out by 'time' (the
+# most recent 20%) or by 'hash' of the hour instead of an in-memory shuffle.
+FORECAST_EXTERNAL_MEMORY = False
+FORECAST_EXTERNAL_MEMORY_SPLIT = 'time'
+
+# Pruning of each cluster's coordinate distribution (cells of prediction.COORD_DECIMALS
+# decimals, ~100 m) when predicting: keep at most TOP_K cells and/or the fewest cells
+# holding MASS of the calls (None disables either). The pruned share is redistributed
+# over the kept cells, so heatmap payloads stay bounded at street-level detail.
+FORECAST_DISTRIBUTION_TOP_K = 400
+FORECAST_DISTRIBUTION_MASS = None
+
+# Regions served by this deployment. Each region has its own call data, model and
+# predictions (backend_app/data for the default region, backend_app/data/regions/<name>
+# for the others) and is selected with the 'region' query parameter.
+FORECAST_REGIONS = {
+    'charlotte': {'name': 'Charlotte, NC', 'center': [35.227085, -80.843124]},
+}
+FORECAST_DEFAULT_REGION = 'charlotte'
+
+# Memory budget (MB) of the per-process cache of loaded region models and prediction sets.
+# Least recently used entries are evicted first, so idle regions give way to busy ones.
+FORECAST_REGION_CACHE_MB = 512
+
+# Serve /api/heatmap and /api/boundaries with native async views. asgi.py turns this on for
+# the ASGI deployment. FORECAST_ASYNC_WORKERS bounds the threads those views use for reads
+# and GeoJSON conversion.
+FORECAST_ASYNC_VIEWS = os.environ.get('FORECAST_ASYNC_VIEWS', '0') == '1'
+FORECAST_ASYNC_WORKERS = int(os.environ.get('FORECAST_ASYNC_WORKERS', '8'))
+
+# Seconds a rendered heatmap response is reused for identical requests (0 only coalesces
+# concurrent identical requests). New predictions change the cache key immediately.
+FORECAST_HEATMAP_CACHE_SECONDS = 10
+
+# Number of recently published prediction sets kept for delta heatmap responses
+# (/api/heatmap?since_version=...). Older base versions get a full response.
+FORECAST_PREDICTION_HISTORY = 5
+
+# /api/events (server-sent events): seconds between checks for a new model or prediction
+# version, and between keep-alive comments on idle streams.
+FORECAST_EVENTS_POLL_SECONDS = 2
+FORECAST_EVENTS_KEEPALIVE_SECONDS = 15
+
+# Per-request profiling (?profile=1 or an 'X-Profile: 1' header on /api/heatmap, /api/predict
+# and /api/train). Staff users can always profile; this flag allows every client (development
+# only). Reports are saved to the folder below, sampling the view's stack every few ms.
+FORECAST_PROFILING = os.environ.get('FORECAST_PROFILING', '0') == '1'
+FORECAST_PROFILE_FOLDER = os.path.join(BASE_DIR, 'backend_app', 'data', 'profiles')
+FORECAST_PROFILE_INTERVAL_MS = 5
+
+# Longest forecast /api/forecast computes on demand, in hours (92 days)
+FORECAST_MAX_HORIZON_HOURS = 24 * 92
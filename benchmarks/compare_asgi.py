@@ -0,0 +1,219 @@
+"""
+Load comparison of the WSGI (sync DRF views) and ASGI (native async views) request paths.
+
+A model is trained and predictions are published once for the scale. Then each path
+is driven in its own spawned process at several concurrency levels, with a mix of
+/api/heatmap (7 day slice) and /api/boundaries requests:
+    wsgi - django.test.Client, one thread per concurrent client (like a threaded WSGI server)
+    asgi - django.test.AsyncClient on one event loop; reads and GeoJSON conversion run on
+           the bounded executor (settings.FORECAST_ASYNC_WORKERS)
+
+Requests go through the full handler, middleware and views in-process (no sockets), so
+the numbers compare the request paths themselves: throughput, latency percentiles and
+the number of threads each path needs to hold the clients.
+
+Usage (from the repository root):
+    python -m benchmarks.compare_asgi --scale 100k --concurrency 1 20 100 --requests 100
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import asyncio
+import argparse
+import tempfile
+import threading
+import contextlib
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from benchmarks.generate_data import DATA_FOLDER, SCALES, generate
+from benchmarks.run_benchmarks import REPO_ROOT, forecast_window, git_commit
+
+# Share of boundary requests in the mix (dashboards load boundaries once, then poll the heatmap)
+BOUNDARIES_SHARE = 0.2
+
+
+# ----------------------------------------------------------------------------------------------
+# Setup
+# ----------------------------------------------------------------------------------------------
+def setup_django(work_dir, async_views):
+    """
+    Configures Django for a work folder (the default region's files live in work_dir/region).
+    """
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "backend_app.settings")
+    os.environ["FORECAST_ASYNC_VIEWS"] = "1" if async_views else "0"
+    sys.path.insert(0, REPO_ROOT)
+    from django.conf import settings
+    settings.DATABASES["default"]["NAME"] = os.path.join(work_dir, "bench.sqlite3")
+
+    import django
+    django.setup()
+    from django.test.utils import setup_test_environment
+    from backend_app.api import regions
+
+    setup_test_environment()
+    regions.DATA_FOLDER = os.path.join(work_dir, "region")
+
+
+def prepare(csv_path, work_dir):
+    """
+    Trains a model and publishes its predictions and boundaries for the default region.
+    """
+    setup_django(work_dir, async_views=False)
+    from django.core.management import call_command
+    from backend_app.api import regions, views
+    from backend_app.api.cluster_predictions import model, preprocess
+
+    call_command("migrate", verbosity=0)
+    region = regions.get_region()
+    os.makedirs(region.model_folder, exist_ok=True)
+
+    with contextlib.redirect_stdout(None):
+        clusters, boundaries, _ = model.prepare_and_train_model(preprocess.read_data(csv_path))
+        predictions = model.predict_model(clusters)
+
+    with open(region.boundaries_path, "w") as f:
+        json.dump(boundaries, f)
+    views.publish_predictions(region, predictions)
+
+
+def request_mix(n):
+    """
+    Paths and query parameters of n requests (every fifth request is /api/boundaries).
+    """
+    start_dt, end_dt = forecast_window()
+    heatmap = ("/api/heatmap/", {"start_date": str(start_dt.date()), "end_date": str(end_dt.date())})
+    boundaries = ("/api/boundaries/", {})
+    every = round(1 / BOUNDARIES_SHARE)
+    return [boundaries if i % every == every - 1 else heatmap for i in range(n)]
+
+
+# ----------------------------------------------------------------------------------------------
+# Load runs (each path runs in its own process)
+# ----------------------------------------------------------------------------------------------
+def run_wsgi(work_dir, concurrency, n):
+    setup_django(work_dir, async_views=False)
+    from django.test import Client
+
+    local = threading.local()
+    peak_threads = [threading.active_count()]
+
+    def call(request):
+        if not hasattr(local, "client"):
+            local.client = Client()
+        client = local.client
+        start = time.perf_counter()
+        response = client.get(*request)
+        latency = time.perf_counter() - start
+        peak_threads[0] = max(peak_threads[0], threading.active_count())
+        return request[0], response.status_code, latency
+
+    requests = request_mix(n)
+    call(requests[0])  # warm up (loads predictions into the region cache)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(call, requests))
+    return summarize(results, time.perf_counter() - start, peak_threads[0])
+
+
+def run_asgi(work_dir, concurrency, n):
+    setup_django(work_dir, async_views=True)
+    from django.test import AsyncClient
+
+    client = AsyncClient()
+    peak_threads = [threading.active_count()]
+
+    async def call(request, limit):
+        async with limit:
+            start = time.perf_counter()
+            response = await client.get(*request)
+            latency = time.perf_counter() - start
+            peak_threads[0] = max(peak_threads[0], threading.active_count())
+            return request[0], response.status_code, latency
+
+    async def main():
+        limit = asyncio.Semaphore(concurrency)
+        requests = request_mix(n)
+        await call(requests[0], limit)
+
+        start = time.perf_counter()
+        results = await asyncio.gather(*(call(request, limit) for request in requests))
+        return results, time.perf_counter() - start
+
+    results, seconds = asyncio.run(main())
+    return summarize(results, seconds, peak_threads[0])
+
+
+RUNNERS = {"wsgi": run_wsgi, "asgi": run_asgi}
+
+
+def percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(q / 100 * (len(values) - 1))))]
+
+
+def summarize(results, seconds, peak_threads):
+    """
+    Throughput, error count and latency percentiles (ms) per endpoint.
+    """
+    from backend_app.api.cluster_predictions import memory
+
+    summary = {"requests_per_second": round(len(results) / seconds, 1), "peak_threads": peak_threads,
+               "errors": sum(1 for _, status, _ in results if status != 200), "endpoints": {}}
+    for endpoint in sorted({path for path, _, _ in results}):
+        latencies = [latency * 1000 for path, _, latency in results if path == endpoint]
+        summary["endpoints"][endpoint] = {
+            "requests": len(latencies),
+            **{f"p{q}_ms": round(percentile(latencies, q), 2) for q in (50, 95, 99)},
+        }
+    peak = memory.process_peak_rss_mb()
+    summary["peak_rss_mb"] = round(peak, 1) if peak is not None else None
+    return summary
+
+
+# ----------------------------------------------------------------------------------------------
+# Main
+# ----------------------------------------------------------------------------------------------
+def in_process(function, *args):
+    with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as pool:
+        return pool.submit(function, *args).result()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare the WSGI and ASGI request paths under load.")
+    parser.add_argument("--scale", default="100k", choices=list(SCALES))
+    parser.add_argument("--concurrency", nargs="+", type=int, default=[1, 20, 100])
+    parser.add_argument("--requests", type=int, default=100, help="requests per concurrency level")
+    parser.add_argument("--out", default=None, help="output JSON path")
+    args = parser.parse_args()
+
+    csv_path = os.path.join(DATA_FOLDER, f"calls_{args.scale}.csv")
+    if not os.path.exists(csv_path):
+        print(f"Generating {args.scale} synthetic rows...")
+        generate(SCALES[args.scale], csv_path)
+
+    work_dir = tempfile.mkdtemp(prefix=f"ems-asgi-{args.scale}-")
+    report = {"meta": {"commit": git_commit(), "scale": args.scale, "requests": args.requests,
+                       "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S")}, "results": {}}
+    try:
+        in_process(prepare, csv_path, work_dir)
+        print(f"{'path':<5} {'clients':>7} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'threads':>8}", flush=True)
+        for concurrency in args.concurrency:
+            for name, runner in RUNNERS.items():
+                result = in_process(runner, work_dir, concurrency, args.requests)
+                report["results"].setdefault(name, {})[str(concurrency)] = result
+                heatmap = result["endpoints"]["/api/heatmap/"]
+                print(f"{name:<5} {concurrency:>7} {result['requests_per_second']:>8} {heatmap['p50_ms']:>8} "
+                      f"{heatmap['p95_ms']:>8} {heatmap['p99_ms']:>8} {result['peak_threads']:>8}"
+                      + (f"  ({result['errors']} errors)" if result["errors"] else ""), flush=True)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    if args.out:
+        os.makedirs(os.path.dirname(os.path.abspath(args.out)), exist_ok=True)
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+        print(f"Results saved to {args.out}")
@@ -0,0 +1,200 @@
+"""
+Synthetic Charlotte EMS call data in the backend_app/data/data.csv schema.
+
+Calls are drawn from a mixture of spatial hotspots around Charlotte, NC with
+hourly, weekly and yearly seasonality, a small upward trend and a bump on US
+federal holidays. Rows are written in chunks so 10M-row files can be generated
+with bounded memory.
+
+Usage (from the repository root):
+    python -m benchmarks.generate_data --scale 1m --out benchmarks/data/calls_1m.csv
+"""
+import os
+import argparse
+import numpy as np
+import pandas as pd
+from pandas.tseries.holiday import USFederalHolidayCalendar
+
+# Globals
+LAT, LNG = 35.227085, -80.843124                      # Charlotte, NC coordinates
+LAT_RANGE, LNG_RANGE = (35.00, 35.52), (-81.06, -80.55)  # Mecklenburg County bounding box
+SCALES = {"100k": 100_000, "1m": 1_000_000, "10m": 10_000_000}
+CHUNK_SIZE = 1_000_000
+DATA_FOLDER = os.path.join(os.path.dirname(__file__), "data")
+
+COLUMNS = ['Unique ID', 'Nature Code', 'Street Address',
+           'State Plane Feet X', 'State Plane Feet Y',
+           'FirstResponding', 'FirstArrival', 'FullComplement',
+           'Shift', 'Battalion', 'Division', 'DispatchNature',
+           'CauseCategory', 'Dispatched', 'Latitude', 'Longitude']
+
+CAUSE_CATEGORIES = ['EMS', 'Fire', 'Service', 'Hazmat']
+CAUSE_WEIGHTS = [0.70, 0.15, 0.12, 0.03]
+NATURE_CODES = ['SICK', 'FALL', 'BREATH', 'CHEST', 'MVA', 'UNCON', 'ALARM', 'FIRE', 'ODOR', 'ASSIST']
+STREETS = ['TRADE ST', 'TRYON ST', 'INDEPENDENCE BLVD', 'CENTRAL AVE', 'PROVIDENCE RD',
+           'SOUTH BLVD', 'THE PLAZA', 'BEATTIES FORD RD', 'ALBEMARLE RD', 'SUGAR CREEK RD']
+
+# Relative call volume by hour of day (low overnight, peak late morning to evening)
+HOURLY_PROFILE = np.array([0.55, 0.48, 0.44, 0.40, 0.38, 0.42, 0.55, 0.75, 0.92, 1.02, 1.10, 1.15,
+                           1.16, 1.15, 1.13, 1.12, 1.12, 1.13, 1.12, 1.08, 1.00, 0.90, 0.78, 0.65])
+# Relative call volume by weekday (Monday=0)
+WEEKLY_PROFILE = np.array([1.02, 0.98, 0.97, 0.98, 1.03, 1.05, 0.97])
+HOLIDAY_FACTOR = 1.15
+
+
+def hourly_weights(start, end):
+    """
+    Relative call intensity for every hour in [start, end).
+
+    Params:
+        start: pandas.Timestamp - first hour
+        end: pandas.Timestamp - end of the range (exclusive)
+
+    Returns:
+        hours: pandas.DatetimeIndex - every hour in the range
+        weights: numpy.ndarray - probability of a call falling in each hour
+    """
+    hours = pd.date_range(start, end, freq='h', inclusive='left')
+
+    weights = HOURLY_PROFILE[hours.hour] * WEEKLY_PROFILE[hours.weekday]
+
+    # Yearly seasonality (summer and winter peaks) and a small upward trend
+    day_of_year = hours.dayofyear.to_numpy()
+    weights = weights * (1 + 0.08 * np.cos(4 * np.pi * (day_of_year - 15) / 365.25))
+    weights = weights * (1 + 0.03 * (hours - hours[0]).days.to_numpy() / 365.25)
+
+    # Holidays
+    holidays = USFederalHolidayCalendar().holidays(start=hours.min(), end=hours.max())
+    weights = np.where(hours.normalize().isin(holidays), weights * HOLIDAY_FACTOR, weights)
+
+    return hours, weights / weights.sum()
+
+
+def make_hotspots(rng, num_hotspots=40):
+    """
+    Random spatial hotspots around Charlotte.
+
+    Params:
+        rng: numpy.random.Generator
+        num_hotspots: int - number of hotspots
+
+    Returns:
+        centers: numpy.ndarray - (num_hotspots, 2) lat/lng centers
+        spreads: numpy.ndarray - standard deviation of each hotspot in degrees
+        weights: numpy.ndarray - share of calls in each hotspot (Zipf-like)
+    """
+    # Hotspots are denser near the city center
+    radius = np.abs(rng.normal(0, 0.09, num_hotspots))
+    angle = rng.uniform(0, 2 * np.pi, num_hotspots)
+    centers = np.column_stack([LAT + radius * np.sin(angle), LNG + 1.2 * radius * np.cos(angle)])
+    spreads = rng.uniform(0.004, 0.03, num_hotspots)
+    weights = 1 / np.arange(1, num_hotspots + 1) ** 0.8
+    return centers, spreads, weights / weights.sum()
+
+
+def generate_chunk(rng, size, first_id, hours, hour_weights, hotspots):
+    """
+    Generates one chunk of synthetic call records.
+
+    Params:
+        rng: numpy.random.Generator
+        size: int - number of rows
+        first_id: int - 'Unique ID' of the first row
+        hours: pandas.DatetimeIndex - candidate hours (see hourly_weights)
+        hour_weights: numpy.ndarray - probability of each hour
+        hotspots: tuple - output of make_hotspots
+
+    Returns:
+        pandas.DataFrame - call records in the data.csv schema
+    """
+    centers, spreads, spot_weights = hotspots
+
+    # Dispatch time: weighted hour plus a uniform minute
+    hour_idx = np.sort(rng.choice(len(hours), size=size, p=hour_weights))
+    dispatched = hours[hour_idx] + pd.to_timedelta(rng.integers(0, 60, size), unit='m')
+
+    # Location: 90% from hotspots, 10% uniform background across the county
+    spot = rng.choice(len(centers), size=size, p=spot_weights)
+    lat = centers[spot, 0] + rng.normal(0, 1, size) * spreads[spot]
+    lng = centers[spot, 1] + rng.normal(0, 1, size) * spreads[spot] * 1.2
+    background = rng.random(size) < 0.10
+    lat[background] = rng.uniform(*LAT_RANGE, background.sum())
+    lng[background] = rng.uniform(*LNG_RANGE, background.sum())
+    lat = np.clip(lat, *LAT_RANGE)
+    lng = np.clip(lng, *LNG_RANGE)
+
+    units = np.char.add('M', rng.integers(1, 60, size).astype(str))
+
+    return pd.DataFrame({
+        'Unique ID': np.arange(first_id, first_id + size),
+        'Nature Code': rng.choice(NATURE_CODES, size),
+        'Street Address': np.char.add(np.char.add(rng.integers(100, 9999, size).astype(str), ' '),
+                                      rng.choice(STREETS, size)),
+        'State Plane Feet X': np.round(1_450_000 + (lng - LNG) * 300_000, 1),
+        'State Plane Feet Y': np.round(540_000 + (lat - LAT) * 364_000, 1),
+        'FirstResponding': units,
+        'FirstArrival': units,
+        'FullComplement': units,
+        'Shift': rng.choice(['A', 'B', 'C'], size),
+        'Battalion': np.char.add('BC', rng.integers(1, 8, size).astype(str)),
+        'Division': np.char.add('DIV', rng.integers(1, 4, size).astype(str)),
+        'DispatchNature': rng.choice(NATURE_CODES, size),
+        'CauseCategory': rng.choice(CAUSE_CATEGORIES, size, p=CAUSE_WEIGHTS),
+        'Dispatched': dispatched.strftime('%m/%d/%Y %H:%M'),
+        'Latitude': np.round(lat, 6),
+        'Longitude': np.round(lng, 6),
+    }, columns=COLUMNS)
+
+
+def generate(rows, out_path, start="2021-01-01", years=3, seed=0):
+    """
+    Writes `rows` synthetic call records to a CSV file.
+
+    Params:
+        rows: int - number of call records (all cause categories)
+        out_path: str - output CSV path
+        start: str - first day of the history
+        years: int - length of the history in years
+        seed: int - random seed
+
+    Returns:
+        out_path: str
+    """
+    rng = np.random.default_rng(seed)
+    start = pd.Timestamp(start)
+    hours, hour_weights = hourly_weights(start, start + pd.DateOffset(years=years))
+    hotspots = make_hotspots(rng)
+
+    os.makedirs(os.path.dirname(os.path.abspath(out_path)), exist_ok=True)
+
+    # Each chunk covers the whole history, so the file is sorted per chunk only
+    written = 0
+    while written < rows:
+        size = min(CHUNK_SIZE, rows - written)
+        chunk = generate_chunk(rng, size, written, hours, hour_weights, hotspots)
+        chunk.to_csv(out_path, mode='w' if written == 0 else 'a', header=written == 0, index=False)
+        written += size
+
+    return out_path
+
+
+def parse_rows(value):
+    """
+    Accepts a named scale (100k, 1m, 10m) or an explicit row count.
+    """
+    return SCALES[value.lower()] if value.lower() in SCALES else int(value)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate synthetic Charlotte EMS call data.")
+    parser.add_argument("--scale", default="100k", help="100k, 1m, 10m or a row count")
+    parser.add_argument("--out", default=None, help="output CSV path (default benchmarks/data/calls_<scale>.csv)")
+    parser.add_argument("--start", default="2021-01-01", help="first day of the history")
+    parser.add_argument("--years", type=int, default=3, help="length of the history in years")
+    parser.add_argument("--seed", type=int, default=0, help="random seed")
+    args = parser.parse_args()
+
+    rows = parse_rows(args.scale)
+    out_path = args.out or os.path.join(DATA_FOLDER, f"calls_{args.scale.lower()}.csv")
+    generate(rows, out_path, args.start, args.years, args.seed)
+    print(f"Wrote {rows} rows to {out_path}")
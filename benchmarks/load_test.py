@@ -0,0 +1,209 @@
+"""
+HTTP load test of a running backend (manage.py runserver, or the ASGI server).
+
+Closed-loop clients replay a dashboard-like request mix over real HTTP for a fixed
+duration at each concurrency level:
+    /api/heatmap    - forecast slices of 1 to 7 days (daily or hourly) and longer 'auto'
+                      ranges, starting anywhere in the forecast window
+    /api/boundaries - cluster boundaries
+    /api/predict    - occasional re-predicts (--predict-share, 0 to leave predictions alone)
+
+Throughput, error count and p50/p95/p99 latency per endpoint are printed and written as
+JSON (sorted keys) so runs can be compared between commits. Only the standard library is
+used, so the harness runs anywhere the backend is reachable.
+
+Usage (from the repository root, with the server already running and predictions published):
+    python manage.py runserver --noreload
+    python -m benchmarks.load_test --url http://127.0.0.1:8000 --concurrency 1 10 50 --duration 30
+    python -m benchmarks.load_test --label asgi --compare benchmarks/results/load_wsgi.json
+"""
+import os
+import json
+import time
+import random
+import argparse
+import datetime
+import threading
+import urllib.error
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.compare_asgi import percentile
+from benchmarks.run_benchmarks import git_commit
+
+# Request mix (weights) for one dashboard session
+HEATMAP_SHARE = 0.8
+BOUNDARIES_SHARE = 0.2
+PREDICT_SHARE = 0.01
+
+# Heatmap ranges: (days, granularity)
+HEATMAP_RANGES = [(1, "hourly"), (1, "daily"), (3, "daily"), (7, "daily"), (7, "hourly"), (30, "auto"), (90, "auto")]
+FORECAST_DAYS = 7
+
+
+# ----------------------------------------------------------------------------------------------
+# Request mix
+# ----------------------------------------------------------------------------------------------
+def heatmap_request(rng, region):
+    """
+    Path of a heatmap request for a random slice of the forecast window.
+    """
+    days, granularity = rng.choice(HEATMAP_RANGES)
+    start = datetime.date.today() + datetime.timedelta(days=rng.randrange(FORECAST_DAYS))
+    end = start + datetime.timedelta(days=days - 1)
+    params = {"start_date": start.isoformat(), "end_date": end.isoformat(), "granularity": granularity}
+    if region:
+        params["region"] = region
+    return "/api/heatmap/?" + urllib.parse.urlencode(params)
+
+
+def next_request(rng, region, predict_share):
+    """
+    Endpoint name and path of the next request in the mix.
+    """
+    suffix = "?" + urllib.parse.urlencode({"region": region}) if region else ""
+    draw = rng.random() * (HEATMAP_SHARE + BOUNDARIES_SHARE + predict_share)
+    if draw < predict_share:
+        return "predict", "/api/predict/" + suffix
+    if draw < predict_share + BOUNDARIES_SHARE:
+        return "boundaries", "/api/boundaries/" + suffix
+    return "heatmap", heatmap_request(rng, region)
+
+
+def fetch(url, timeout):
+    """
+    GET a URL and read the whole body.
+
+    Returns:
+        tuple - (HTTP status or None on a connection error, body bytes)
+    """
+    try:
+        with urllib.request.urlopen(url, timeout=timeout) as response:
+            return response.status, response.read()
+    except urllib.error.HTTPError as e:
+        return e.code, e.read()
+    except (urllib.error.URLError, OSError):
+        return None, b""
+
+
+# ----------------------------------------------------------------------------------------------
+# Load runs
+# ----------------------------------------------------------------------------------------------
+def run_level(base_url, concurrency, duration, region, predict_share, timeout, seed):
+    """
+    Runs `concurrency` closed-loop clients for `duration` seconds.
+
+    Returns:
+        dict - throughput, errors and latency percentiles per endpoint
+    """
+    results = []
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+
+    def client(index):
+        rng = random.Random(seed * 1000 + index)
+        while time.perf_counter() < deadline:
+            endpoint, path = next_request(rng, region, predict_share)
+            start = time.perf_counter()
+            status, body = fetch(base_url + path, timeout)
+            latency = time.perf_counter() - start
+            with lock:
+                results.append((endpoint, status, latency, len(body)))
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(client, range(concurrency)))
+    return summarize(results, time.perf_counter() - start)
+
+
+def summarize(results, seconds):
+    """
+    Throughput, error count and latency percentiles (ms) per endpoint.
+    """
+    summary = {"requests": len(results), "requests_per_second": round(len(results) / seconds, 2),
+               "errors": sum(1 for _, status, _, _ in results if status != 200), "endpoints": {}}
+    for endpoint in sorted({name for name, _, _, _ in results}):
+        rows = [row for row in results if row[0] == endpoint]
+        latencies = [latency * 1000 for _, _, latency, _ in rows]
+        summary["endpoints"][endpoint] = {
+            "requests": len(rows),
+            "requests_per_second": round(len(rows) / seconds, 2),
+            "errors": sum(1 for _, status, _, _ in rows if status != 200),
+            "mean_bytes": round(sum(size for _, _, _, size in rows) / len(rows)),
+            **{f"p{q}_ms": round(percentile(latencies, q), 2) for q in (50, 95, 99)},
+        }
+    return summary
+
+
+def compare(old, new):
+    """
+    Prints the change in throughput and p95 latency per endpoint between two result files.
+    """
+    print(f"\nCompared to {old['meta'].get('label') or old['meta'].get('commit')}:")
+    for concurrency, result in new["results"].items():
+        before = old["results"].get(concurrency)
+        if not before:
+            continue
+        ratio = result["requests_per_second"] / before["requests_per_second"] if before["requests_per_second"] else float("nan")
+        print(f"  {concurrency:>7} clients  req/s x{ratio:.2f}")
+        for endpoint, stats in result["endpoints"].items():
+            previous = before["endpoints"].get(endpoint)
+            if previous:
+                print(f"          {endpoint:<11} p95 {previous['p95_ms']} -> {stats['p95_ms']} ms")
+
+
+# ----------------------------------------------------------------------------------------------
+# Main
+# ----------------------------------------------------------------------------------------------
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load test a running EMS forecasting backend over HTTP.")
+    parser.add_argument("--url", default="http://127.0.0.1:8000", help="base URL of the backend")
+    parser.add_argument("--concurrency", nargs="+", type=int, default=[1, 10, 50])
+    parser.add_argument("--duration", type=float, default=30, help="seconds per concurrency level")
+    parser.add_argument("--region", default=None, help="region ID (default: the server's default region)")
+    parser.add_argument("--predict-share", type=float, default=PREDICT_SHARE,
+                        help="weight of /api/predict requests (heatmap 0.8, boundaries 0.2)")
+    parser.add_argument("--timeout", type=float, default=120, help="per-request timeout in seconds")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--label", default=None, help="server label saved with the results (e.g. wsgi, asgi)")
+    parser.add_argument("--out", default=None, help="output JSON path (default benchmarks/results/load_<label or commit>.json)")
+    parser.add_argument("--compare", default=None, help="previous results JSON to compare against")
+    args = parser.parse_args()
+
+    base_url = args.url.rstrip("/")
+    status, _ = fetch(base_url + "/api/boundaries/", args.timeout)
+    if status is None:
+        raise SystemExit(f"No server reachable at {base_url}")
+
+    commit = git_commit()
+    report = {
+        "meta": {
+            "commit": commit,
+            "label": args.label,
+            "url": base_url,
+            "duration": args.duration,
+            "predict_share": args.predict_share,
+            "seed": args.seed,
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "results": {},
+    }
+
+    print(f"{'clients':>7} {'req/s':>8} {'errors':>7}  endpoint    {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}", flush=True)
+    for concurrency in args.concurrency:
+        result = run_level(base_url, concurrency, args.duration, args.region, args.predict_share, args.timeout, args.seed)
+        report["results"][str(concurrency)] = result
+        for i, (endpoint, stats) in enumerate(result["endpoints"].items()):
+            level = f"{concurrency:>7} {result['requests_per_second']:>8} {result['errors']:>7}" if i == 0 else " " * 24
+            print(f"{level}  {endpoint:<11} {stats['p50_ms']:>9} {stats['p95_ms']:>9} {stats['p99_ms']:>9}", flush=True)
+
+    out_path = args.out or os.path.join(os.path.dirname(__file__), "results", f"load_{args.label or commit or 'local'}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(out_path)), exist_ok=True)
+    with open(out_path, "w") as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+    print(f"Results saved to {out_path}")
+
+    if args.compare:
+        with open(args.compare, "r") as f:
+            compare(json.load(f), report)
@@ -0,0 +1,348 @@
+"""
+Benchmark harness for the backend model workflow and heatmap API.
+
+For every scale, synthetic call data is generated (once, see generate_data.py) and
+each step runs in a fresh process so its peak RSS is not inflated by earlier steps:
+    startup  - cold import of the Django app by a web worker (python -X importtime): seconds,
+               RSS, the slowest top-level packages and whether the ML stack was loaded
+    train    - model.prepare_and_train_model
+    assign   - ClusterIndex.assign over every call coordinate
+    predict  - model.predict_model
+    to_json  - geojson_converter.predictions_to_json over a 7 day slice
+    heatmap  - GET /api/heatmap through the Django test client
+
+Results are written as JSON (sorted keys) so runs can be diffed between commits.
+
+Usage (from the repository root):
+    python -m benchmarks.run_benchmarks --scales 100k 1m --out bench.json
+    python -m benchmarks.run_benchmarks --scales 100k --compare old.json
+"""
+import os
+import sys
+import json
+import time
+import pickle
+import shutil
+import argparse
+import platform
+import tempfile
+import statistics
+import contextlib
+import subprocess
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+from benchmarks.generate_data import DATA_FOLDER, SCALES, generate
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEATMAP_DAYS = 7
+
+# Packages of the training/inference stack that serving workers should not import
+ML_PACKAGES = ["xgboost", "sklearn", "scipy"]
+
+# What a web worker imports before serving its first request
+STARTUP_SCRIPT = """
+import os, sys, json, time
+start = time.perf_counter()
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "backend_app.settings")
+import django
+django.setup()
+import backend_app.urls
+seconds = time.perf_counter() - start
+from backend_app.api.cluster_predictions import memory
+print(json.dumps({"seconds": seconds, "rss_mb": memory.process_peak_rss_mb(),
+                  "ml_packages": [name for name in %r if name in sys.modules]}))
+""" % ML_PACKAGES
+
+
+# ----------------------------------------------------------------------------------------------
+# Measurement helpers
+# ----------------------------------------------------------------------------------------------
+def forecast_window():
+    """
+    First and last day of the heatmap slice (the published forecast starts today).
+    """
+    import pandas as pd
+    start = pd.Timestamp.today().normalize()
+    return start, start + pd.Timedelta(days=HEATMAP_DAYS - 1)
+
+
+def slowest_imports(importtime_log, top=10):
+    """
+    Cumulative import time (ms) of the slowest top-level packages in a -X importtime log.
+
+    Params:
+        importtime_log: str - stderr of python -X importtime
+        top: int - number of packages to report
+
+    Returns:
+        dict - key = package, value = ms (outermost import of the package)
+    """
+    packages = {}
+    for line in importtime_log.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        package = name.strip().split(".")[0]
+        packages[package] = max(packages.get(package, 0), int(cumulative) / 1000)
+    slowest = sorted(packages.items(), key=lambda item: item[1], reverse=True)[:top]
+    return {package: round(ms, 1) for package, ms in slowest}
+
+
+# ----------------------------------------------------------------------------------------------
+# Benchmark steps (each runs in its own process)
+# ----------------------------------------------------------------------------------------------
+def bench_startup(csv_path, work_dir, repeat, low_memory):
+    timings, rss, log = [], [], ""
+    for _ in range(repeat):
+        completed = subprocess.run([sys.executable, "-X", "importtime", "-c", STARTUP_SCRIPT], cwd=REPO_ROOT,
+                                   capture_output=True, text=True, check=True)
+        worker = json.loads(completed.stdout.strip().splitlines()[-1])
+        timings.append(worker["seconds"])
+        rss.append(worker["rss_mb"])
+        log = completed.stderr
+
+    # Import time is measured in the worker process, not this one
+    peak = max(rss) if None not in rss else None
+    return {"seconds": timings, "peak_rss_mb": peak, "ml_packages_loaded": worker["ml_packages"],
+            "slowest_imports_ms": slowest_imports(log)}
+
+
+def bench_train(csv_path, work_dir, repeat, low_memory):
+    from backend_app.api.cluster_predictions import model, preprocess
+
+    data = preprocess.read_data(csv_path, low_memory)
+
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(None):
+            clusters, boundaries, cluster_index = model.prepare_and_train_model(data, low_memory=low_memory)
+        timings.append(time.perf_counter() - start)
+
+    with open(os.path.join(work_dir, "clusters.pkl"), "wb") as f:
+        pickle.dump(clusters, f)
+    cluster_index.save(os.path.join(work_dir, "spatial_index.pkl"))
+
+    return {"seconds": timings, "rows": len(data)}
+
+
+def bench_assign(csv_path, work_dir, repeat, low_memory):
+    import pandas as pd
+    from backend_app.api.cluster_predictions.spatial_index import ClusterIndex
+
+    cluster_index = ClusterIndex.load(os.path.join(work_dir, "spatial_index.pkl"))
+    coords = pd.read_csv(csv_path, usecols=['Latitude', 'Longitude'])
+    latitudes, longitudes = coords['Latitude'].to_numpy(), coords['Longitude'].to_numpy()
+
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        cluster_index.assign(latitudes, longitudes)
+        timings.append(time.perf_counter() - start)
+
+    return {"seconds": timings, "points": len(coords),
+            "points_per_second": round(len(coords) / statistics.median(timings))}
+
+
+def bench_predict(csv_path, work_dir, repeat, low_memory):
+    from backend_app.api.cluster_predictions import model, prediction
+
+    with open(os.path.join(work_dir, "clusters.pkl"), "rb") as f:
+        clusters = pickle.load(f)
+
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(None):
+            predictions = model.predict_model(clusters)
+        timings.append(time.perf_counter() - start)
+
+    predictions_folder = os.path.join(work_dir, "predictions")
+    os.makedirs(predictions_folder, exist_ok=True)
+    prediction.save_predictions(predictions, predictions_folder)
+
+    return {"seconds": timings, "points": int(sum(len(p.lat_lng_dist) for p in predictions.values()))}
+
+
+def bench_to_json(csv_path, work_dir, repeat, low_memory):
+    from backend_app.api.cluster_predictions import prediction
+    from backend_app.api.utils import geojson_converter
+
+    predictions = prediction.load_predictions(os.path.join(work_dir, "predictions"))
+    start_dt, end_dt = forecast_window()
+    frames = [p.expand(start_dt, end_dt) for p in predictions.values()]
+
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for df in frames:
+            geojson_converter.predictions_to_json(df)
+        timings.append(time.perf_counter() - start)
+
+    return {"seconds": timings, "features": int(sum(len(df) for df in frames))}
+
+
+def bench_heatmap(csv_path, work_dir, repeat, low_memory):
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "backend_app.settings")
+    from django.conf import settings
+    settings.DATABASES["default"]["NAME"] = os.path.join(work_dir, "bench.sqlite3")
+
+    import django
+    django.setup()
+    from django.core.management import call_command
+    from django.test import Client
+    from django.test.utils import setup_test_environment
+    from backend_app.api import regions, views
+    from backend_app.api.cluster_predictions import prediction
+
+    setup_test_environment()
+    call_command("migrate", verbosity=0)
+
+    # Publish the predictions through the configured store (settings.FORECAST_STORE)
+    regions.DATA_FOLDER = os.path.join(work_dir, "region")
+    predictions = prediction.load_predictions(os.path.join(work_dir, "predictions"))
+    views.publish_predictions(regions.get_region(), predictions)
+
+    start_dt, end_dt = forecast_window()
+    params = {"start_date": str(start_dt.date()), "end_date": str(end_dt.date())}
+    client = Client()
+
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        response = client.get("/api/heatmap/", params)
+        timings.append(time.perf_counter() - start)
+
+    if response.status_code != 200:
+        raise RuntimeError(f"/api/heatmap returned {response.status_code}: {response.content[:200]}")
+
+    return {"seconds": timings, "bytes": len(response.content), "store": settings.FORECAST_STORE}
+
+
+STEPS = {
+    "startup": bench_startup,
+    "train": bench_train,
+    "assign": bench_assign,
+    "predict": bench_predict,
+    "to_json": bench_to_json,
+    "heatmap": bench_heatmap,
+}
+
+
+def run_step(name, csv_path, work_dir, repeat, low_memory):
+    """
+    Runs one benchmark step in the current process and summarizes it.
+    """
+    sys.path.insert(0, REPO_ROOT)
+    result = STEPS[name](csv_path, work_dir, repeat, low_memory)
+    from backend_app.api.cluster_predictions import memory
+
+    timings = result.pop("seconds")
+    # Pipeline stages reset the RSS high-water mark, so use the process-wide peak
+    # (unless the step measured a process of its own)
+    peak = result.pop("peak_rss_mb") if "peak_rss_mb" in result else memory.process_peak_rss_mb()
+    result.update({
+        "seconds_median": round(statistics.median(timings), 4),
+        "seconds_min": round(min(timings), 4),
+        "repeat": len(timings),
+        "peak_rss_mb": round(peak, 1) if peak is not None else None,
+    })
+    return result
+
+
+# ----------------------------------------------------------------------------------------------
+# Main
+# ----------------------------------------------------------------------------------------------
+def run_scale(scale, repeat, steps, low_memory=False):
+    """
+    Runs every step for a scale, each in a fresh spawned process.
+
+    Params:
+        scale: str - key of SCALES
+        repeat: int - timed repetitions per step
+        steps: list - names of the steps to run (each step reads the previous step's output)
+        low_memory: bool - train in low memory mode
+
+    Returns:
+        dict - key = step name, value = step results
+    """
+    csv_path = os.path.join(DATA_FOLDER, f"calls_{scale}.csv")
+    if not os.path.exists(csv_path):
+        print(f"Generating {scale} synthetic rows...")
+        generate(SCALES[scale], csv_path)
+
+    work_dir = tempfile.mkdtemp(prefix=f"ems-bench-{scale}-")
+    results = {}
+    try:
+        for name in steps:
+            with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as pool:
+                results[name] = pool.submit(run_step, name, csv_path, work_dir, repeat, low_memory).result()
+            print(f"  {scale:>5} {name:<8} {results[name]['seconds_median']:10.3f}s "
+                  f"{results[name]['peak_rss_mb'] or 0:10.1f} MB")
+            if name == "startup":
+                print(f"        ML stack loaded: {', '.join(results[name]['ml_packages_loaded']) or 'no'}; slowest imports: "
+                      + ", ".join(f"{package} {ms:.0f}ms" for package, ms in list(results[name]['slowest_imports_ms'].items())[:5]))
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    return results
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT,
+                                       text=True, stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(old, new):
+    """
+    Prints the relative change in median time and peak RSS between two result files.
+    """
+    print(f"\nCompared to {old['meta'].get('commit')}:")
+    for scale, steps in new["results"].items():
+        for name, result in steps.items():
+            before = old["results"].get(scale, {}).get(name)
+            if not before:
+                continue
+            time_ratio = result["seconds_median"] / before["seconds_median"] if before["seconds_median"] else float("nan")
+            print(f"  {scale:>5} {name:<8} time x{time_ratio:.2f}  "
+                  f"rss {before['peak_rss_mb']} -> {result['peak_rss_mb']} MB")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the EMS forecasting backend.")
+    parser.add_argument("--scales", nargs="+", default=["100k"], choices=list(SCALES))
+    parser.add_argument("--repeat", type=int, default=3, help="timed repetitions per step")
+    parser.add_argument("--low-memory", action="store_true", help="train in low memory mode")
+    parser.add_argument("--out", default=None, help="output JSON path (default benchmarks/results/<commit>.json)")
+    parser.add_argument("--compare", default=None, help="previous results JSON to compare against")
+    args = parser.parse_args()
+
+    commit = git_commit()
+    report = {
+        "meta": {
+            "commit": commit,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "repeat": args.repeat,
+            "low_memory": args.low_memory,
+        },
+        "results": {},
+    }
+
+    for scale in args.scales:
+        report["results"][scale] = run_scale(scale, args.repeat, list(STEPS), args.low_memory)
+
+    out_path = args.out or os.path.join(os.path.dirname(__file__), "results", f"{commit or 'local'}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(out_path)), exist_ok=True)
+    with open(out_path, "w") as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+    print(f"Results saved to {out_path}")
+
+    if args.compare:
+        with open(args.compare, "r") as f:
+            compare(json.load(f), report)
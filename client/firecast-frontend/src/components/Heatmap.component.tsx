@@ -33,6 +33,46 @@ const useInterval = (callback, delay) => {
   }, [delay]);
 };
 
+// Latest published prediction version, pushed by the /api/events stream. While the stream
+// is unavailable (e.g. behind a WSGI server), /api/versions is polled every `fallbackDelay` ms.
+// Undefined until the first version is known.
+const usePredictionVersion = (fallbackDelay) => {
+  const [version, setVersion] = useState<string | null | undefined>(undefined);
+  const [live, setLive] = useState<boolean>(false);
+
+  useEffect(() => {
+    if (typeof EventSource === "undefined") return;
+
+    const source = new EventSource("http://127.0.0.1:8000/api/events/");
+    source.addEventListener("version", (event) => {
+      setVersion(JSON.parse(event.data).predictions);
+    });
+    source.onopen = () => setLive(true);
+    // EventSource reconnects on its own after a dropped stream, and gives up on an error
+    // status (the 501 served by WSGI deployments), leaving the polling fallback on
+    source.onerror = () => setLive(false);
+
+    return () => source.close();
+  }, []);
+
+  const pollVersion = async () => {
+    try {
+      const response = await fetch("http://127.0.0.1:8000/api/versions/");
+      const data = await response.json();
+      setVersion(data.predictions);
+    } catch (err) {
+      console.error("Version check error:", err);
+    }
+  };
+
+  useEffect(() => {
+    if (!live) pollVersion();
+  }, [live]);
+  useInterval(pollVersion, live ? null : fallbackDelay);
+
+  return version;
+};
+
 const Heatmap: React.FC = () => {
   const mapContainer = useRef<HTMLDivElement | null>(null);
   const [map, setMap] = useState<mapboxgl.Map | null>(null);
@@ -73,9 +113,15 @@ const Heatmap: React.FC = () => {
 
   const url = constructUrl("http://127.0.0.1:8000/api/heatmap", params);
 
-  // Use the useSWR hook to fetch data
+  // Fallback refresh rate while live version updates are unavailable
+  const predictionVersion = usePredictionVersion(updateInterval * 60 * 1000); // Time conversion needed for input slider
+
+  // Use the useSWR hook to fetch data, again only when a new prediction version is published
   // TODO: request data on click with /heatmap
-  const { data, error, mutate } = useSWR(url, fetcher, {
+  const key = predictionVersion === undefined ? null : [url, predictionVersion];
+  const { data, error } = useSWR(key, ([url]) => fetcher(url), {
+    revalidateOnFocus: false,
+    revalidateOnReconnect: false,
     onSuccess: (data) => {
       const times = data.features.map((f) =>
         new Date(f.properties.time).getTime()
@@ -85,49 +131,6 @@ const Heatmap: React.FC = () => {
     },
   });
 
-  // Use the custom useInterval hook to re-fetch data periodically
-  useInterval(
-    () => {
-      mutate();
-    },
-    updateInterval * 60 * 1000 // Time conversion needed for input slider
-  );
-
-  // Make requests to /api/train and /api/predict on component mount
-  useEffect(() => {
-    const trainModel = async () => {
-      try {
-        const response = await fetch("http://127.0.0.1:8000/api/train/", {
-          method: "POST",
-          headers: {
-            "Content-Type": "application/json",
-          },
-        });
-        const data = await response.json();
-        console.log("Training response:", data);
-      } catch (err) {
-        console.error("Training error:", err);
-      }
-    };
-
-    const predictModel = async () => {
-      try {
-        const response = await fetch("http://127.0.0.1:8000/api/predict/", {
-          method: "GET",
-          headers: {
-            "Content-Type": "application/json",
-          },
-        });
-        const data = await response.json();
-      } catch (err) {
-        console.error("Predict error:", err);
-      }
-    };
-
-    trainModel();
-    predictModel();
-  }, []);
-
   // Render the Map
   useEffect(() => {
     if (!mapContainer.current) return;
@@ -141,13 +144,11 @@ const Heatmap: React.FC = () => {
       zoomSnap: 0.5,
     });
 
-    // http://127.0.0.1:8000/heatmap POST YYYY-MM-DD str
-    // update this so request is made on submission
-    // on load > train, and predict requests then submit for heatmap w/ params
+    // The heatmap data is set from the useSWR response (see below)
     map.on("load", () => {
       map.addSource("callVolume", {
         type: "geojson",
-        data: "http://127.0.0.1:8000/api/heatmap",
+        data: { type: "FeatureCollection", features: [] },
         generateId: true,
       });
 
@@ -214,6 +215,13 @@ const Heatmap: React.FC = () => {
     return () => map.remove();
   }, []);
 
+  // Show the fetched heatmap data on the map
+  useEffect(() => {
+    if (!map || !data?.features) return;
+
+    map.getSource("callVolume").setData(data);
+  }, [data, map]);
+
   // Update the heatmap layer filter when `time` changes
   useEffect(() => {
     if (!map) return;
@@ -382,7 +390,8 @@ const Heatmap: React.FC = () => {
             htmlFor="refreshInt"
             style={{ width: "250px", height: "min-content" }}
           >
-            Current Refresh Rate: {updateInterval} min. Minimum time is 1 minute
+            Fallback Refresh Rate (when live updates are unavailable):{" "}
+            {updateInterval} min. Minimum time is 1 minute
           </label>
 
           <Input
@@ -1,78 +1,242 @@
+"""
+Holt-Winters hyperparameter search.
+
+Every trend/seasonal/period combination is fitted on a process pool. Workers get a
+read-only copy of the call_count series (not the DataFrame), and every fit result is
+memoized on disk keyed by its parameters and the series hash, so rerunning the search
+(or growing the grid) only fits the new combinations.
+
+Usage:
+    python hyper_parameter.py
+    python hyper_parameter.py --time-step d --extended --workers 8
+"""
+import os
+import sys
+import json
+import hashlib
+import argparse
 import itertools
 import numpy as np
-from statsmodels.tsa.holtwinters import ExponentialSmoothing
-from sklearn.metrics import mean_absolute_error, mean_squared_error
-
-# Load and prepare data. Change time_step to match hourly/daily
-from data_process import prepare_dataframe
-file_path = "../../../CLT_data.csv"
-time_step = "h"
-df = prepare_dataframe(file_path, time_step)
-
-# Prepare data without 2021 data (Unused for now)
-# df_no_2021 = df[~(df.index.year == 2021)].copy()
-
-# Define hyperparameter options
-trend_options = ['add', 'mul', None]
-seasonal_options = ['add', 'mul', None]
-
-# Option to also test including and excluding 2021 data because of the pandemic (Unused for now)
-# include_2021 = [True, False]
-
-# Seasonal period options, one is daily and the other is hourly
-if time_step == "h":
-    # Hourly (Daily/Weekly)
-    seasonal_periods_options = [24, 168]
-else:
-    # Daily (Weekly/Monthly)
-    seasonal_periods_options = [7, 30]
-
-# Generate all possible hyperparameter combinations into a list of tuples
-param_grid = list(itertools.product(
-    trend_options,
-    seasonal_options,
-    seasonal_periods_options
-    ))
-
-# Print total number of hyperparameter combinations
-print(f"Total hyperparameter combinations: {len(param_grid)}")
-best_score = float("inf")
-best_params = None
-results = []
-
-# Loop through each hyperparameter combination and display MAE and RMSE
-for trend, seasonal, seasonal_period in param_grid:
-    try:
-        # Fit Holt-Winters model
-        hw_model = ExponentialSmoothing(
-            df["call_count"],
-            trend=trend,
-            seasonal=seasonal,
-            seasonal_periods=seasonal_period
-            )
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
 
-        # Get predictions
-        df["forecast"] = hw_model.fit().fittedvalues
+# Default cache folder for fit results
+CACHE_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".hw_cache")
 
-        # Calculate MAE & RMSE
-        mae = mean_absolute_error(df["call_count"], df["forecast"])
-        rmse = np.sqrt(mean_squared_error(df["call_count"], df["forecast"]))
+# Series shared with the pool workers (set by _init_worker)
+_series = None
+
+
+# ----------------------------------------------------------------------------------------------
+# Parameter grid
+# ----------------------------------------------------------------------------------------------
+def build_param_grid(time_step="h", extended=False):
+    """
+    Generate all hyperparameter combinations.
+
+    The extended grid adds damped trends, Box-Cox transforms and more seasonal periods.
+    Combinations that are equivalent or invalid (a damped trend without a trend, a
+    seasonal period without a seasonal component) are only listed once or skipped.
+
+    Input:
+        time_step (str): "h" for hourly or "d" for daily data.
+        extended (bool): Use the extended grid.
+
+    Returns:
+        List of parameter dicts for ExponentialSmoothing.
+    """
+    trend_options = ['add', 'mul', None]
+    seasonal_options = ['add', 'mul', None]
+    damped_options = [False, True] if extended else [False]
+    boxcox_options = [False, True] if extended else [False]
+
+    # Seasonal period options, one is daily and the other is hourly
+    if time_step == "h":
+        # Hourly (Daily/Weekly, extended adds half-daily and two-weekly)
+        seasonal_periods_options = [12, 24, 168, 336] if extended else [24, 168]
+    else:
+        # Daily (Weekly/Monthly, extended adds two-weekly and yearly)
+        seasonal_periods_options = [7, 14, 30, 365] if extended else [7, 30]
+
+    grid = []
+    seen = set()
+    for trend, damped, seasonal, period, boxcox in itertools.product(
+            trend_options, damped_options, seasonal_options, seasonal_periods_options, boxcox_options):
+        if damped and trend is None:
+            continue
+        params = {
+            "trend": trend,
+            "damped_trend": damped,
+            "seasonal": seasonal,
+            "seasonal_periods": period if seasonal is not None else None,
+            "use_boxcox": boxcox,
+        }
+        key = param_key(params)
+        if key not in seen:
+            seen.add(key)
+            grid.append(params)
+
+    return grid
+
+
+def param_key(params):
+    return json.dumps(params, sort_keys=True)
+
+
+# ----------------------------------------------------------------------------------------------
+# Fit cache
+# ----------------------------------------------------------------------------------------------
+def series_hash(series):
+    """
+    Content hash of the series values and timestamps.
+    """
+    h = hashlib.sha256()
+    h.update(pd.util.hash_pandas_object(series, index=True).values.tobytes())
+    return h.hexdigest()[:16]
+
+
+def cache_path(cache_dir, data_hash, params):
+    digest = hashlib.sha256(param_key(params).encode()).hexdigest()[:16]
+    return os.path.join(cache_dir, data_hash, f"{digest}.json")
+
+
+def read_cached(cache_dir, data_hash, params):
+    path = cache_path(cache_dir, data_hash, params)
+    if not os.path.exists(path):
+        return None
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+def write_cached(cache_dir, data_hash, result):
+    path = cache_path(cache_dir, data_hash, result["params"])
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path + ".tmp", "w") as f:
+        json.dump(result, f)
+    os.replace(path + ".tmp", path)
 
-        # Store results
-        results.append((trend, seasonal, seasonal_period, mae, rmse))
 
-        # Track best model
-        if mae < best_score:
-            best_score = mae
-            best_params = (trend, seasonal, seasonal_period)
+# ----------------------------------------------------------------------------------------------
+# Workers
+# ----------------------------------------------------------------------------------------------
+def _init_worker(values):
+    """
+    Stores the series once per worker process, read-only.
+    """
+    global _series
+    _series = np.asarray(values, dtype=float)
+    _series.flags.writeable = False
 
-        print(f"Evaluated: trend={trend}, seasonal={seasonal}, period={seasonal_period} → MAE={mae:.2f}, RMSE={rmse:.2f}")
 
+def evaluate(params):
+    """
+    Fit one Holt-Winters model on the worker's series and score its fitted values.
+
+    Input:
+        params (dict): ExponentialSmoothing parameters.
+
+    Returns:
+        dict with params, mae, rmse, aic and error (None on success).
+    """
+    from statsmodels.tsa.holtwinters import ExponentialSmoothing
+
+    result = {"params": params, "mae": None, "rmse": None, "aic": None, "error": None}
+    try:
+        fit = ExponentialSmoothing(
+            _series,
+            trend=params["trend"],
+            damped_trend=params["damped_trend"],
+            seasonal=params["seasonal"],
+            seasonal_periods=params["seasonal_periods"],
+            use_boxcox=params["use_boxcox"],
+        ).fit()
+
+        # Calculate MAE & RMSE
+        residuals = _series - fit.fittedvalues
+        result["mae"] = float(np.mean(np.abs(residuals)))
+        result["rmse"] = float(np.sqrt(np.mean(residuals ** 2)))
+        result["aic"] = float(fit.aic)
     except Exception as e:
-        print(f"Error with parameters: trend={trend}, seasonal={seasonal}, period={seasonal_period} - {e}")
+        result["error"] = str(e)
+
+    return result
+
+
+# ----------------------------------------------------------------------------------------------
+# Search
+# ----------------------------------------------------------------------------------------------
+def grid_search(series, param_grid, workers=None, cache_dir=CACHE_FOLDER):
+    """
+    Evaluate every parameter combination, reusing cached fits.
+
+    Input:
+        series (pandas.Series): call counts indexed by time.
+        param_grid (list): parameter dicts from build_param_grid.
+        workers (int): process pool size (defaults to the CPU count).
+        cache_dir (str): folder for memoized fit results (None disables the cache).
+
+    Returns:
+        DataFrame with one row per combination, sorted by MAE (failed fits last).
+    """
+    data_hash = series_hash(series)
+
+    results = []
+    pending = []
+    for params in param_grid:
+        cached = read_cached(cache_dir, data_hash, params) if cache_dir else None
+        if cached is not None:
+            results.append(cached)
+        else:
+            pending.append(params)
+
+    print(f"Total hyperparameter combinations: {len(param_grid)} ({len(results)} cached, {len(pending)} to fit)")
+
+    if pending:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(series.to_numpy(),)) as pool:
+            for result in pool.map(evaluate, pending):
+                results.append(result)
+                if cache_dir:
+                    write_cached(cache_dir, data_hash, result)
+                print_result(result)
+
+    table = pd.DataFrame([{**result["params"], **{k: result[k] for k in ("mae", "rmse", "aic", "error")}}
+                          for result in results])
+    return table.sort_values("mae", na_position="last").reset_index(drop=True)
+
+
+def print_result(result):
+    params = result["params"]
+    label = (f"trend={params['trend']}, damped={params['damped_trend']}, seasonal={params['seasonal']}, "
+             f"period={params['seasonal_periods']}, boxcox={params['use_boxcox']}")
+    if result["error"]:
+        print(f"Error with parameters: {label} - {result['error']}")
+    else:
+        print(f"Evaluated: {label} → MAE={result['mae']:.2f}, RMSE={result['rmse']:.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Holt-Winters hyperparameter search.")
+    parser.add_argument("--file", default="../../../CLT_data.csv", help="raw call data CSV")
+    parser.add_argument("--time-step", default="h", choices=["h", "d"], help="hourly or daily series")
+    parser.add_argument("--extended", action="store_true", help="damped trends, Box-Cox and more periods")
+    parser.add_argument("--workers", type=int, default=None, help="process pool size")
+    parser.add_argument("--cache-dir", default=CACHE_FOLDER, help="fit result cache folder")
+    parser.add_argument("--no-cache", action="store_true", help="refit every combination")
+    args = parser.parse_args()
+
+    # Load and prepare data (cached EMS call series, see ../lstm/data_process.py)
+    sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "lstm"))
+    from data_process import prepare_dataframe
+    df = prepare_dataframe(args.file, args.time_step)
+
+    table = grid_search(df["call_count"], build_param_grid(args.time_step, args.extended),
+                        args.workers, None if args.no_cache else args.cache_dir)
 
-print("\nBest Model Parameters:")
-print(f"Trend: {best_params[0]}")
-print(f"Seasonal: {best_params[1]}")
-print(f"Seasonal Periods: {best_params[2]}")
-print(f"Best MAE: {best_score:.2f}")
+    best = table.iloc[0]
+    print("\nBest Model Parameters:")
+    print(f"Trend: {best['trend']} (damped: {best['damped_trend']})")
+    print(f"Seasonal: {best['seasonal']}")
+    print(f"Seasonal Periods: {best['seasonal_periods']}")
+    print(f"Box-Cox: {best['use_boxcox']}")
+    print(f"Best MAE: {best['mae']:.2f}")
@@ -1,36 +1,148 @@
+import os
+import json
+import hashlib
+import numpy as np
 import pandas as pd
 
+# Cached series are stored here, keyed by source file hash and time step
+CACHE_FOLDER = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".series_cache")
 
-def prepare_dataframe(file_path, time_step="h"):
+# Time steps materialized together when the CSV has to be parsed
+TIME_STEPS = ["h", "d"]
+
+
+def prepare_dataframe(file_path, time_step="h", cache_dir=CACHE_FOLDER):
     """
     Prepares dataframe for analysis by filtering to only show rows where
     CauseCategory == EMS and converting the 'Dispatched' column to a datetime
     object.
 
+    The resampled series are cached as columnar .npz files keyed by the source
+    file hash, so only the first call for a CSV parses it.
+
     Input:
         file_path (str): Path to the CSV file containing the data.
         time_step (str): Resampling time step ("h" for hourly, "d" for daily).
+        cache_dir (str): Cache folder (None always parses the CSV).
 
     Returns:
         Resampled dataframe with call_count column.
     """
-    df = pd.read_csv(file_path)
+    if cache_dir is None:
+        return _resample(_read_ems(file_path), time_step)
+
+    path = _cache_path(cache_dir, file_path, f"calls_{time_step}")
+    if not os.path.exists(path):
+        dispatched = _read_ems(file_path)
+        for step in dict.fromkeys(TIME_STEPS + [time_step]):
+            _save(_resample(dispatched, step), _cache_path(cache_dir, file_path, f"calls_{step}"))
+
+    return _load(path)
+
+
+def prepare_cluster_dataframe(file_path, time_step="h", num_clusters=5, cache_dir=CACHE_FOLDER):
+    """
+    Prepares one EMS call count series per k-means cluster of the call coordinates
+    (clustered like the backend, with a fixed random state so the cache is stable).
+
+    Input:
+        file_path (str): Path to the CSV file containing the data.
+        time_step (str): Resampling time step ("h" for hourly, "d" for daily).
+        num_clusters (int): Number of k-means clusters.
+        cache_dir (str): Cache folder (None always parses the CSV).
+
+    Returns:
+        Resampled dataframe with one call count column per cluster (named by cluster ID).
+    """
+    path = _cache_path(cache_dir, file_path, f"clusters{num_clusters}_{time_step}") if cache_dir else None
+    if path and os.path.exists(path):
+        return _load(path)
+
+    from sklearn.cluster import KMeans
+
+    df = _read_ems(file_path, coordinates=True)
+    df['Cluster'] = KMeans(n_clusters=num_clusters, random_state=0).fit_predict(df[['Latitude', 'Longitude']])
+    df_resampled = (df.groupby([pd.Grouper(key='Dispatched', freq=time_step), 'Cluster']).size()
+                    .unstack(fill_value=0).asfreq(time_step, fill_value=0))
+    df_resampled.columns = [str(c) for c in df_resampled.columns]
+
+    if path:
+        _save(df_resampled, path)
+    return df_resampled
+
 
-    # Code from Ryan to prepare data to datetime and prepare correct formatting
-    df.drop(columns=['Unique ID', 'Nature Code', 'State Plane Feet X',
-                     'State Plane Feet Y', 'Shift', 'Battalion', 'Division',
-                     'DispatchNature'], inplace=True)
-    df['e'] = 1
-    filtered_df = df[df['CauseCategory'] == 'EMS'].copy()
+# ----------------------------------------------------------------------------------------------
+# Helpers
+# ----------------------------------------------------------------------------------------------
+def _read_ems(file_path, coordinates=False):
+    """
+    Reads the EMS calls of the CSV (only the needed columns) with parsed dispatch times.
+    """
+    usecols = ['CauseCategory', 'Dispatched'] + (['Latitude', 'Longitude'] if coordinates else [])
+    df = pd.read_csv(file_path, usecols=usecols)
+    filtered_df = df[df['CauseCategory'] == 'EMS'].drop(columns='CauseCategory')
     filtered_df['Dispatched'] = pd.to_datetime(
         filtered_df['Dispatched'],
         format='%m/%d/%Y %H:%M'
         )
+    if coordinates:
+        return filtered_df.dropna(subset=['Latitude', 'Longitude'])
+    return filtered_df['Dispatched']
+
 
-    # Set datetime as index then resample in intervals of time_step
-    filtered_df.set_index('Dispatched', inplace=True)
-    df_resampled = filtered_df.resample(time_step).size().to_frame(
+def _resample(dispatched, time_step):
+    """
+    Set datetime as index then resample in intervals of time_step
+    """
+    return pd.Series(1, index=pd.DatetimeIndex(dispatched)).resample(time_step).size().to_frame(
         name="call_count"
-        )
+        ).rename_axis('Dispatched')
 
-    return df_resampled
+
+def _source_hash(file_path, cache_dir):
+    """
+    Content hash of the source file. Hashes are remembered by path, size and
+    modification time, so an unchanged file is not read again.
+    """
+    stat = os.stat(file_path)
+    index_path = os.path.join(cache_dir, "sources.json")
+    index = {}
+    if os.path.exists(index_path):
+        with open(index_path, "r") as f:
+            index = json.load(f)
+
+    key = os.path.abspath(file_path)
+    entry = index.get(key)
+    if entry and entry["size"] == stat.st_size and entry["mtime_ns"] == stat.st_mtime_ns:
+        return entry["sha256"]
+
+    h = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+
+    index[key] = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "sha256": h.hexdigest()[:16]}
+    os.makedirs(cache_dir, exist_ok=True)
+    with open(index_path, "w") as f:
+        json.dump(index, f, indent=2)
+    return index[key]["sha256"]
+
+
+def _cache_path(cache_dir, file_path, name):
+    return os.path.join(cache_dir, _source_hash(file_path, cache_dir), f"{name}.npz")
+
+
+def _save(df, path):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    columns = {f"col_{name}": df[name].to_numpy() for name in df.columns}
+    with open(path + ".tmp", "wb") as f:
+        np.savez(f, index=df.index.asi8, freq=np.array(df.index.freqstr or ""),
+                 names=np.array([str(name) for name in df.columns]), **columns)
+    os.replace(path + ".tmp", path)
+
+
+def _load(path):
+    arrays = np.load(path)
+    freq = str(arrays["freq"]) or None
+    index = pd.DatetimeIndex(arrays["index"], freq=freq, name='Dispatched')
+    return pd.DataFrame({name: arrays[f"col_{name}"] for name in arrays["names"]}, index=index)